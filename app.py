@@ -1,3 +1,5 @@
+import atexit
+import os
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import numpy as np
@@ -9,15 +11,39 @@ from backend.move_validator import MoveValidator
 from backend.algorithms.greedy import GreedyAI
 from backend.algorithms.minimax import MinimaxAI
 from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.diagnostics import configure as configure_logging
+from backend.opening_book import load_book
+from backend.turn_context import TurnContext
 
 app = Flask(__name__)
 CORS(app)
 
+# AI diagnostics are off unless BLOKUS_LOG asks for them (see backend/diagnostics.py)
+configure_logging()
+
+# Per-move wall-clock budget (seconds) for the minimax AI's iterative deepening
+MINIMAX_TIME_LIMIT = 5.0
+MINIMAX_MAX_DEPTH = 5
+# "paranoid" or "maxn" search every seat's moves; "solo" only ever moves the AI's own pieces
+MINIMAX_MODE = "paranoid"
+# Processes growing Monte Carlo trees in parallel (BLOKUS_MCTS_WORKERS); 1 keeps the search in-process
+MONTE_CARLO_WORKERS = max(1, int(os.environ.get("BLOKUS_MCTS_WORKERS", "1")))
+# Opening moves precomputed by "python3 -m backend.opening_book" (empty if it has not been built)
+OPENING_BOOK = load_book()
+
 # Initialize players and board
 players = {i: Player(i, list(pieces.values())) for i in range(1, 5)}
 board = Board(size=20)
 board.current_player = 1
 
+def close_players():
+    """Shut down the worker processes of any parallel Monte Carlo player."""
+    for player in players.values():
+        if isinstance(player, MonteCarloAI):
+            player.close()
+
+atexit.register(close_players)
+
 @app.route('/get_board', methods=['GET'])
 def get_board():
     return jsonify({'board': board.grid.tolist(), 'current_player': board.current_player})
@@ -99,9 +125,10 @@ def place_piece():
 def end_turn():
     current_player = board.current_player
     next_player = (current_player % 4) + 1
+    context = TurnContext(board)
 
     # Skip players with no valid moves
-    while not players[next_player].find_all_valid_moves(board):
+    while not context.has_moves(players[next_player]):
         print(f"🚫 Player {next_player} has no valid moves. Skipping turn...")
         next_player = (next_player % 4) + 1
         if next_player == current_player:
@@ -135,16 +162,20 @@ def initialize_players():
     print("🔍 Initializing players with types:", player_types)
 
     global players
+    close_players()
     players = {}
     for i, player_type in enumerate(player_types, start=1):
         if player_type == "human":
             players[i] = Player(i, list(pieces.values()))
         elif player_type == "greedy":
-            players[i] = GreedyAI(i, list(pieces.values()))
+            players[i] = GreedyAI(i, list(pieces.values()), book=OPENING_BOOK)
         elif player_type == "minimax":
-            players[i] = MinimaxAI(i, list(pieces.values()))
+            players[i] = MinimaxAI(i, list(pieces.values()), max_depth=MINIMAX_MAX_DEPTH,
+                                   time_limit=MINIMAX_TIME_LIMIT, mode=MINIMAX_MODE,
+                                   book=OPENING_BOOK)
         elif player_type == "monte_carlo":
-            players[i] = MonteCarloAI(i, list(pieces.values()))
+            players[i] = MonteCarloAI(i, list(pieces.values()), workers=MONTE_CARLO_WORKERS,
+                                      book=OPENING_BOOK)
         print(f"✅ Player {i} initialized as {player_type}")
     return jsonify({"success": True})
 
@@ -157,8 +188,9 @@ def process_ai_move():
     print(f"🔍 Processing move for Player {current_player} ({type(player).__name__})")
 
     # Check if the current player is an AI
-    if isinstance(player, (GreedyAI, MinimaxAI, MonteCarloAI)):
-        move = player.choose_move(board)
+    if player.is_ai:
+        context = TurnContext(board)
+        move = player.choose_move(board, context)
         if move:
             original_piece, piece, x, y = move
             print(f"✅ AI chose move: {piece.name} at ({x}, {y})")
@@ -169,7 +201,7 @@ def process_ai_move():
 
         # Move to the next player
         next_player = (current_player % 4) + 1
-        while not players[next_player].find_all_valid_moves(board):
+        while not context.has_moves(players[next_player]):
             next_player = (next_player % 4) + 1
             if next_player == current_player:
                 # All players have no valid moves, end the game
@@ -194,10 +226,16 @@ def process_ai_move():
     print(f"❌ Player {current_player} is not an AI.")
     return jsonify({"success": False, "error": "No valid moves or invalid player type."}), 400
 
+@app.route('/opening_book_stats', methods=['GET'])
+def opening_book_stats():
+    """Size of the opening book and how often the AIs have found their move in it."""
+    return jsonify(OPENING_BOOK.stats())
+
 @app.route('/restart_game', methods=['POST'])
 def restart_game():
     """Restart the game by resetting the board and players."""
     global players, board
+    close_players()
     players = {i: Player(i, list(pieces.values())) for i in range(1, 5)}
     board = Board(size=20)
     board.current_player = 1
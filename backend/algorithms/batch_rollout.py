@@ -0,0 +1,228 @@
+"""
+Batched rollouts: many independent playouts advanced together with NumPy.
+
+Each game in a batch is a stack of row bitmasks, one uint32 per board row
+with bit y for column y, for every seat. A step plays one move in every
+unfinished game at once:
+
+1. the mover's forbidden cells and anchors are derived from its rows with
+   whole-array shifts,
+2. the legal origins of all 91 orientations are found for every game with
+   one gather per orientation cell (the row form of
+   ShapeMasks.legal_origin_mask),
+3. each game plays its highest-priority piece that fits, at a uniformly
+   random legal placement, exactly like AnchorRollout.
+
+Games end when no seat can move; the tile margins of the whole batch are
+then counted in one go. Boards up to 32 columns wide are supported, and
+only registry pieces (backend.piece.pieces) are played.
+"""
+
+import random
+
+import numpy as np
+
+from backend.piece import PIECE_ORIENTATIONS, pieces
+from backend.placements import PIECE_NAMES
+from backend.zobrist import SEATS
+from backend.algorithms.rollout import RolloutPolicy, piece_priority
+
+# Tiles of the largest piece, so gathers for shorter ones repeat a tile
+_MAX_TILES = 5
+
+# Set bits of every 16-bit value, for NumPy older than 2.0
+_BIT_COUNTS = np.array([bin(value).count("1") for value in range(1 << 16)], dtype=np.uint8)
+
+
+def _table_popcount(rows):
+    """Set bits of each uint32 in rows, two 16-bit table lookups apiece."""
+    return _BIT_COUNTS[rows & 0xFFFF] + _BIT_COUNTS[rows >> 16]
+
+
+popcount = getattr(np, "bitwise_count", _table_popcount)
+
+_tables = {}
+
+
+class OrientationRows:
+    """Per-size constants: the tile offsets and origin rows of every registry orientation."""
+
+    def __init__(self, size):
+        if size > 32:
+            raise ValueError(f"batched rollouts need a board at most 32 wide, not {size}")
+        self.size = size
+        self.full_row = np.uint32((1 << size) - 1)
+        orientations = [o for name in PIECE_NAMES for o in PIECE_ORIENTATIONS[name]]
+        count = len(orientations)
+        self.piece_of = np.array([PIECE_NAMES.index(o.name) for o in orientations])
+        self.piece_starts = np.flatnonzero(np.r_[True, self.piece_of[1:] != self.piece_of[:-1]])
+        # Orientations of each piece, padded with the piece's last one
+        widest = max(len(PIECE_ORIENTATIONS[name]) for name in PIECE_NAMES)
+        ends = np.r_[self.piece_starts[1:], count]
+        self.piece_orientations = np.minimum(self.piece_starts[:, None] + np.arange(widest), ends[:, None] - 1)
+        offsets = sorted({cell for orientation in orientations for cell in orientation.cells})
+        self.dx = np.zeros((_MAX_TILES, count), dtype=np.intp)
+        self.dy = np.zeros((_MAX_TILES, count), dtype=np.uint32)
+        self.slots = np.zeros((_MAX_TILES, count), dtype=np.intp)  # Index into offsets
+        self.origin_rows = np.zeros((count, 1, size), dtype=np.uint32)
+        for index, orientation in enumerate(orientations):
+            cells = list(orientation.cells)
+            cells += cells[:1] * (_MAX_TILES - len(cells))
+            for slot, cell in enumerate(cells):
+                self.dx[slot, index], self.dy[slot, index] = cell
+                self.slots[slot, index] = offsets.index(cell)
+            columns = (1 << (size - orientation.width + 1)) - 1
+            self.origin_rows[index, 0, :size - orientation.height + 1] = columns
+        # Row x + dx of every origin row x for each distinct tile offset; rows
+        # past the board read the zero padding
+        self.offset_rows = np.array([i for i, _ in offsets])[:, None] + np.arange(size)
+        self.offset_shifts = np.array([j for _, j in offsets], dtype=np.uint32)[:, None]
+
+
+def orientation_rows(size=20):
+    table = _tables.get(size)
+    if table is None:
+        table = _tables[size] = OrientationRows(size)
+    return table
+
+
+class BatchRollout(RolloutPolicy):
+    """AnchorRollout's playouts, batch_size leaves at a time.
+
+    MonteCarloAI collects batch_size leaves with capture(), then plays them all
+    out with one rollout_batch() call and backs up every result. The working
+    arrays grow with the batch, and past about a hundred games they no longer
+    fit in cache: on one core, 96 games play 5-20% more playouts per
+    second than 64, and 256 games play fewer than 64.
+    """
+
+    def __init__(self, batch_size=96):
+        self.batch_size = batch_size
+        self.priorities = np.array([piece_priority(pieces[name]) for name in PIECE_NAMES], dtype=float)
+
+    def capture(self, board, seats, start_seat):
+        """The leaf at board, with seats moving and start_seat to move, as plain arrays."""
+        size = board.size
+        row = (1 << size) - 1
+        bitboards = board.bitboards
+        owned = np.zeros((SEATS, size), dtype=np.uint32)
+        held = np.zeros((SEATS, len(PIECE_NAMES)), dtype=bool)
+        for seat in range(1, SEATS + 1):
+            mask = bitboards.owned(seat)
+            owned[seat - 1] = [(mask >> (x * size)) & row for x in range(size)]
+            names = {piece.name for piece in seats[seat].pieces}
+            held[seat - 1] = [name in names for name in PIECE_NAMES]
+        return owned, held, start_seat - 1
+
+    def rollout(self, board, seats, start_seat, player, rng=random):
+        return float(self.rollout_batch([self.capture(board, seats, start_seat)], player, rng)[0])
+
+    def rollout_batch(self, leaves, player, rng=random):
+        """Play every captured leaf to the end; returns player's tile margin in each."""
+        owned = np.stack([leaf[0] for leaf in leaves])
+        held = np.stack([leaf[1] for leaf in leaves])
+        seat = np.array([leaf[2] for leaf in leaves])
+        table = orientation_rows(owned.shape[2])
+        rng = np.random.default_rng(rng.getrandbits(64))
+        stuck = np.zeros((len(leaves), SEATS), dtype=bool)
+        games = np.arange(len(leaves))
+
+        while True:
+            live = games[~stuck.all(axis=1)]
+            if not len(live):
+                break
+            movers = live[~stuck[live, seat[live]]]
+            if len(movers):
+                placed = self._step(table, owned, held, movers, seat[movers], rng)
+                stuck[movers[~placed], seat[movers[~placed]]] = True
+            seat[live] = (seat[live] + 1) % SEATS
+
+        tiles = popcount(owned).sum(axis=2, dtype=np.int64)
+        mine = tiles[:, player.player_id - 1].copy()
+        tiles[:, player.player_id - 1] = -1
+        return (mine - tiles.max(axis=1)).astype(float)
+
+    def _step(self, table, owned, held, games, seats, rng):
+        """Play one move for seats in games; returns which of them found one."""
+        size = table.size
+        legal = legal_origins(table, owned, games, seats)
+        legal *= held[games, seats].T[table.piece_of, :, None]
+
+        fits = np.logical_or.reduceat(legal.any(axis=2), table.piece_starts, axis=0).T
+        placed = fits.any(axis=1)
+        # Highest priority piece that fits; random() only breaks ties
+        keys = np.where(fits, self.priorities + rng.random(fits.shape), -np.inf)
+        piece = keys.argmax(axis=1)
+
+        # A uniformly random set origin bit among the chosen piece's orientations
+        index = np.arange(len(games))
+        candidates = table.piece_orientations[piece]
+        rows = legal[candidates, index[:, None]]
+        # Padding repeats the last orientation; count it once
+        rows[:, 1:] *= (candidates[:, 1:] != candidates[:, :-1])[:, :, None]
+        counts = popcount(rows).reshape(len(games), -1).astype(np.int64)
+        running = counts.cumsum(axis=1)
+        pick = (rng.random(len(games)) * running[:, -1]).astype(np.int64)
+        flat = np.minimum((running <= pick[:, None]).sum(axis=1), counts.shape[1] - 1)
+        rank = pick - running[index, flat] + counts[index, flat]
+        slot, x = np.divmod(flat, size)
+        orientation = candidates[index, slot]
+        row = rows[index, slot, x]
+        bits = ((row[:, None] >> np.arange(size, dtype=np.uint32)) & 1).cumsum(axis=1)
+        y = (bits <= rank[:, None]).sum(axis=1)
+
+        games, seats = games[placed], seats[placed]
+        orientation, x, y = orientation[placed], x[placed], y[placed]
+        for tile in range(_MAX_TILES):
+            owned[games, seats, x + table.dx[tile, orientation]] |= (
+                np.uint32(1) << (y + table.dy[tile, orientation]).astype(np.uint32))
+        held[games, seats, table.piece_of[orientation]] = False
+        return placed
+
+
+def legal_origins(table, owned, games, seats):
+    """(orientation, games, x) rows of the legal origins y for seats in games.
+
+    The same rule as ShapeMasks.legal_origin_mask: a tile on an anchor and
+    none on a forbidden cell, or a tile on a free board corner and none on
+    an occupied cell.
+    """
+    own = owned[games, seats]
+    occupied = np.bitwise_or.reduce(owned[games], axis=1)
+    sideways = ((own << 1) | (own >> 1)) & table.full_row
+    forbidden = occupied | sideways | _shift_down(own) | _shift_up(own)
+    free_corners = np.zeros_like(own)
+    free_corners[:, [0, -1]] = np.uint32(1 | 1 << (table.size - 1))
+    free_corners &= ~occupied
+    anchors = ((_shift_down(sideways) | _shift_up(sideways)) & ~forbidden) | free_corners
+
+    legal = _covering(table, anchors) & ~_covering(table, forbidden)
+    if free_corners.any():
+        legal |= _covering(table, free_corners) & ~_covering(table, occupied)
+    return legal & table.origin_rows
+
+
+def _shift_down(rows):
+    # Row x moves to row x + 1
+    shifted = np.zeros_like(rows)
+    shifted[:, 1:] = rows[:, :-1]
+    return shifted
+
+
+def _shift_up(rows):
+    shifted = np.zeros_like(rows)
+    shifted[:, :-1] = rows[:, 1:]
+    return shifted
+
+
+def _covering(table, rows):
+    """(orientation, games, x) rows of the origins y whose footprint covers a set cell of rows."""
+    padded = np.zeros((len(rows), table.size + _MAX_TILES), dtype=np.uint32)
+    padded[:, :table.size] = rows
+    # Every distinct tile offset is shifted once; orientations then copy
+    # theirs as whole (games, x) blocks
+    shifted = np.ascontiguousarray((padded[:, table.offset_rows] >> table.offset_shifts).transpose(1, 0, 2))
+    covered = shifted[table.slots[0]]
+    for slot in table.slots[1:]:
+        covered |= shifted[slot]
+    return covered
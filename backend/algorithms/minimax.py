@@ -1,156 +1,415 @@
-from backend.board import Board
 from backend.piece import Piece
+from backend.bitboard import popcount
 from backend.player import Player
-import numpy as np
+from backend.evaluation import corner_counts, utilities, utility
+from backend.diagnostics import describe_move, log_decision
+from backend.turn_context import TurnContext
+from backend.placements import placement_table
+from backend.zobrist import SEATS, next_seat, turn_key
+from backend.algorithms.seats import seat_players
+from backend.algorithms.move_ordering import MoveOrdering
+from backend.algorithms.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+import logging
+import time
 from copy import deepcopy
 
-def debug_print(message, piece=None, x=None, y=None, validation=None):
-    """Debug print function for minimax algorithm"""
-    print("\nDEBUG:", message)
-    if piece is not None and hasattr(piece, 'name'):
-        print(f"Piece: {piece.name}")
-        print("Shape:\n", piece.shape)
-    if x is not None and y is not None:
-        print(f"Position: ({x}, {y})")
-    if validation is not None:
-        print(f"Additional info: {validation}")
-    print("-" * 50)
+logger = logging.getLogger(__name__)
+
+# Weight of each opened corner in the utility
+CORNER_WEIGHT = 1.0
+
+# Salt that separates max and min nodes of the same position in the table
+MAXIMIZING_KEY = 0x9E3779B97F4A7C15
+
+# Search modes: "solo" only ever plays our own pieces (the original search);
+# "paranoid" lets every seat move, with the three opponents minimizing our
+# score; "maxn" lets every seat maximize its own tile count
+MODES = ("solo", "paranoid", "maxn")
+
+# Moves searched per node, best static utility first (None searches them all)
+BRANCHING = 10
+
+# Most tiles a single move can add, bounding how far max^n scores can grow
+MAX_PIECE_TILES = 5
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the per-move deadline has passed."""
 
 class MinimaxAI(Player):
-    def __init__(self, player_id, pieces, max_depth=3):
+    label = "minimax AI"
+    is_ai = True
+    move_attempts = 1
+
+    def __init__(self, player_id, pieces, max_depth=3, tt_size=1 << 16, time_limit=None, mode="paranoid",
+                 branching=BRANCHING, book=None):
         super().__init__(player_id, pieces)
+        self.book = book
+        if mode not in MODES:
+            raise ValueError(f"Unknown search mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        # Moves searched per node in the four-player modes; None for full width
+        self.branching = branching
+        # Killers and history, kept across turns (built for the board size on first use)
+        self.ordering = None
+        self._static = {}  # Static scores of the positions met in the current search
+        # Plies; in the four-player modes every seat's move is one ply
         self.max_depth = max_depth
         self.board_center = 10
+        # Persists across turns; tt_size=0 turns it off. Iterative deepening
+        # revisits the upper plies every iteration, where the table's best
+        # move orders the search (see backend/benchmarks/minimax_bench.py)
+        self.transposition_table = TranspositionTable(tt_size) if tt_size else None
+        # Seconds per move; None searches straight to max_depth with no time control
+        self.time_limit = time_limit
+        self.completed_depth = 0
+        self.moves_considered = 0  # Legal moves generated across the last search
+        self._deadline = None
+        self._previous_pv = []
+        self._pv_table = {}
+        self._context = None  # The TurnContext of the search in progress
+        self.nodes_per_ply = []  # Nodes searched at each ply in the last search
+        self.cutoffs_per_ply = []  # Nodes at each ply whose remaining moves were pruned
+        self._seats = None
+        self._opponents = {}  # Stand-ins that play the other seats in the four-player modes
+        self._maxn_base = {}  # Tile counts at the root of a max^n search
+
+    def _check_deadline(self):
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
 
     def count_valid_corners(self, piece, x, y, board):
         """Count number of valid corners created by placing this piece"""
-        test_board = Board(board.size)
-        test_board.grid = np.copy(board.grid)
-        test_board.place_piece(piece, x, y, self)
-        
-        valid_corners = set()
-        height, width = piece.shape.shape
-        
-        for i in range(height):
-            for j in range(width):
-                if piece.shape[i][j] == 1:
-                    diagonals = [
-                        (x + i + 1, y + j + 1),
-                        (x + i + 1, y + j - 1),
-                        (x + i - 1, y + j + 1),
-                        (x + i - 1, y + j - 1)
-                    ]
-                    
-                    for dx, dy in diagonals:
-                        if not (0 <= dx < board.size and 0 <= dy < board.size):
-                            continue
-                        if (dx, dy) in valid_corners:
-                            continue
-                        if test_board.grid[dx, dy] != 0:
-                            continue
-                            
-                        valid = True
-                        for adj_x, adj_y in [(dx-1, dy), (dx+1, dy), (dx, dy-1), (dx, dy+1)]:
-                            if (0 <= adj_x < board.size and 0 <= adj_y < board.size):
-                                if test_board.grid[adj_x, adj_y] == self.player_id:
-                                    valid = False
-                                    break
-                        
-                        if valid:
-                            valid_corners.add((dx, dy))
-        
-        return len(valid_corners)
+        return corner_counts(board, self, [(piece, x, y)])[0]
 
     def calculate_utility(self, piece, x, y, board):
         """Calculate utility score based on tiles, distance, and corners"""
-        # Base score from number of tiles
-        tile_count = int(np.sum(piece.shape))
-        
-        # Calculate distance from closest tile to center
-        min_distance = float('inf')
-        height, width = piece.shape.shape
-        for i in range(height):
-            for j in range(width):
-                if piece.shape[i][j] == 1:
-                    tile_x, tile_y = x + i, y + j
-                    distance = (abs(tile_x - self.board_center) + 
-                              abs(tile_y - self.board_center))
-                    min_distance = min(min_distance, distance)
-        
-        # Count valid corners for future moves
-        corner_count = self.count_valid_corners(piece, x, y, board)
-        
-        return float(tile_count - min_distance + corner_count)
+        center = (self.board_center, self.board_center)
+        return utility(board, self, piece, x, y, center, CORNER_WEIGHT)
+
+    def score_moves(self, board, moves):
+        # calculate_utility of every (original_piece, piece, x, y) move in one batch
+        center = (self.board_center, self.board_center)
+        return utilities(board, self, [(piece, x, y) for _, piece, x, y in moves], center, CORNER_WEIGHT)
+
+    def minimax(self, board, depth, alpha, beta, maximizing_player, ply=0):
+        """Minimax algorithm with alpha-beta pruning and a transposition table"""
+        self._check_deadline()
+        self._record_node(ply)
+        self._pv_table[ply] = []
+        table = self.transposition_table
+        key = board.hash ^ MAXIMIZING_KEY if maximizing_player else board.hash
+        hash_move = None
+        if table is not None:
+            entry = table.probe(key)
+            if entry is not None:
+                hash_move = entry.best_move
+                if entry.depth >= depth:
+                    if entry.flag == EXACT:
+                        self._pv_table[ply] = [entry.best_move] if entry.best_move else []
+                        return entry.best_move, entry.score
+                    if entry.flag == LOWER_BOUND:
+                        alpha = max(alpha, entry.score)
+                    else:
+                        beta = min(beta, entry.score)
+                    if beta <= alpha:
+                        return entry.best_move, entry.score
+        alpha_orig, beta_orig = alpha, beta
 
-    def minimax(self, board, depth, alpha, beta, maximizing_player):
-        """Minimax algorithm with alpha-beta pruning"""
         if depth == 0:
-            return None, self.evaluate_board(board)
+            return None, self.leaf_evaluation(board)
                 
-        valid_moves = self.find_all_valid_moves(board)
+        # Root moves come from the turn's context, so deepening generates them once
+        valid_moves = self.legal_moves(board, self._context if ply == 0 else None)
+        self.moves_considered += len(valid_moves)
         if not valid_moves:
+            if table is not None:
+                table.store(key, depth, EXACT, float('-inf'), None)
             return None, float('-inf')
         
         # Calculate utility for all moves and sort by utility
-        moves_with_utility = [
-            (piece, oriented_piece, x, y, self.calculate_utility(oriented_piece, x, y, board))
-            for piece, oriented_piece, x, y in valid_moves
-        ]
+        scores = self.score_moves(board, valid_moves)
+        self._check_deadline()
+        moves_with_utility = [(piece, oriented_piece, x, y, float(score))
+                              for (piece, oriented_piece, x, y), score in zip(valid_moves, scores)]
+        immediate_utilities = {move[:4]: move[4] for move in moves_with_utility}
         moves_with_utility.sort(key=lambda x: x[4], reverse=True)
         
         # Take top 10 moves after sorting by utility
         valid_moves = [(m[0], m[1], m[2], m[3]) for m in moves_with_utility[:10]]
 
+        # Search the previous iteration's principal variation first, then the stored move
+        pv_move = self._previous_pv[ply] if ply < len(self._previous_pv) else None
+        for preferred in (hash_move, pv_move):
+            if preferred in valid_moves:
+                valid_moves.remove(preferred)
+                valid_moves.insert(0, preferred)
+
         best_move = None
         if maximizing_player:
             max_eval = float('-inf')
             for piece, oriented_piece, x, y in valid_moves[:10]:
-                # Calculate immediate utility of this move
-                immediate_utility = self.calculate_utility(oriented_piece, x, y, board)
+                # Immediate utility of this move, scored with the rest above
+                immediate_utility = immediate_utilities[(piece, oriented_piece, x, y)]
                 
-                # Create new board with this move
-                board_copy = Board(board.size)
-                board_copy.grid = np.copy(board.grid)
-                board_copy.place_piece(oriented_piece, x, y, self)
+                # Play the move on the shared board and take it back after the subtree
+                undo_token = board.apply_move((piece, oriented_piece, x, y), self)
                 
                 # Combine immediate utility with future evaluation
-                _, future_eval = self.minimax(board_copy, depth - 1, alpha, beta, False)
+                try:
+                    _, future_eval = self.minimax(board, depth - 1, alpha, beta, False, ply + 1)
+                finally:
+                    board.undo(undo_token)
                 eval_score = immediate_utility + future_eval
                 
                 if eval_score > max_eval:
                     max_eval = eval_score
                     best_move = (piece, oriented_piece, x, y)
+                    self._pv_table[ply] = [best_move] + self._pv_table.get(ply + 1, [])
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
+                    self._record_node(ply, cutoff=True)
                     break
-            return best_move, max_eval
+            best_eval = max_eval
         else:
             min_eval = float('inf')
             for piece, oriented_piece, x, y in valid_moves[:10]:
-                # Calculate immediate utility of this move
-                immediate_utility = self.calculate_utility(oriented_piece, x, y, board)
+                # Immediate utility of this move, scored with the rest above
+                immediate_utility = immediate_utilities[(piece, oriented_piece, x, y)]
                 
-                board_copy = Board(board.size)
-                board_copy.grid = np.copy(board.grid)
-                board_copy.place_piece(oriented_piece, x, y, self)
+                undo_token = board.apply_move((piece, oriented_piece, x, y), self)
                 
                 # Combine immediate utility with future evaluation
-                _, future_eval = self.minimax(board_copy, depth - 1, alpha, beta, True)
+                try:
+                    _, future_eval = self.minimax(board, depth - 1, alpha, beta, True, ply + 1)
+                finally:
+                    board.undo(undo_token)
                 eval_score = immediate_utility + future_eval
                 
                 if eval_score < min_eval:
                     min_eval = eval_score
                     best_move = (piece, oriented_piece, x, y)
+                    self._pv_table[ply] = [best_move] + self._pv_table.get(ply + 1, [])
                 beta = min(beta, eval_score)
                 if beta <= alpha:
+                    self._record_node(ply, cutoff=True)
                     break
-            return best_move, min_eval
+            best_eval = min_eval
+
+        if table is not None:
+            if best_eval <= alpha_orig:
+                flag = UPPER_BOUND
+            elif best_eval >= beta_orig:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            table.store(key, depth, flag, best_eval, best_move)
+        return best_move, best_eval
         
+    def _record_node(self, ply, cutoff=False):
+        while len(self.nodes_per_ply) <= ply:
+            self.nodes_per_ply.append(0)
+            self.cutoffs_per_ply.append(0)
+        if cutoff:
+            self.cutoffs_per_ply[ply] += 1
+        else:
+            self.nodes_per_ply[ply] += 1
+
+    def search_stats(self):
+        """Nodes and cutoffs per ply of the last search, to compare the modes' cost."""
+        return {"mode": self.mode, "nodes": list(self.nodes_per_ply), "cutoffs": list(self.cutoffs_per_ply),
+                "total_nodes": sum(self.nodes_per_ply), "total_cutoffs": sum(self.cutoffs_per_ply),
+                "first_move_cutoff_rate": self.ordering.first_move_cutoff_rate if self.ordering else 0.0}
+
+    def mover_at(self, board, seat, depth, ply):
+        """The seat to move at a node and its move IDs, or (None, []) at a leaf.
+
+        The root is always our own move: if we cannot move there is nothing
+        to choose, even when other seats could still play.
+        """
+        if depth == 0:
+            return None, []
+        if ply == 0:
+            moves = board.legal_move_ids(self)
+            return (self, moves) if moves else (None, [])
+        return self.next_mover(board, seat)
+
+    def next_mover(self, board, seat):
+        """The first seat from seat on that can move, with its move IDs, or (None, []) if none can."""
+        for _ in range(SEATS):
+            player = self._seats[seat]
+            moves = board.legal_move_ids(player)
+            if moves:
+                return player, moves
+            seat = next_seat(seat)
+        return None, []
+
+    def ordered_moves(self, board, player, moves, ply, first=None):
+        """The move IDs player searches at ply, in order (see backend.algorithms.move_ordering).
+
+        Each position's static utilities are computed once per search and
+        reused when iterative deepening comes back to it.
+        """
+        key = board.hash ^ turn_key(board.bitboards.to_move) ^ turn_key(player.player_id)
+        scores = self._static.get(key)
+        if scores is None:
+            self.moves_considered += len(moves)
+            table = placement_table(board.size)
+            center = (self.board_center, self.board_center)
+            scores = self._static[key] = utilities(board, player, [table.placement(move) for move in moves],
+                                                   center, CORNER_WEIGHT)
+        return self.ordering.order(moves, scores, ply, first, self.branching)
+
+    def _pv_move(self, ply):
+        # The previous iteration's principal variation move at ply, if it went that deep
+        return self._previous_pv[ply] if ply < len(self._previous_pv) else None
+
+    def paranoid(self, board, depth, alpha, beta, seat, ply=0):
+        """Alpha-beta over all four seats, seat to move, opponents minimizing evaluate_board.
+
+        Seats that cannot move are passed over. Returns (move ID, score).
+        """
+        self._check_deadline()
+        self._record_node(ply)
+        self._pv_table[ply] = []
+        table = self.transposition_table
+        # The hash as if seat were to move, since passes leave the board's own turn key behind
+        key = board.hash ^ turn_key(board.bitboards.to_move) ^ turn_key(seat)
+        hash_move = None
+        if table is not None:
+            entry = table.probe(key)
+            if entry is not None:
+                hash_move = entry.best_move
+                if entry.depth >= depth:
+                    if entry.flag == EXACT:
+                        self._pv_table[ply] = [entry.best_move] if entry.best_move is not None else []
+                        return entry.best_move, entry.score
+                    if entry.flag == LOWER_BOUND:
+                        alpha = max(alpha, entry.score)
+                    else:
+                        beta = min(beta, entry.score)
+                    if beta <= alpha:
+                        return entry.best_move, entry.score
+        alpha_orig, beta_orig = alpha, beta
+
+        mover, moves = self.mover_at(board, seat, depth, ply)
+        if mover is None:
+            return None, self.leaf_evaluation(board)
+
+        maximizing = mover is self
+        best_move = None
+        best_score = float('-inf') if maximizing else float('inf')
+        first = [self._pv_move(ply), hash_move]
+        for index, move in enumerate(self.ordered_moves(board, mover, moves, ply, first)):
+            undo_token = board.apply_move_id(move, mover)
+            try:
+                _, score = self.paranoid(board, depth - 1, alpha, beta, next_seat(mover.player_id), ply + 1)
+            finally:
+                board.undo(undo_token)
+            if maximizing and score > best_score or not maximizing and score < best_score:
+                best_score, best_move = score, move
+                self._pv_table[ply] = [move] + self._pv_table.get(ply + 1, [])
+            if maximizing:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if beta <= alpha:
+                self._record_node(ply, cutoff=True)
+                self.ordering.cutoff(move, ply, depth, index)
+                break
+
+        if table is not None:
+            if best_score <= alpha_orig:
+                flag = UPPER_BOUND
+            elif best_score >= beta_orig:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            table.store(key, depth, flag, best_score, best_move)
+        return best_move, best_score
+
+    def maxn(self, board, depth, seat, parent_best=None, parent_seat=None, ply=0):
+        """max^n over all four seats: each seat picks the move best for its own tile count.
+
+        A seat's score is the tiles it gained since the root, which leaves
+        every seat's choice unchanged. Below this node the mover's and the
+        parent seat's scores sum to at most what they have gained so far
+        plus MAX_PIECE_TILES per remaining ply. So once the mover has found
+        a move worth best to it, the parent's seat (whose best so far is
+        parent_best) cannot prefer this node when best >= that sum -
+        parent_best, and the rest is pruned (shallow pruning). Nothing is
+        pruned below a parent's first move, or when the parent's seat moves
+        again here, as it does when everyone else has passed. Returns
+        (move ID, {seat: score}).
+        """
+        self._check_deadline()
+        self._record_node(ply)
+        self._pv_table[ply] = []
+        mover, moves = self.mover_at(board, seat, depth, ply)
+        if mover is None:
+            scores = board.get_score()
+            return None, {seat: scores[seat] - base for seat, base in self._maxn_base.items()}
+
+        seat = mover.player_id
+        bound = None
+        if parent_best is not None and parent_seat != seat:
+            bitboards = board.bitboards
+            gained = (popcount(bitboards.owned(seat)) - self._maxn_base[seat]
+                      + popcount(bitboards.owned(parent_seat)) - self._maxn_base[parent_seat])
+            bound = gained + MAX_PIECE_TILES * depth - parent_best
+        best_move, best_scores = None, None
+        for index, move in enumerate(self.ordered_moves(board, mover, moves, ply, self._pv_move(ply))):
+            undo_token = board.apply_move_id(move, mover)
+            try:
+                best = best_scores[seat] if best_scores is not None else None
+                _, scores = self.maxn(board, depth - 1, next_seat(seat), best, seat, ply + 1)
+            finally:
+                board.undo(undo_token)
+            if best_scores is None or scores[seat] > best_scores[seat]:
+                best_move, best_scores = move, scores
+                self._pv_table[ply] = [move] + self._pv_table.get(ply + 1, [])
+            if bound is not None and best_scores[seat] >= bound:
+                self._record_node(ply, cutoff=True)
+                self.ordering.cutoff(move, ply, depth, index)
+                break
+        return best_move, best_scores
+
+    def search(self, board, depth):
+        """One search of the configured mode to depth; returns (move tuple, score)."""
+        if self.mode == "solo":
+            return self.minimax(board, depth, float('-inf'), float('inf'), True)
+        self._seats = seat_players(board, self, self._opponents)
+        placements = len(placement_table(board.size))
+        if self.ordering is None or len(self.ordering.history) != placements:
+            self.ordering = MoveOrdering(placements)
+        if self.mode == "paranoid":
+            move, score = self.paranoid(board, depth, float('-inf'), float('inf'), self.player_id)
+        else:
+            self._maxn_base = board.get_score()
+            move, scores = self.maxn(board, depth, self.player_id)
+            score = scores[self.player_id]
+        if move is None:
+            return None, score
+        return placement_table(board.size).to_move(move, self), score
+
+    def leaf_evaluation(self, board):
+        """evaluate_board, through the table's evaluation slots when there is a table."""
+        table = self.transposition_table
+        if table is None:
+            return self.evaluate_board(board)
+        # evaluate_board ignores the seat to move, so the key leaves it out
+        key = board.hash ^ turn_key(board.bitboards.to_move)
+        score = table.probe_evaluation(key)
+        if score is None:
+            score = self.evaluate_board(board)
+            table.store_evaluation(key, score)
+        return score
+
     def evaluate_board(self, board):
         """Evaluate the current board state"""
         # Count my pieces vs opponent pieces
-        my_pieces = np.sum(board.grid == self.player_id)
-        opponent_pieces = np.sum(board.grid != 0) - my_pieces
+        scores = board.get_score()
+        my_pieces = scores[self.player_id]
+        opponent_pieces = sum(scores.values()) - my_pieces
         
         # Look for valid moves I have
         valid_moves = len(self.find_all_valid_moves(board))
@@ -158,12 +417,60 @@ class MinimaxAI(Player):
         # Combined score favoring more pieces and more available moves
         return float(my_pieces - opponent_pieces + (0.5 * valid_moves))
 
-    def choose_move(self, board):
+    def iterative_deepening(self, board, time_limit):
+        """Search depth 1, 2, ... up to max_depth until time_limit seconds have passed.
+
+        Returns the best move of the deepest completed iteration. Each iteration
+        searches the previous one's principal variation first.
+        """
+        self._deadline = time.perf_counter() + time_limit
+        self._previous_pv = []
+        self.completed_depth = 0
+        best_move = None
+        try:
+            for depth in range(1, self.max_depth + 1):
+                move, _ = self.search(board, depth)
+                best_move = move
+                self.completed_depth = depth
+                logger.debug("Player %d completed depth %d: %s", self.player_id, depth, describe_move(move))
+                self._previous_pv = self._pv_table.get(0, [])
+                if move is None:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self._deadline = None
+            self._previous_pv = []
+        if best_move is None and self.completed_depth == 0:
+            # Not even depth 1 finished: fall back to the first legal move
+            valid_moves = self.legal_moves(board, self._context)
+            best_move = valid_moves[0] if valid_moves else None
+        return best_move
+
+    def choose_move(self, board, context=None):
         """Choose best move using minimax"""
-        debug_print("Starting minimax search")
+        started = time.perf_counter()
+        move = self.book_move(board)
+        if move is not None:
+            log_decision(self, 0, started, move, book=True)
+            return move
+        self.moves_considered = 0
+        self.nodes_per_ply, self.cutoffs_per_ply = [], []
+        self._static = {}
+        if self.ordering is not None:
+            self.ordering.new_search()
+        self._context = context if context is not None else TurnContext(board)
         
         # Use minimax for all other moves
-        best_move, _ = self.minimax(board, self.max_depth, float('-inf'), float('inf'), True)
-        if best_move:
-            debug_print("Selected move", best_move[1], best_move[2], best_move[3])
-        return best_move
\ No newline at end of file
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+        try:
+            if self.time_limit is not None:
+                best_move = self.iterative_deepening(board, self.time_limit)
+            else:
+                best_move, _ = self.search(board, self.max_depth)
+                self.completed_depth = self.max_depth
+        finally:
+            self._context = None
+        log_decision(self, self.moves_considered, started, best_move, depth=self.completed_depth)
+        return best_move
@@ -1,27 +1,52 @@
-from backend.board import Board
 from backend.piece import Piece
 from backend.player import Player
-import numpy as np
+from backend.evaluation import corner_counts, utilities, utility
+from backend.placements import placement_table
+from backend.zobrist import SEATS, next_seat
+from backend.diagnostics import log_decision
+from backend.algorithms.rollout import AnchorRollout
+from backend.algorithms.seats import seat_players
 from copy import deepcopy
 import random
 import math
+import logging
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Weight of each opened corner in the utility, as in GreedyAI
+CORNER_WEIGHT = 0.5
 
 class Node:
-    def __init__(self, board, player, move=None, parent=None):
-        self.board = board
-        self.player = player
-        self.move = move  # (original_piece, oriented_piece, x, y)
+    """One position in the search tree, reached by playing move from parent.
+
+    Nodes do not hold a board: the search walks a single board from the root
+    and replays the moves on the way down. A node's own moves are generated
+    the first time the search expands it, so leaves that are only simulated
+    once never pay for move generation.
+    """
+    __slots__ = ("move", "parent", "children", "visits", "value", "hash", "player", "untried_moves")
+
+    def __init__(self, move=None, parent=None, position_hash=0):
+        self.move = move  # Placement ID (see backend.placements)
         self.parent = parent
         self.children = []
         self.visits = 0
-        self.value = 0.0
-        self.untried_moves = player.find_all_valid_moves(board)
-        random.shuffle(self.untried_moves)  # Randomize move exploration
+        self.value = 0.0  # Total result from the point of view of the player who made move
+        self.hash = position_hash  # Identifies the position when the tree is reused
+        self.player = None  # The player to move, known once the moves are generated
+        self.untried_moves = None
+
+    def set_moves(self, player, moves, rng=random):
+        # Shuffled once so expansion can pop from the end in O(1)
+        rng.shuffle(moves)
+        self.player = player
+        self.untried_moves = moves
 
-    def add_child(self, move, board, player):
-        child = Node(board, player, move, self)
-        self.untried_moves.remove(move)
+    def add_child(self, move, position_hash):
+        child = Node(move, self, position_hash)
         self.children.append(child)
         return child
 
@@ -30,7 +55,7 @@ class Node:
         self.value += result
 
     def fully_expanded(self):
-        return len(self.untried_moves) == 0
+        return self.untried_moves is not None and len(self.untried_moves) == 0
 
     def best_child(self, c_param=1.414):
         if not self.children:
@@ -40,139 +65,299 @@ class Node:
                   for child in self.children]
         return self.children[choices.index(max(choices))]
 
+def _search_worker(board, player_id, pieces, simulation_time, seed, rollout):
+    # Runs in a pool process: grow a private tree and report its root children
+    ai = MonteCarloAI(player_id, pieces, simulation_time, seed=seed, rollout=rollout)
+    root = ai.grow_tree(board)
+    if root is None:
+        return 0, []
+    return ai.iterations, [(child.move, child.visits, child.value) for child in root.children]
+
 class MonteCarloAI(Player):
-    def __init__(self, player_id, pieces, simulation_time=30):
+    label = "monte carlo AI"
+    is_ai = True
+    move_attempts = 1
+
+    def __init__(self, player_id, pieces, simulation_time=30, workers=1, seed=None, rollout=None, book=None):
         super().__init__(player_id, pieces)
+        self.book = book
         self.simulation_time = simulation_time
+        # How leaves are played out and scored (see backend.algorithms.rollout)
+        self.rollout = rollout if rollout is not None else AnchorRollout()
+        # workers > 1 grows that many trees from the same root (one in this
+        # process) and merges their root statistics before choosing a move.
+        # The worker processes are started on first use and kept until close()
+        self.workers = workers
+        self._pool = None
+        self._futures = []  # Worker searches submitted to the pool and not yet collected
+        self.seed = seed
+        # Private, so seeding a search never touches the random module's global state
+        self.rng = random.Random(seed)
+        self.iterations = 0  # MCTS iterations run by the last search, across all workers
+        self.reused_visits = 0  # Visits carried over from the previous turn's tree
+        self._tree = None
+        self._context = None  # The TurnContext of the search in progress
+        self._seats = None
+        self._opponents = {}  # Stand-ins that play the other seats inside the tree
         self.board_center = (9.5, 9.5)  # Match GreedyAI's board center
 
     def count_valid_corners(self, piece, x, y, board):
         """Same corner counting logic as GreedyAI"""
-        test_board = Board(board.size)
-        test_board.grid = np.copy(board.grid)
-        test_board.place_piece(piece, x, y, self)
-        
-        valid_corners = set()
-        height, width = piece.shape.shape
-        
-        for i in range(height):
-            for j in range(width):
-                if piece.shape[i][j] == 1:
-                    diagonals = [
-                        (x + i + 1, y + j + 1),
-                        (x + i + 1, y + j - 1),
-                        (x + i - 1, y + j + 1),
-                        (x + i - 1, y + j - 1)
-                    ]
-                    
-                    for dx, dy in diagonals:
-                        if not (0 <= dx < board.size and 0 <= dy < board.size):
-                            continue
-                        if (dx, dy) in valid_corners:
-                            continue
-                        if test_board.grid[dx, dy] != 0:
-                            continue
-                        
-                        valid = True
-                        for adj_x, adj_y in [(dx-1, dy), (dx+1, dy), (dx, dy-1), (dx, dy+1)]:
-                            if (0 <= adj_x < board.size and 0 <= adj_y < board.size):
-                                if test_board.grid[adj_x, adj_y] == self.player_id:
-                                    valid = False
-                                    break
-                        
-                        if valid:
-                            valid_corners.add((dx, dy))
-        
-        return len(valid_corners)
+        return corner_counts(board, self, [(piece, x, y)])[0]
     
     def calculate_utility(self, piece, x, y, board):
         """Same utility calculation as GreedyAI"""
-        # Base score from number of tiles
-        tile_count = int(np.sum(piece.shape))
-        
-        # Calculate distance from closest tile to center
-        min_distance = float('inf')
-        height, width = piece.shape.shape
-        for i in range(height):
-            for j in range(width):
-                if piece.shape[i][j] == 1:
-                    tile_x, tile_y = x + i, y + j
-                    distance = (abs(tile_x - self.board_center[0]) + 
-                              abs(tile_y - self.board_center[1]))
-                    min_distance = min(min_distance, distance)
-        
-        # Count valid corners for future moves
-        corner_count = self.count_valid_corners(piece, x, y, board)
-        
-        return float(tile_count - min_distance + (0.5 * corner_count))
+        return utility(board, self, piece, x, y, self.board_center, CORNER_WEIGHT)
+
+    def score_moves(self, board, moves):
+        # calculate_utility of every (original_piece, piece, x, y) move in one batch
+        return utilities(board, self, [(piece, x, y) for _, piece, x, y in moves],
+                         self.board_center, CORNER_WEIGHT)
 
-    def choose_move(self, board):
-        return self.monte_carlo_search(board)
+    def choose_move(self, board, context=None):
+        started = time.perf_counter()
+        move = self.book_move(board)
+        if move is not None:
+            log_decision(self, 0, started, move, book=True)
+            return move
+        self._context = context
+        try:
+            move = self.monte_carlo_search(board)
+        finally:
+            self._context = None
+        root = self._tree
+        moves = len(root.children) + len(root.untried_moves or []) if root is not None else 0
+        log_decision(self, moves, started, move, iterations=self.iterations, reused=self.reused_visits)
+        return move
+
+    def seat_players(self, board):
+        """Map every seat to the player moving for it in the tree (see backend.algorithms.seats)."""
+        return seat_players(board, self, self._opponents)
+
+    def next_to_move(self, board, player):
+        """The next seat after player with a legal move, and its moves.
+
+        Seats without moves are passed over. If nobody can move the game is
+        over and the seat after player is returned with no moves.
+        """
+        seat = player.player_id
+        for _ in range(SEATS):
+            seat = next_seat(seat)
+            candidate = self._seats[seat]
+            moves = board.legal_move_ids(candidate)
+            if moves:
+                return candidate, moves
+        return self._seats[next_seat(player.player_id)], []
+
+    def expand_moves(self, node, board):
+        """Generate node's moves on its first expansion; board must be at node's position."""
+        if node.untried_moves is None:
+            if node.parent is None:
+                # A new root's moves come from the turn's context when there is one
+                if self._context is not None and self._context.board is board:
+                    table = placement_table(board.size)
+                    moves = [table.id_of(move) for move in self._context.legal_moves(self)]
+                else:
+                    moves = board.legal_move_ids(self)
+                node.set_moves(self, moves, self.rng)
+            else:
+                node.set_moves(*self.next_to_move(board, node.parent.player), self.rng)
+        return node.untried_moves
+
+    def reusable_subtree(self, board):
+        """The node of the previous tree for this position with us to move, or None.
+
+        Looks as deep as our own move plus one reply from every other seat.
+        """
+        if self._tree is None:
+            return None
+        self._seats = self.seat_players(board)
+        key = board.hash
+        level = [self._tree]
+        for _ in range(SEATS + 1):
+            for node in level:
+                if node.hash == key:
+                    # Same position as the board, so its moves can be generated here
+                    self.expand_moves(node, board)
+                    if node.player is self:
+                        return node
+            level = [child for node in level for child in node.children]
+        return None
 
     def monte_carlo_search(self, board):
-        root = Node(board, self)
+        # Carry the statistics for this position over from the previous turn
+        root = self.reusable_subtree(board)
+        if root is not None:
+            root.parent = None
+        self._tree = None
+        self.reused_visits = root.visits if root is not None else 0
+        logger.info("Player %d reused %d visits from the previous search", self.player_id, self.reused_visits)
+
+        if self.workers > 1:
+            root = self.parallel_tree(board, root)
+        else:
+            root = self.grow_tree(board, root)
+        if root is None:
+            return None
+        self._tree = root
+                
+        # Choose best move
+        best_child = root.best_child(c_param=0.0)
+        if best_child is not None and best_child.move is not None:
+            return placement_table(board.size).to_move(best_child.move, self)
+            
+        # If no moves found, return None
+        return None
+
+    def grow_tree(self, board, root=None):
+        """Run MCTS for simulation_time seconds and return the root, or None if there are no moves.
+
+        The tree alternates between all seats. Pass root to keep growing a tree
+        that was searched before.
+        """
+        self._seats = self.seat_players(board)
+        if root is None:
+            root = Node(position_hash=board.hash)
         
         # Ensure we expand at least one child
-        if not root.untried_moves:
+        if not self.expand_moves(root, board) and not root.children:
             return None
             
-        # Run MCTS for given time
+        # Run MCTS for given time, walking the one board with make/unmake
         end_time = time.time() + self.simulation_time
+        self.iterations = 0
+        batch_size = self.rollout.batch_size
         while time.time() < end_time:
-            node = root
-            board_copy = deepcopy(board)
-            
-            # Selection and Expansion
-            while node.untried_moves == [] and node.children != []:
-                node = node.best_child()
-                if node.move:
-                    board_copy.place_piece(node.move[1], node.move[2], node.move[3], self)
-            
-            # Expand
-            if node.untried_moves:
-                move = node.untried_moves[0]  # Take first untried move
-                board_copy.place_piece(move[1], move[2], move[3], self)
-                node = node.add_child(move, board_copy, self)
-                
-            # Simulation and Backpropagation
-            score = self.simulate(board_copy)
+            if batch_size > 1:
+                self.iterations += self.grow_batch(root, board, batch_size)
+                continue
+            undo_tokens = []
+            node, to_move = self.select_leaf(root, board, undo_tokens)
+            score = self.simulate(board, to_move)
             while node is not None:
-                node.update(score)
+                node.update(score if self.moved_into(node) else -score)
                 node = node.parent
-                
-        # Choose best move
-        best_child = root.best_child(c_param=0.0)
-        if best_child and best_child.move:
-            return best_child.move
-            
-        # If no moves found, return None
-        return None
 
-    def simulate(self, board):
-            simulation_board = deepcopy(board)
-            current_player = self
-            moves_count = 0
-            max_moves = 3  # Increased depth
-            total_utility = 0
-
-            while moves_count < max_moves:
-                valid_moves = current_player.find_all_valid_moves(simulation_board)
-                if not valid_moves:
-                    break
-
-                # Sort moves by utility and choose from top moves
-                moves_with_utility = [
-                    (move, self.calculate_utility(move[1], move[2], move[3], simulation_board))
-                    for move in valid_moves
-                ]
-                moves_with_utility.sort(key=lambda x: x[1], reverse=True)
-                top_moves = moves_with_utility[:10]  # Consider only top 5 moves
-                
-                # Choose randomly from top moves
-                move, utility = random.choice(top_moves)
-                total_utility += utility
-                
-                simulation_board.place_piece(move[1], move[2], move[3], current_player)
-                moves_count += 1
+            # Restore the root position for the next iteration
+            for undo_token in reversed(undo_tokens):
+                board.undo(undo_token)
+            self.iterations += 1
+        return root
+
+    def select_leaf(self, root, board, undo_tokens):
+        """Walk from root to a leaf, expanding it if it has untried moves.
+
+        The board is left at the leaf's position with undo_tokens holding the
+        way back. Returns the leaf and the seat to move there.
+        """
+        node = root
+        # Selection, replaying the tree's moves on the board
+        while not self.expand_moves(node, board) and node.children:
+            mover = node.player
+            node = node.best_child()
+            undo_tokens.append(board.apply_move_id(node.move, mover))
+
+        # Expand
+        if node.untried_moves:
+            move = node.untried_moves.pop()
+            undo_tokens.append(board.apply_move_id(move, node.player))
+            node = node.add_child(move, board.hash)
+
+        if node.player is not None:
+            return node, node.player.player_id
+        return node, next_seat(node.parent.player.player_id)
+
+    def moved_into(self, node):
+        # Whether we made the move into node; opponents count our gains as losses
+        mover = node.parent.player if node.parent is not None else self
+        return mover is self
+
+    def grow_batch(self, root, board, batch_size):
+        """One batch of MCTS iterations whose leaves are played out together.
+
+        Each leaf's path is visited as soon as it is selected, so the next
+        selections spread over other branches, and the results are added once
+        the rollout policy has played the whole batch out.
+        """
+        seats = self._seats
+        leaves, positions = [], []
+        for _ in range(batch_size):
+            undo_tokens = []
+            node, to_move = self.select_leaf(root, board, undo_tokens)
+            positions.append(self.rollout.capture(board, seats, to_move))
+            leaves.append(node)
+            while node is not None:
+                node.visits += 1
+                node = node.parent
+            for undo_token in reversed(undo_tokens):
+                board.undo(undo_token)
+
+        for node, score in zip(leaves, self.rollout.rollout_batch(positions, self, self.rng).tolist()):
+            while node is not None:
+                node.value += score if self.moved_into(node) else -score
+                node = node.parent
+        return len(leaves)
+
+    def parallel_tree(self, board, root=None):
+        """Root-parallel MCTS: grow independent trees in a process pool and merge their roots.
+
+        This process grows one of the trees itself, from root if one is passed.
+        If no pool can be started the search falls back to a single in-process tree.
+        """
+        seeds = [self.rng.getrandbits(32) for _ in range(1, self.workers)]
+        # Arguments are pickled by a background thread while this process is
+        # already searching (and mutating) the board, so hand over a frozen copy
+        snapshot = deepcopy(board)
+        try:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=len(seeds))
+            self._futures = [self._pool.submit(_search_worker, snapshot, self.player_id, list(self.pieces),
+                                               self.simulation_time, seed, self.rollout) for seed in seeds]
+            root = self.grow_tree(board, root)
+            results = [future.result() for future in self._futures]
+            self._futures = []
+        except (OSError, BrokenProcessPool) as error:
+            logger.warning("Process pool unavailable (%s); searching in-process", error)
+            self.close()
+            return self.grow_tree(board, root)
+        if root is None:
+            return None
+
+        children = {child.move: child for child in root.children}
+        untried = set(root.untried_moves)
+        untried_count = len(untried)
+        for iterations, child_stats in results:
+            self.iterations += iterations
+            for move, visits, value in child_stats:
+                child = children.get(move)
+                if child is None:
+                    # A move only the worker expanded: add it to our root first
+                    untried.remove(move)
+                    undo_token = board.apply_move_id(move, self)
+                    child = children[move] = root.add_child(move, board.hash)
+                    board.undo(undo_token)
+                child.visits += visits
+                child.value += value
+                root.visits += visits
+        if len(untried) != untried_count:
+            root.untried_moves = [move for move in root.untried_moves if move in untried]
+        return root
+
+    def close(self):
+        """Shut down the worker processes of the parallel search, if any were started."""
+        if self._pool is not None:
+            # Executor.shutdown(cancel_futures=True) needs Python 3.9, so drop
+            # the searches that have not started yet by hand
+            for future in self._futures:
+                future.cancel()
+            self._futures = []
+            self._pool.shutdown(wait=True)
+            self._pool = None
 
-            return total_utility
\ No newline at end of file
+    def simulate(self, board, to_move=None):
+        """Play the position out with the rollout policy, starting with seat to_move (default: us)."""
+        if self._seats is None:
+            self._seats = self.seat_players(board)
+        if to_move is None:
+            to_move = self.player_id
+        return self.rollout.rollout(board, self._seats, to_move, self, self.rng)
@@ -0,0 +1,83 @@
+"""
+Move ordering for MinimaxAI's four-player searches.
+
+Which moves a node searches is decided by their static utility alone: the
+best `width` of them, or all of them for a full-width search. The order in
+which they are tried then comes from what the search has learned:
+
+1. the moves the caller puts first: the previous iteration's principal
+   variation, then the transposition table's best move for the position,
+2. the killer moves of the ply: moves that caused a cutoff in a sibling,
+3. the history table: how much search depth each placement ID has cut off
+   anywhere in the tree (depth squared per cutoff),
+4. the static utility, for moves the search knows nothing about yet.
+
+Only the order changes with what the search learns, never the set of moves,
+so a search's score is the same as an unordered search of the same moves.
+"""
+
+import numpy as np
+
+# Killer moves kept per ply
+KILLERS = 2
+
+
+class MoveOrdering:
+    def __init__(self, placements):
+        self.history = np.zeros(placements, dtype=np.int64)  # Indexed by placement ID
+        self.killers = []  # Per ply, most recent first
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        # Old history still says something about the position, but less
+        self.history >>= 1
+        self.killers = []
+        self.cutoffs = self.first_move_cutoffs = 0
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def order(self, moves, scores, ply, first=None, width=None):
+        """moves (placement IDs with static scores) to search at ply, in the order to try them.
+
+        first is a move, or a list of moves, to try before all others.
+        """
+        moves = np.asarray(moves)
+        scores = np.asarray(scores, dtype=float)
+        if width is not None and len(moves) > width:
+            keep = np.argsort(-scores, kind="stable")[:width]
+            candidates, candidate_scores = moves[keep], scores[keep]
+        else:
+            candidates, candidate_scores = moves, scores
+        # History first, static score among equals; lexsort's last key is the primary one
+        ranked = candidates[np.lexsort((-candidate_scores, -self.history[candidates]))].tolist()
+
+        if first is None:
+            promoted = []
+        elif isinstance(first, list):
+            promoted = [move for move in first if move is not None]
+        else:
+            promoted = [first]
+        if ply < len(self.killers):
+            promoted += self.killers[ply]
+        front = []
+        for move in promoted:
+            if move in ranked and move not in front:
+                front.append(move)
+        return front + [move for move in ranked if move not in front]
+
+    def cutoff(self, move, ply, depth, index):
+        """Record that move, tried index-th at ply with depth plies left, caused a cutoff."""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        self.history[move] += depth * depth
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[KILLERS:]
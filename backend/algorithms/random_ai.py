@@ -0,0 +1,22 @@
+from backend.player import Player
+from backend.diagnostics import log_decision
+import random
+import time
+
+
+class RandomAI(Player):
+    """Plays a uniformly random legal move: the baseline for tournaments."""
+    label = "random AI"
+    is_ai = True
+    move_attempts = 1
+
+    def __init__(self, player_id, pieces, seed=None):
+        super().__init__(player_id, pieces)
+        self.rng = random.Random(seed)
+
+    def choose_move(self, board, context=None):
+        started = time.perf_counter()
+        valid_moves = self.legal_moves(board, context)
+        move = self.rng.choice(valid_moves) if valid_moves else None
+        log_decision(self, len(valid_moves), started, move)
+        return move
@@ -0,0 +1,177 @@
+import random
+
+from backend.bitboard import board_masks, iter_bits, popcount
+from backend.piece import pieces, orientations_of
+from backend.zobrist import SEATS, next_seat
+
+
+class RolloutPolicy:
+    """Plays a search leaf out and scores the result for one player.
+
+    seats maps every seat to the Player that moves for it, start_seat is the
+    seat to move at the leaf and player is the one the score is for. Random
+    choices come from rng (the random module unless a searcher passes its own
+    random.Random). A policy must leave the board and every inventory as it
+    found them.
+
+    A policy with batch_size > 1 also provides capture(board, seats,
+    start_seat) and rollout_batch(leaves, player, rng), and MonteCarloAI plays
+    its leaves out batch_size at a time (see backend.algorithms.batch_rollout).
+    """
+
+    batch_size = 1
+
+    def rollout(self, board, seats, start_seat, player, rng=random):
+        raise NotImplementedError
+
+
+class UtilityRollout(RolloutPolicy):
+    """Three moves by player alone, each picked from its ten best by calculate_utility.
+
+    This was MonteCarloAI's original simulation; it returns the summed utility.
+    """
+
+    def __init__(self, max_moves=3, top_moves=10):
+        self.max_moves = max_moves
+        self.top_moves = top_moves
+
+    def rollout(self, board, seats, start_seat, player, rng=random):
+        total_utility = 0.0
+        undo_tokens = []
+        for _ in range(self.max_moves):
+            valid_moves = player.find_all_valid_moves(board)
+            if not valid_moves:
+                break
+            moves_with_utility = list(zip(valid_moves, player.score_moves(board, valid_moves).tolist()))
+            moves_with_utility.sort(key=lambda x: x[1], reverse=True)
+            move, utility = rng.choice(moves_with_utility[:self.top_moves])
+            total_utility += utility
+            undo_tokens.append(board.apply_move(move, player))
+
+        for undo_token in reversed(undo_tokens):
+            board.undo(undo_token)
+        return total_utility
+
+
+def piece_priority(piece):
+    # Big pieces first, and among equals the awkward ones with fewer orientations
+    orientations = orientations_of(piece)
+    return orientations[0].tile_count * 10 - len(orientations)
+
+
+class AnchorRollout(RolloutPolicy):
+    """Every seat in turn plays a sampled move until nobody can move.
+
+    The player's pieces are tried in priority order and the first one that
+    fits anywhere is played at a random legal placement, found for all
+    origins at once from the anchor masks. No full move list is built and no
+    move is scored. Returns the player's final tile count minus the best
+    opponent's.
+
+    The playout never touches the board: it copies the occupancy, forbidden
+    and anchor masks of every seat and updates them per placement as
+    Bitboards.place does, without the hash, the grid or undo tokens. Pieces
+    of equal priority are put in a random order once per playout.
+    """
+
+    def __init__(self):
+        self.priorities = {name: piece_priority(piece) for name, piece in pieces.items()}
+
+    def _ordered(self, held, rng):
+        # random() only breaks ties between pieces of the same priority
+        return sorted(held, key=lambda piece: (-self.priorities.get(piece.name, 0), rng.random()))
+
+    def _choose(self, ordered, size, anchors, forbidden, occupied, free_corners, rng, unfit=None):
+        """(index in ordered, orientation, origin bit) of a random legal placement of the first piece that fits.
+
+        unfit maps pieces that did not fit to the seat's anchors at the time.
+        Any placement of theirs that is legal now must cover an anchor added
+        since, so only those anchors are tried. Pieces that do not fit are
+        recorded in unfit.
+        """
+        for position, piece in enumerate(ordered):
+            piece_anchors, piece_corners = anchors, free_corners
+            if unfit is not None and piece in unfit:
+                piece_anchors = anchors & ~unfit[piece]
+                if not piece_anchors:
+                    continue
+                piece_corners = 0
+            legal_masks = []
+            total = 0
+            for orientation in orientations_of(piece):
+                legal = orientation.masks(size).legal_origin_mask(piece_anchors, forbidden, occupied, piece_corners)
+                if legal:
+                    count = popcount(legal)
+                    legal_masks.append((orientation, legal, count))
+                    total += count
+            if not total:
+                if unfit is not None:
+                    unfit[piece] = anchors
+                continue
+            # Uniform over every placement of the piece, without listing them
+            pick = rng.randrange(total)
+            for orientation, legal, count in legal_masks:
+                if pick < count:
+                    for index in iter_bits(legal):
+                        if not pick:
+                            return position, orientation, index
+                        pick -= 1
+                pick -= count
+        return None
+
+    def sample_move(self, board, player, rng=random):
+        bitboards = board.bitboards
+        anchors = bitboards.anchors_for(player.player_id)
+        if not anchors:
+            return None
+        size = board.size
+        occupied = bitboards.occupied
+        ordered = self._ordered(player.pieces, rng)
+        chosen = self._choose(ordered, size, anchors, bitboards.forbidden_for(player.player_id), occupied,
+                              board_masks(size).corners & ~occupied, rng)
+        if chosen is None:
+            return None
+        position, orientation, index = chosen
+        x, y = divmod(index, size)
+        return ordered[position], orientation, x, y
+
+    def playout(self, board, seats, start_seat, rng=random):
+        """Play every seat to the end from start_seat; returns each seat's final tiles as a mask."""
+        bitboards = board.bitboards
+        size = board.size
+        corners = board_masks(size).corners
+        occupied = bitboards.occupied
+        owned = {seat: bitboards.owned(seat) for seat in seats}
+        forbidden = {seat: bitboards.forbidden_for(seat) for seat in seats}
+        anchors = {seat: bitboards.anchors_for(seat) for seat in seats}
+        held = {seat: self._ordered(player.pieces, rng) for seat, player in seats.items()}
+        unfit = {seat: {} for seat in seats}
+        stuck = set()  # Anchors only ever shrink, so a player who cannot move never will again
+        seat = start_seat
+        while len(stuck) < SEATS:
+            if seat not in stuck:
+                chosen = None
+                if anchors[seat]:
+                    chosen = self._choose(held[seat], size, anchors[seat], forbidden[seat], occupied,
+                                          corners & ~occupied, rng, unfit[seat])
+                if chosen is None:
+                    stuck.add(seat)
+                else:
+                    position, orientation, index = chosen
+                    unfit[seat].pop(held[seat][position], None)
+                    del held[seat][position]
+                    footprint, edge_halo, corner_halo = orientation.masks(size).origins[index]
+                    occupied |= footprint
+                    owned[seat] |= footprint
+                    for other in forbidden:
+                        forbidden[other] |= footprint
+                        anchors[other] &= ~footprint
+                    forbidden[seat] |= edge_halo
+                    anchors[seat] = ((anchors[seat] | corner_halo) & ~forbidden[seat]) | (corners & ~occupied)
+            seat = next_seat(seat)
+        return owned
+
+    def rollout(self, board, seats, start_seat, player, rng=random):
+        tiles = {seat: popcount(mask) for seat, mask in self.playout(board, seats, start_seat, rng).items()}
+        margin = tiles[player.player_id] - max(count for seat, count in tiles.items() if seat != player.player_id)
+        return float(margin)
@@ -0,0 +1,23 @@
+from backend.piece import pieces
+from backend.player import Player
+from backend.zobrist import SEATS
+
+
+def seat_players(board, player, opponents):
+    """Map every seat to the player moving for it in a search.
+
+    player plays its own seat. The other seats get stand-ins, kept in the
+    opponents dict between calls, holding whichever pieces the board says
+    they have not placed yet.
+    """
+    seats = {player.player_id: player}
+    for seat in range(1, SEATS + 1):
+        if seat == player.player_id:
+            continue
+        opponent = opponents.get(seat)
+        if opponent is None:
+            opponent = opponents[seat] = Player(seat, [])
+        used = board.pieces_used(seat)
+        opponent.pieces = [piece for name, piece in pieces.items() if name not in used]
+        seats[seat] = opponent
+    return seats
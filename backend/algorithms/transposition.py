@@ -0,0 +1,94 @@
+EXACT = 0
+LOWER_BOUND = 1  # Search failed high: the true score is at least `score`
+UPPER_BOUND = 2  # Search failed low: the true score is at most `score`
+
+
+class TTEntry:
+    __slots__ = ("key", "depth", "flag", "score", "best_move", "generation")
+
+    def __init__(self, key, depth, flag, score, best_move, generation):
+        self.key = key
+        self.depth = depth
+        self.flag = flag
+        self.score = score
+        self.best_move = best_move
+        self.generation = generation
+
+
+class TranspositionTable:
+    """Fixed-size table of search results keyed by Zobrist hash.
+
+    Slots are indexed by the low bits of the key and hold one entry each. On a
+    collision the stored entry is kept only if it comes from the current search
+    and is deeper than the new one; stale or shallower entries are replaced.
+
+    Leaf evaluations have their own slots, keyed by the position alone (no
+    side or seat to move), so a leaf reached by another move order or as a
+    max instead of a min node is evaluated once. They are always replaced.
+    """
+
+    def __init__(self, size=1 << 16):
+        slots = 1
+        while slots < size:
+            slots <<= 1
+        self.slots = [None] * slots
+        self.evaluations = [None] * slots  # (key, score) pairs
+        self.mask = slots - 1
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.replacements = 0
+        self.evaluation_hits = 0
+        self.evaluation_misses = 0
+
+    def new_search(self):
+        # Entries from earlier searches stay usable but lose replacement priority
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, flag, score, best_move):
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is not None and entry.key != key:
+            if entry.generation == self.generation and entry.depth > depth:
+                return
+            self.replacements += 1
+        self.slots[index] = TTEntry(key, depth, flag, score, best_move, self.generation)
+        self.stores += 1
+
+    def probe_evaluation(self, key):
+        entry = self.evaluations[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.evaluation_hits += 1
+            return entry[1]
+        self.evaluation_misses += 1
+        return None
+
+    def store_evaluation(self, key, score):
+        self.evaluations[key & self.mask] = (key, score)
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+        self.evaluations = [None] * len(self.slots)
+        self.hits = self.misses = self.stores = self.replacements = 0
+        self.evaluation_hits = self.evaluation_misses = 0
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "stores": self.stores,
+            "replacements": self.replacements,
+            "evaluation_hits": self.evaluation_hits,
+            "evaluation_misses": self.evaluation_misses,
+        }
@@ -2,6 +2,7 @@ import unittest
 from backend.board import Board
 from backend.piece import pieces
 from backend.algorithms.greedy import GreedyAI
+from backend.fixtures import ExhaustiveGreedyAI, mid_game_board
 
 class TestGreedyAI(unittest.TestCase):
     def setUp(self):
@@ -76,6 +77,13 @@ class TestGreedyAI(unittest.TestCase):
         move = self.ai.choose_move(self.board)
         self.assertIsNone(move)
 
+    def test_pruned_choice_matches_exhaustive(self):
+        for seed, turns in [(0, 0), (1, 8), (2, 20), (3, 36)]:
+            board, players = mid_game_board(seed=seed, turns=turns)
+            inventory = players[0].pieces
+            expected = ExhaustiveGreedyAI(1, list(inventory)).choose_move(board)
+            self.assertEqual(GreedyAI(1, list(inventory)).choose_move(board), expected)
+
     def tearDown(self):
         print("\n=== Test Complete ===\n")
 
@@ -2,10 +2,16 @@ import unittest
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from backend.algorithms.minimax import MinimaxAI
+from backend.algorithms.minimax import MinimaxAI, MODES
+from backend.algorithms.move_ordering import MoveOrdering
+from backend.zobrist import next_seat
+from backend.placements import placement_table
+from backend.fixtures import mid_game_board
 from backend.board import Board
 from backend.piece import pieces
 import numpy as np
+import time
+from unittest import mock
 
 class TestMinimaxAI(unittest.TestCase):
     def setUp(self):
@@ -60,12 +66,72 @@ class TestMinimaxAI(unittest.TestCase):
         self.assertIsNotNone(move)
         self.assertEqual(len(move), 4)  # Should return (original_piece, oriented_piece, x, y)
 
+    def test_search_leaves_board_untouched(self):
+        self.board.place_piece(pieces['I2'], 0, 0, self.ai)
+        grid = self.board.grid.copy()
+        inventory = list(self.ai.pieces)
+        self.ai.choose_move(self.board)
+        np.testing.assert_array_equal(self.board.grid, grid)
+        self.assertEqual(self.ai.pieces, inventory)
+
+    def test_iterative_deepening_meets_deadline(self):
+        self.board.place_piece(pieces['I2'], 0, 0, self.ai)
+        grid = self.board.grid.copy()
+        ai = MinimaxAI(1, list(pieces.values()), max_depth=8, time_limit=0.5)
+        start = time.perf_counter()
+        move = ai.choose_move(self.board)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 1.0)
+        self.assertIsNotNone(move)
+        self.assertTrue(self.board.is_valid(move[1], move[2], move[3], ai))
+        self.assertLess(ai.completed_depth, 8)
+        np.testing.assert_array_equal(self.board.grid, grid)
+        self.assertEqual(len(ai.pieces), 21)
+
+    def test_iterative_deepening_completes_shallow_search(self):
+        ai = MinimaxAI(1, self.pieces_list, max_depth=2, time_limit=60)
+        move = ai.choose_move(self.board)
+        self.assertIsNotNone(move)
+        self.assertEqual(ai.completed_depth, 2)
+
     def test_no_valid_moves(self):
         # Fill the board
         self.board.grid.fill(2)
         move = self.ai.choose_move(self.board)
         self.assertIsNone(move)
 
+    def test_stuck_player_returns_no_move_while_others_can_move(self):
+        board, players = mid_game_board(turns=8)
+        for mode in ("paranoid", "maxn"):
+            for time_limit in (None, 5):
+                ai = MinimaxAI(1, [], max_depth=2, mode=mode, time_limit=time_limit)
+                self.assertIsNone(ai.choose_move(board))
+
+    def test_deepening_searches_the_previous_principal_variation_first(self):
+        board, players = mid_game_board(turns=8)
+
+        class Recording(MinimaxAI):
+            def search(self, board, depth):
+                self.orders.append({})
+                result = super().search(board, depth)
+                self.pvs.append(list(self._pv_table.get(0, [])))
+                return result
+
+            def ordered_moves(self, board, player, moves, ply, first=None):
+                order = super().ordered_moves(board, player, moves, ply, first)
+                self.orders[-1].setdefault(ply, order)  # The first node of each ply lies on the PV
+                return order
+
+        for mode in ("paranoid", "maxn"):
+            ai = Recording(1, list(players[0].pieces), max_depth=3, time_limit=60, mode=mode)
+            ai.orders, ai.pvs = [], []
+            ai.choose_move(board)
+            self.assertEqual(ai.completed_depth, 3)
+            for previous_pv, orders in zip(ai.pvs, ai.orders[1:]):
+                self.assertEqual(len(previous_pv), len(orders) - 1)
+                for ply, move in enumerate(previous_pv):
+                    self.assertEqual(orders[ply][0], move)
+
     def test_strategic_placement(self):
         # Place an initial piece
         init_piece = pieces['I2']
@@ -84,5 +150,126 @@ class TestMinimaxAI(unittest.TestCase):
         placed_positions = np.where(self.board.grid == self.ai.player_id)
         self.assertTrue(len(placed_positions[0]) > 0)
 
+    def test_modes_leave_board_and_inventories_untouched(self):
+        board, players = mid_game_board(turns=8)
+        grid, position = board.grid.copy(), board.hash
+        for mode in MODES:
+            ai = MinimaxAI(1, list(players[0].pieces), max_depth=3, mode=mode)
+            move = ai.choose_move(board)
+            self.assertTrue(board.is_valid(move[1], move[2], move[3], ai))
+            self.assertIn(move[0], ai.pieces)
+            self.assertEqual(len(ai.pieces), len(players[0].pieces))
+            np.testing.assert_array_equal(board.grid, grid)
+            self.assertEqual(board.hash, position)
+            stats = ai.search_stats()
+            self.assertEqual(stats["mode"], mode)
+            self.assertEqual(stats["nodes"][0], 1)
+            self.assertEqual(len(stats["nodes"]), 4)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            MinimaxAI(1, self.pieces_list, mode="minimax")
+
+    def test_paranoid_opponents_really_move(self):
+        board, players = mid_game_board(turns=8)
+        ai = MinimaxAI(1, list(players[0].pieces), max_depth=2, tt_size=0, mode="paranoid")
+        ai.choose_move(board)
+        self.assertEqual(set(ai._seats), {1, 2, 3, 4})
+        self.assertIsNot(ai._seats[2], ai)
+        self.assertEqual(len(ai._seats[2].pieces), 21 - len(board.pieces_used(2)))
+        self.assertGreater(ai.nodes_per_ply[2], 0)
+
+    def test_paranoid_pruning_keeps_the_score(self):
+        board, players = mid_game_board(turns=8)
+        ai = MinimaxAI(1, list(players[0].pieces), max_depth=3, tt_size=0, mode="paranoid")
+
+        def full_width(depth, seat):
+            mover, moves = ai.next_mover(board, seat) if depth > 0 else (None, [])
+            if mover is None:
+                return ai.evaluate_board(board)
+            scores = []
+            for move in ai.ordered_moves(board, mover, moves, 0):
+                token = board.apply_move_id(move, mover)
+                scores.append(full_width(depth - 1, next_seat(mover.player_id)))
+                board.undo(token)
+            return max(scores) if mover is ai else min(scores)
+
+        _, score = ai.search(board, 3)
+        self.assertGreater(sum(ai.cutoffs_per_ply), 0)
+        self.assertEqual(score, full_width(3, 1))
+
+    def test_table_is_on_by_default_and_keeps_the_decision(self):
+        board, players = mid_game_board(turns=8)
+        self.assertIsNotNone(MinimaxAI(1, list(players[0].pieces)).transposition_table)
+        self.assertIsNone(MinimaxAI(1, list(players[0].pieces), tt_size=0).transposition_table)
+        for mode in ("paranoid", "maxn"):
+            plain = MinimaxAI(1, list(players[0].pieces), max_depth=3, time_limit=60, tt_size=0, mode=mode)
+            tabled = MinimaxAI(1, list(players[0].pieces), max_depth=3, time_limit=60, mode=mode)
+            self.assertEqual(plain.choose_move(board), tabled.choose_move(board))
+        plain = MinimaxAI(1, list(players[0].pieces), max_depth=3, mode="solo")
+        tabled = MinimaxAI(1, list(players[0].pieces), max_depth=3, tt_size=1 << 12, mode="solo")
+        self.assertEqual(plain.search(board, 3)[1], tabled.search(board, 3)[1])
+        tabled.transposition_table.new_search()
+        tabled.search(board, 3)
+        # A repeated search is answered from the table
+        self.assertGreater(tabled.transposition_table.stats()["hits"], 0)
+
+    def test_maxn_shallow_pruning_keeps_the_decision(self):
+        board, players = mid_game_board(turns=8)
+        for depth in (2, 3):
+            ai = MinimaxAI(1, list(players[0].pieces), max_depth=depth, mode="maxn")
+            move, score = ai.search(board, depth)
+            # The bound follows the path, so the last searched ply is pruned at any depth
+            self.assertGreater(ai.cutoffs_per_ply[depth - 1], 0)
+            with mock.patch("backend.algorithms.minimax.MAX_PIECE_TILES", float('inf')):  # No pruning
+                unpruned_move, scores = ai.maxn(board, depth, 1)
+            self.assertEqual(unpruned_move, placement_table().id_of(move))
+            self.assertEqual(scores[1], score)
+
+    def test_maxn_does_not_prune_when_the_parent_seat_moves_again(self):
+        board, players = mid_game_board(turns=8)
+        ai = MinimaxAI(1, list(players[0].pieces), max_depth=1, mode="maxn")
+        ai.search(board, 1)
+        for parent_seat, pruned in ((4, True), (1, False)):
+            ai.nodes_per_ply, ai.cutoffs_per_ply = [], []
+            ai.maxn(board, 1, 1, parent_best=0, parent_seat=parent_seat)
+            self.assertEqual(sum(ai.cutoffs_per_ply) > 0, pruned)
+
+    def test_full_width_searches_every_root_move(self):
+        board, players = mid_game_board(turns=8)
+        legal = len(players[0].find_all_valid_moves(board))
+        truncated = MinimaxAI(1, list(players[0].pieces), max_depth=2, tt_size=0)
+        truncated.search(board, 2)
+        self.assertEqual(truncated.nodes_per_ply[1], 10)
+        full = MinimaxAI(1, list(players[0].pieces), max_depth=2, tt_size=0, branching=None)
+        full.search(board, 2)
+        self.assertEqual(full.nodes_per_ply[1], legal)
+
+    def test_killers_and_history_come_first(self):
+        ordering = MoveOrdering(100)
+        moves, scores = [10, 20, 30, 40, 50], [5.0, 4.0, 3.0, 2.0, 1.0]
+        self.assertEqual(ordering.order(moves, scores, 0), moves)
+        self.assertEqual(ordering.order(moves, scores, 0, width=3), [10, 20, 30])
+        ordering.cutoff(40, 1, 2, 3)
+        ordering.cutoff(30, 0, 3, 2)
+        self.assertEqual(ordering.killers, [[30], [40]])
+        # Killer of the ply, then history, then static score; the hash move before all
+        self.assertEqual(ordering.order(moves, scores, 0), [30, 40, 10, 20, 50])
+        self.assertEqual(ordering.order(moves, scores, 1, first=50), [50, 40, 30, 10, 20])
+        # Learning reorders the searched moves but never widens them
+        self.assertEqual(ordering.order(moves, scores, 1, width=2), [10, 20])
+        self.assertEqual(ordering.first_move_cutoff_rate, 0.0)
+        ordering.new_search()
+        self.assertEqual((ordering.history[30], ordering.killers, ordering.cutoffs), (4, [], 0))
+
+    def test_first_move_cutoff_rate_is_reported(self):
+        board, players = mid_game_board(turns=8)
+        ai = MinimaxAI(1, list(players[0].pieces), max_depth=3)
+        ai.choose_move(board)
+        stats = ai.search_stats()
+        self.assertGreater(stats["first_move_cutoff_rate"], 0)
+        self.assertLessEqual(stats["first_move_cutoff_rate"], 1)
+        self.assertEqual(ai.ordering.cutoffs, stats["total_cutoffs"])
+
 if __name__ == '__main__':
     unittest.main()
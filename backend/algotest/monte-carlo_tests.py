@@ -1,6 +1,8 @@
+import random
 import unittest
 from backend.board import Board
 from backend.piece import pieces
+from backend.placements import placement_table
 from backend.algorithms.monte_carlo import MonteCarloAI, Node
 
 class TestMonteCarloAI(unittest.TestCase):
@@ -15,11 +17,17 @@ class TestMonteCarloAI(unittest.TestCase):
 
     def test_node_creation(self):
         print("\nTesting Node creation:")
-        node = Node(self.board, self.ai)
-        print("Node created with {0} untried moves".format(len(node.untried_moves)))
+        node = Node(position_hash=self.board.hash)
         self.assertIsInstance(node, Node)
         self.assertEqual(node.visits, 0)
         self.assertEqual(node.value, 0.0)
+        # Moves are only generated when the node is first expanded
+        self.assertIsNone(node.untried_moves)
+        moves = self.ai.expand_moves(node, self.board)
+        print("Node expanded with {0} untried moves".format(len(moves)))
+        self.assertIs(node.player, self.ai)
+        self.assertEqual(len(moves), len(self.ai.find_all_valid_moves(self.board)))
+        self.assertFalse(hasattr(node, "__dict__"))
 
     def test_calculate_utility(self):
         print("\nTesting calculate_utility:")
@@ -61,6 +69,65 @@ class TestMonteCarloAI(unittest.TestCase):
                 original_piece.name, x, y))
             self.assertTrue(self.board.is_valid(oriented_piece, x, y, self.ai))
 
+    def test_search_leaves_board_untouched(self):
+        self.board.place_piece(pieces['O4'], 0, 0, self.ai)
+        grid = self.board.grid.copy()
+        inventory = list(self.ai.pieces)
+        self.ai.monte_carlo_search(self.board)
+        self.assertGreater(self.ai.iterations, 0)
+        self.assertTrue((self.board.grid == grid).all())
+        self.assertEqual(self.ai.pieces, inventory)
+
+    def test_root_parallel_search(self):
+        self.board.place_piece(pieces['O4'], 0, 0, self.ai)
+        ai = MonteCarloAI(player_id=1, pieces=list(self.pieces), simulation_time=0.5, workers=2, seed=3)
+        move = ai.choose_move(self.board)
+        self.assertIsNotNone(move)
+        self.assertTrue(self.board.is_valid(move[1], move[2], move[3], ai))
+        self.assertIn(move[0], ai.pieces)
+        self.assertGreater(ai.iterations, 0)
+
+    def test_parallel_search_keeps_its_pool_and_global_random_state(self):
+        self.board.place_piece(pieces['O4'], 0, 0, self.ai)
+        ai = MonteCarloAI(player_id=1, pieces=list(self.pieces), simulation_time=0.2, workers=2, seed=3)
+        random.seed(11)
+        expected = random.random()
+        random.seed(11)
+        try:
+            ai.choose_move(self.board)
+            pool = ai._pool
+            ai.choose_move(self.board)
+            self.assertIs(ai._pool, pool)
+        finally:
+            ai.close()
+        self.assertIsNone(ai._pool)
+        self.assertEqual(random.random(), expected)
+
+    def test_reuses_subtree_after_own_move(self):
+        # With every board corner taken the other seats can never move, so the
+        # tree is all our moves and the next turn's position is one of its nodes
+        for x, y in [(0, 0), (0, 19), (19, 0), (19, 19)]:
+            self.board.place_piece(pieces['I1'], x, y, self.ai)
+        ai = MonteCarloAI(player_id=1, pieces=list(self.pieces), simulation_time=0.3, seed=1)
+        move = ai.choose_move(self.board)
+        self.assertEqual(ai.reused_visits, 0)
+        move_id = placement_table().id_of(move)
+        child = next(child for child in ai._tree.children if child.move == move_id)
+        self.assertGreater(child.visits, 0)
+        visits = child.visits
+
+        self.board.place_piece(move[1], move[2], move[3], ai)
+        ai.remove_piece(move[0])
+        ai.choose_move(self.board)
+        self.assertEqual(ai.reused_visits, visits)
+
+    def test_unknown_position_starts_fresh_tree(self):
+        self.ai.choose_move(self.board)
+        self.board.place_piece(pieces['I1'], 19, 19, MonteCarloAI(2, [], simulation_time=0))
+        self.board.place_piece(pieces['I2'], 0, 18, MonteCarloAI(3, [], simulation_time=0))
+        self.ai.choose_move(self.board)
+        self.assertEqual(self.ai.reused_visits, 0)
+
     def test_no_valid_moves(self):
         print("\nTesting no_valid_moves:")
         self.board.grid.fill(2)  # Fill with opponent's pieces
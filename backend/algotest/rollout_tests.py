@@ -0,0 +1,125 @@
+import unittest
+import random
+import numpy as np
+from backend.board import Board
+from backend.piece import pieces
+from backend.player import Player
+from backend.algorithms.rollout import AnchorRollout, UtilityRollout
+from backend.algorithms.batch_rollout import BatchRollout, legal_origins, orientation_rows, popcount, _table_popcount
+from backend.bitboard import popcount as bitboard_popcount
+from backend.fixtures import mid_game_board
+from backend.piece import PIECE_ORIENTATIONS
+from backend.placements import PIECE_NAMES
+from backend.algorithms.monte_carlo import MonteCarloAI
+
+class TestAnchorRollout(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.board = Board(size=20)
+        self.seats = {i: Player(i, list(pieces.values())) for i in range(1, 5)}
+        self.rollout = AnchorRollout()
+
+    def test_sampled_move_is_legal_and_largest(self):
+        move = self.rollout.sample_move(self.board, self.seats[1])
+        original_piece, orientation, x, y = move
+        self.assertTrue(self.board.is_valid(orientation, x, y, self.seats[1]))
+        self.assertEqual(orientation.tile_count, 5)
+
+    def test_no_anchor_no_move(self):
+        for x, y in [(0, 0), (0, 19), (19, 0), (19, 19)]:
+            self.board.place_piece(pieces['I1'], x, y, self.seats[1])
+        self.assertIsNone(self.rollout.sample_move(self.board, self.seats[2]))
+
+    def test_rollout_leaves_position_untouched(self):
+        self.board.place_piece(pieces['O4'], 0, 0, self.seats[1])
+        grid = self.board.grid.copy()
+        board_hash = self.board.hash
+        inventories = {seat: list(player.pieces) for seat, player in self.seats.items()}
+        margin = self.rollout.rollout(self.board, self.seats, 2, self.seats[1])
+        self.assertIsInstance(margin, float)
+        np.testing.assert_array_equal(self.board.grid, grid)
+        self.assertEqual(self.board.hash, board_hash)
+        for seat, player in self.seats.items():
+            self.assertEqual(player.pieces, inventories[seat])
+
+    def test_rollout_plays_to_game_end(self):
+        owned = self.rollout.playout(self.board, self.seats, 1)
+        masks = list(owned.values())
+        tiles = {seat: bitboard_popcount(mask) for seat, mask in owned.items()}
+        before = {seat: bitboard_popcount(self.board.bitboards.owned(seat)) for seat in owned}
+        # No tile is claimed twice, and the board is left alone
+        self.assertEqual(sum(tiles.values()), bitboard_popcount(sum(masks)))
+        self.assertEqual(self.board.get_score(), before)
+        # Far more than a few plies, and every seat takes part
+        for seat in owned:
+            self.assertGreater(tiles[seat], before[seat])
+        self.assertGreater(sum(tiles.values()), sum(before.values()) + 40)
+
+    def test_skipping_unfit_pieces_plays_the_same_game(self):
+        board, players = mid_game_board(turns=12)
+        seats = {player.player_id: player for player in players}
+
+        class FullCheck(AnchorRollout):
+            def _choose(self, *args, unfit=None):
+                return super()._choose(*args[:7])
+
+        for seed in range(5):
+            self.assertEqual(self.rollout.playout(board, seats, 1, random.Random(seed)),
+                             FullCheck().playout(board, seats, 1, random.Random(seed)))
+
+class TestBatchRollout(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.board, players = mid_game_board(turns=20)
+        self.seats = {player.player_id: player for player in players}
+        self.rollout = BatchRollout(batch_size=8)
+
+    def test_legal_origins_match_the_bitboards(self):
+        table = orientation_rows(20)
+        orientations = [o for name in PIECE_NAMES for o in PIECE_ORIENTATIONS[name]]
+        owned, _, _ = self.rollout.capture(self.board, self.seats, 1)
+        legal = legal_origins(table, owned[None].repeat(4, axis=0), np.arange(4), np.arange(4))
+        for seat in range(4):
+            for index, orientation in enumerate(orientations):
+                mask = sum(int(row) << (x * 20) for x, row in enumerate(legal[index, seat]))
+                self.assertEqual(mask, self.board.legal_origin_mask(orientation, seat + 1))
+
+    def test_batch_plays_every_leaf_to_the_end(self):
+        grid, board_hash = self.board.grid.copy(), self.board.hash
+        leaves = [self.rollout.capture(self.board, self.seats, seat) for seat in (1, 2, 3, 4)]
+        margins = self.rollout.rollout_batch(leaves, self.seats[1])
+        self.assertEqual(margins.shape, (4,))
+        np.testing.assert_array_equal(self.board.grid, grid)
+        self.assertEqual(self.board.hash, board_hash)
+        # The captured leaves are played out on copies
+        owned = np.stack([leaf[0] for leaf in leaves])
+        self.assertEqual(int(popcount(owned).sum()), 4 * sum(self.board.get_score().values()))
+        self.assertTrue(all(-89 <= margin <= 89 for margin in margins))
+
+    def test_table_popcount_matches_bit_counts(self):
+        rows = np.array([0, 1, 0xFFFF, 0x10000, 0xFFFFF, 0xFFFFFFFF, 0x12345678], dtype=np.uint32)
+        self.assertEqual(_table_popcount(rows).tolist(), [bin(int(row)).count("1") for row in rows])
+
+    def test_single_rollout_matches_the_policy_interface(self):
+        margin = self.rollout.rollout(self.board, self.seats, 1, self.seats[1])
+        self.assertIsInstance(margin, float)
+
+    def test_monte_carlo_backs_up_whole_batches(self):
+        ai = MonteCarloAI(1, list(self.seats[1].pieces), simulation_time=0.3, rollout=self.rollout)
+        move = ai.choose_move(self.board)
+        self.assertTrue(self.board.is_valid(move[1], move[2], move[3], ai))
+        self.assertEqual(ai.iterations % 8, 0)
+        self.assertEqual(ai._tree.visits, ai.iterations)
+        self.assertEqual(sum(child.visits for child in ai._tree.children), ai.iterations)
+
+class TestRolloutPolicies(unittest.TestCase):
+    def test_monte_carlo_takes_a_policy(self):
+        board = Board(size=20)
+        ai = MonteCarloAI(1, [pieces['I5'], pieces['O4'], pieces['L4']], simulation_time=0.2,
+                          rollout=UtilityRollout(max_moves=1))
+        self.assertIsInstance(ai.simulate(board), float)
+        move = ai.choose_move(board)
+        self.assertTrue(board.is_valid(move[1], move[2], move[3], ai))
+
+if __name__ == '__main__':
+    unittest.main()
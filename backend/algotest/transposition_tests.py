@@ -0,0 +1,44 @@
+import unittest
+from backend.algorithms.transposition import TranspositionTable, EXACT, LOWER_BOUND
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(size=8)
+
+    def test_size_rounds_to_power_of_two(self):
+        self.assertEqual(len(TranspositionTable(size=100).slots), 128)
+
+    def test_store_and_probe(self):
+        self.table.store(42, 3, EXACT, 1.5, "move")
+        entry = self.table.probe(42)
+        self.assertEqual((entry.depth, entry.flag, entry.score, entry.best_move), (3, EXACT, 1.5, "move"))
+        self.assertIsNone(self.table.probe(43))
+        self.assertEqual(self.table.stats()["hits"], 1)
+        self.assertEqual(self.table.stats()["misses"], 1)
+
+    def test_deeper_entry_survives_collision_in_same_search(self):
+        self.table.store(1, 4, EXACT, 1.0, None)
+        self.table.store(9, 2, LOWER_BOUND, 2.0, None)  # Same slot, shallower
+        self.assertIsNotNone(self.table.probe(1))
+        self.assertIsNone(self.table.probe(9))
+
+    def test_stale_entry_is_replaced(self):
+        self.table.store(1, 4, EXACT, 1.0, None)
+        self.table.new_search()
+        self.table.store(9, 2, EXACT, 2.0, None)
+        self.assertIsNone(self.table.probe(1))
+        self.assertEqual(self.table.probe(9).score, 2.0)
+        self.assertEqual(self.table.stats()["replacements"], 1)
+
+    def test_evaluations_have_their_own_slots(self):
+        self.table.store(1, 4, EXACT, 1.0, None)
+        self.table.store_evaluation(1, 7.5)
+        self.assertEqual(self.table.probe_evaluation(1), 7.5)
+        self.assertEqual(self.table.probe(1).score, 1.0)
+        self.table.store_evaluation(9, 2.0)  # Same slot: evaluations are always replaced
+        self.assertIsNone(self.table.probe_evaluation(1))
+        stats = self.table.stats()
+        self.assertEqual((stats["evaluation_hits"], stats["evaluation_misses"]), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
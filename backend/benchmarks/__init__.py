@@ -0,0 +1 @@
+# Empty file, just needs to exist
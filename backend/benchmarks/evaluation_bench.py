@@ -0,0 +1,36 @@
+import sys
+import os
+import time
+
+# Add the parent directory of 'backend' to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.evaluation import utilities
+from backend.fixtures import legacy_utility, mid_game_board
+
+"""
+BENCHMARK COMMAND
+python3 backend/benchmarks/evaluation_bench.py
+"""
+
+def main(turns=(0, 24, 48)):
+    for turn_count in turns:
+        board, players = mid_game_board(turns=turn_count)
+        player = players[0]
+        moves = player.find_all_valid_moves(board)
+        placements = [(piece, x, y) for _, piece, x, y in moves]
+
+        start = time.perf_counter()
+        before = [legacy_utility(player, piece, x, y, board) for piece, x, y in placements]
+        before_time = time.perf_counter() - start
+        start = time.perf_counter()
+        after = utilities(board, player, placements)
+        after_time = time.perf_counter() - start
+
+        assert before == after.tolist(), "batch scoring disagrees with the per-move utility"
+        print(f"After {turn_count:2d} turns: {len(moves):4d} moves | per move {before_time * 1000:8.1f} ms | "
+              f"batch {after_time * 1000:6.2f} ms | {before_time / after_time:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
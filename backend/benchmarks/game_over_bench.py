@@ -0,0 +1,42 @@
+import sys
+import os
+import time
+
+# Add the parent directory of 'backend' to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.fixtures import mid_game_board
+
+"""
+BENCHMARK COMMAND
+python3 backend/benchmarks/game_over_bench.py
+"""
+
+def enumerate_check(board, players):
+    """The game-over test GameManager used before: list every move of every player."""
+    return not any(player.find_all_valid_moves(board) for player in players)
+
+
+def early_exit_check(board, players):
+    return not any(player.has_valid_move(board) for player in players)
+
+
+def rate(check, positions, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [check(board, players) for board, players in positions]
+    return (time.perf_counter() - start) / (repeat * len(positions)), results
+
+
+def main(turns=(0, 24, 48, 72, 200), seeds=range(4), repeat=5):
+    for turn_count in turns:
+        positions = [mid_game_board(seed=seed, turns=turn_count) for seed in seeds]
+        before, expected = rate(enumerate_check, positions, 1)
+        after, results = rate(early_exit_check, positions, repeat)
+        assert results == expected, "early exit disagrees with full enumeration"
+        print(f"After {turn_count:3d} turns: enumerate {before * 1e6:10.1f} us | "
+              f"early exit {after * 1e6:8.1f} us | {before / after:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
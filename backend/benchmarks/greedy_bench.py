@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+
+# Add the parent directory of 'backend' to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.algorithms.greedy import GreedyAI
+from backend.fixtures import ExhaustiveGreedyAI, legacy_utility, mid_game_board
+
+"""
+BENCHMARK COMMAND
+python3 backend/benchmarks/greedy_bench.py
+"""
+
+class PerMoveGreedyAI(ExhaustiveGreedyAI):
+    """Scores every legal move one at a time with the old board-copying utility."""
+
+    def score_moves(self, board, moves):
+        return [legacy_utility(self, piece, x, y, board) for _, piece, x, y in moves]
+
+
+def main(seeds=range(4), turns=(0, 8, 16, 24, 32, 40)):
+    positions = [mid_game_board(seed=seed, turns=turn_count) for seed in seeds for turn_count in turns]
+    boards = [board for board, _ in positions]
+    pieces = [players[0].pieces for _, players in positions]
+    # Move generation is shared by all of them, so time it on its own too. The
+    # first query fills each board's move cache, which every AI below reads back
+    for board, inventory in zip(boards, pieces):
+        GreedyAI(1, list(inventory)).find_all_valid_moves(board)
+    start = time.perf_counter()
+    for board, inventory in zip(boards, pieces):
+        GreedyAI(1, list(inventory)).find_all_valid_moves(board)
+    generation = time.perf_counter() - start
+
+    results = {}
+    runs = (("Per-move", PerMoveGreedyAI), ("Exhaustive", ExhaustiveGreedyAI), ("Bound-pruned", GreedyAI))
+    for label, ai_class in runs:
+        start = time.perf_counter()
+        moves = [ai_class(1, list(inventory)).choose_move(board) for board, inventory in zip(boards, pieces)]
+        results[label] = (time.perf_counter() - start, moves)
+    assert results["Per-move"][1] == results["Exhaustive"][1] == results["Bound-pruned"][1], \
+        "pruning changed a decision"
+
+    print(f"{len(boards)} positions, cached move lookup {generation * 1000 / len(boards):.2f} ms/decision")
+    for label, (elapsed, _) in results.items():
+        per_decision = elapsed * 1000 / len(boards)
+        print(f"{label:14s} {per_decision:7.2f} ms/decision | {per_decision - generation * 1000 / len(boards):7.2f} ms scoring")
+
+
+if __name__ == "__main__":
+    main()
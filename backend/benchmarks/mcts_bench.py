@@ -0,0 +1,110 @@
+import sys
+import os
+import random
+import time
+import tracemalloc
+from copy import deepcopy
+
+# Add the parent directory of 'backend' to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.board import Board
+from backend.piece import pieces
+from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.benchmarks.mcts_node_bench import EagerNode
+from backend.fixtures import mid_game_board
+
+"""
+BENCHMARK COMMAND
+python3 backend/benchmarks/mcts_bench.py
+"""
+
+class CopyingMonteCarloAI(MonteCarloAI):
+    """The deepcopy-per-iteration search that make/unmake replaced, kept as the baseline."""
+
+    def monte_carlo_search(self, board):
+        root = EagerNode(board, self)
+        if not root.untried_moves:
+            return None
+        end_time = time.time() + self.simulation_time
+        self.iterations = 0
+        while time.time() < end_time:
+            node = root
+            board_copy = deepcopy(board)
+            while node.untried_moves == [] and node.children != []:
+                node = node.best_child()
+                if node.move:
+                    board_copy.place_piece(node.move[1], node.move[2], node.move[3], self)
+            if node.untried_moves:
+                move = node.untried_moves[0]
+                board_copy.place_piece(move[1], move[2], move[3], self)
+                node = node.add_child(move, board_copy, self)
+            score = self.simulate(board_copy)
+            while node is not None:
+                node.update(score)
+                node = node.parent
+            self.iterations += 1
+        best_child = root.best_child(c_param=0.0)
+        return best_child.move if best_child else None
+
+    def simulate(self, board):
+        simulation_board = deepcopy(board)
+        total_utility = 0
+        for _ in range(3):
+            valid_moves = self.find_all_valid_moves(simulation_board)
+            if not valid_moves:
+                break
+            scored = sorted(((move, self.calculate_utility(move[1], move[2], move[3], simulation_board))
+                             for move in valid_moves), key=lambda item: item[1], reverse=True)
+            move, utility = random.choice(scored[:10])
+            total_utility += utility
+            simulation_board.place_piece(move[1], move[2], move[3], self)
+        return total_utility
+
+
+class BoardCopyCounter:
+    """Count Board copies (every deepcopy goes through __getstate__) while active."""
+
+    def __enter__(self):
+        self.copies = 0
+        self._original = Board.__getstate__
+
+        def counting_getstate(board):
+            self.copies += 1
+            return self._original(board)
+
+        Board.__getstate__ = counting_getstate
+        return self
+
+    def __exit__(self, *exc_info):
+        Board.__getstate__ = self._original
+
+
+def measure(ai_class, board, seconds):
+    ai = ai_class(1, list(pieces.values()), simulation_time=seconds)
+    random.seed(0)
+    start = time.perf_counter()
+    ai.monte_carlo_search(board)
+    rate = ai.iterations / (time.perf_counter() - start)
+
+    # Second, traced run for allocation figures (tracemalloc slows the loop down)
+    random.seed(0)
+    tracemalloc.start()
+    with BoardCopyCounter() as counter:
+        ai.monte_carlo_search(board)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rate, counter.copies / max(ai.iterations, 1), peak
+
+
+def main(seconds=5.0):
+    board, players = mid_game_board(turns=8)
+    print(f"MCTS loop on a {sum(board.get_score().values())}-tile board, {seconds:.0f}s per search")
+    for label, ai_class in (("Before (deepcopy)", CopyingMonteCarloAI), ("After (make/unmake)", MonteCarloAI)):
+        rate, copies, peak = measure(ai_class, board, seconds)
+        print(f"{label:20s} {rate:8.1f} iterations/sec | {copies:5.2f} board copies/iteration | "
+              f"peak {peak / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import sys
+import os
+import math
+import random
+import time
+import tracemalloc
+
+# Add the parent directory of 'backend' to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.piece import pieces
+from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.fixtures import mid_game_board
+
+"""
+BENCHMARK COMMAND
+python3 backend/benchmarks/mcts_node_bench.py
+"""
+
+class EagerNode:
+    """The node lazy, slot-based nodes replaced, kept as the baseline.
+
+    Generates and shuffles its moves on creation, keeps a board reference and
+    removes expanded moves with a list scan.
+    """
+
+    def __init__(self, board, player, move=None, parent=None, untried_moves=None):
+        self.board = board
+        self.player = player
+        self.move = move
+        self.parent = parent
+        self.hash = board.hash
+        self.children = []
+        self.visits = 0
+        self.value = 0.0
+        if untried_moves is None:
+            untried_moves = player.find_all_valid_moves(board)
+        self.untried_moves = untried_moves
+        random.shuffle(self.untried_moves)
+
+    def add_child(self, move, board, player, untried_moves=None):
+        child = EagerNode(board, player, move, self, untried_moves)
+        self.untried_moves.remove(move)
+        self.children.append(child)
+        return child
+
+    def update(self, result):
+        self.visits += 1
+        self.value += result
+
+    def best_child(self, c_param=1.414):
+        if not self.children:
+            return None
+        choices = [(child.value / child.visits) + c_param *
+                   math.sqrt(2 * math.log(self.visits) / child.visits)
+                   for child in self.children]
+        return self.children[choices.index(max(choices))]
+
+
+class EagerMonteCarloAI(MonteCarloAI):
+    def grow_tree(self, board, root=None):
+        self._seats = self.seat_players(board)
+        root = EagerNode(board, self, untried_moves=board.legal_move_ids(self))
+        if not root.untried_moves:
+            return None
+        end_time = time.time() + self.simulation_time
+        self.iterations = 0
+        while time.time() < end_time:
+            node = root
+            undo_tokens = []
+            while node.untried_moves == [] and node.children != []:
+                mover = node.player
+                node = node.best_child()
+                undo_tokens.append(board.apply_move_id(node.move, mover))
+            if node.untried_moves:
+                move = node.untried_moves[0]
+                undo_tokens.append(board.apply_move_id(move, node.player))
+                node = node.add_child(move, board, *self.next_to_move(board, node.player))
+            score = self.simulate(board)
+            while node is not None:
+                mover = node.parent.player if node.parent is not None else self
+                node.update(score if mover is self else -score)
+                node = node.parent
+            for undo_token in reversed(undo_tokens):
+                board.undo(undo_token)
+            self.iterations += 1
+        return root
+
+
+class FlatRollout:
+    """Mixin replacing the rollout with a constant, leaving only tree work to time."""
+
+    def simulate(self, board, to_move=None):
+        return 0.0
+
+
+class FlatEagerMonteCarloAI(FlatRollout, EagerMonteCarloAI):
+    pass
+
+
+class FlatMonteCarloAI(FlatRollout, MonteCarloAI):
+    pass
+
+
+def count_nodes(root):
+    count, stack = 0, [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def measure(ai_class, board, seconds):
+    ai = ai_class(1, list(pieces.values()), simulation_time=seconds)
+    random.seed(0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    root = ai.grow_tree(board)
+    elapsed = time.perf_counter() - start
+    # Memory still held once the search is over is the tree itself
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = count_nodes(root)
+    return nodes / elapsed, held / nodes, ai.iterations / elapsed
+
+
+def main(seconds=30.0):
+    board, players = mid_game_board(turns=8)
+    print(f"MCTS tree on a {sum(board.get_score().values())}-tile board, {seconds:.0f}s per search")
+    runs = (("Eager nodes", EagerMonteCarloAI), ("Lazy slot nodes", MonteCarloAI),
+            ("Eager, no rollout", FlatEagerMonteCarloAI), ("Lazy, no rollout", FlatMonteCarloAI))
+    for label, ai_class in runs:
+        expansions, per_node, iterations = measure(ai_class, board, seconds)
+        print(f"{label:18s} {expansions:8.1f} expansions/sec | {iterations:8.1f} iterations/sec | "
+              f"{per_node:8.0f} bytes/node")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import sys
+import os
+import time
+
+# Add the parent directory of 'backend' to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.fixtures import mid_game_board
+
+"""
+BENCHMARK COMMAND
+python3 backend/benchmarks/mcts_parallel_bench.py
+"""
+
+def playouts_per_second(board, pieces, workers, seconds):
+    ai = MonteCarloAI(1, list(pieces), simulation_time=seconds, workers=workers, seed=0)
+    start = time.perf_counter()
+    ai.choose_move(board)
+    return ai.iterations / (time.perf_counter() - start)
+
+
+def main(seconds=5.0):
+    board, players = mid_game_board(turns=8)
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores} if cores > 1 else {1, 2})
+    print(f"Root-parallel MCTS, {seconds:.0f}s per search, {cores} cores available")
+    baseline = None
+    for workers in worker_counts:
+        rate = playouts_per_second(board, players[0].pieces, workers, seconds)
+        baseline = baseline or rate
+        print(f"{workers:3d} workers: {rate:8.1f} playouts/sec ({rate / baseline:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
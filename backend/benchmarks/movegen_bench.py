@@ -0,0 +1,68 @@
+import sys
+import os
+import random
+import time
+
+# Add the parent directory of 'backend' to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.board import Board
+from backend.piece import pieces
+from backend.player import Player
+from backend.fixtures import mid_game_board, scan_all_origins
+
+"""
+BENCHMARK COMMAND
+python3 backend/benchmarks/movegen_bench.py
+"""
+
+def timed(generate, board, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        moves = generate(board)
+    return (time.perf_counter() - start) / repeat, moves
+
+
+def self_play(seed=0):
+    """Every player's moves after every turn of a random game: regenerated vs cached."""
+    rng = random.Random(seed)
+    board = Board()
+    players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+    fresh = cached = 0.0
+    for turn in range(84):
+        for player in players:
+            start = time.perf_counter()
+            expected = board.generate_moves(player)
+            fresh += time.perf_counter() - start
+            start = time.perf_counter()
+            moves = player.find_all_valid_moves(board)
+            cached += time.perf_counter() - start
+            assert moves == expected, "move cache disagrees with regeneration"
+        player = players[turn % 4]
+        moves = player.find_all_valid_moves(board)
+        if moves:
+            original_piece, piece, x, y = rng.choice(moves)
+            board.place_piece(piece, x, y, player)
+            player.remove_piece(original_piece)
+    queries, reused, generated = board.move_cache_stats()
+    return fresh, cached, queries, reused / (reused + generated)
+
+
+def main(repeat=20):
+    for turns in (0, 24, 48):
+        board, players = mid_game_board(turns=turns)
+        player = players[0]
+        before, scanned = timed(lambda b: scan_all_origins(player, b), board, max(repeat // 10, 1))
+        after, anchored = timed(lambda b: b.generate_moves(player), board, repeat)
+        assert scanned == anchored, "anchor-based generation disagrees with the full scan"
+        print(f"After {turns:2d} turns: {len(anchored):4d} moves | "
+              f"full scan {before * 1000:8.2f} ms | anchors {after * 1000:7.2f} ms | "
+              f"{before / after:5.1f}x")
+
+    fresh, cached, queries, hit_rate = self_play()
+    print(f"Self-play, {queries} queries: regenerate {fresh * 1000:7.1f} ms | "
+          f"cached {cached * 1000:7.1f} ms | {fresh / cached:5.1f}x | {hit_rate:.0%} of moves reused")
+
+
+if __name__ == "__main__":
+    main()
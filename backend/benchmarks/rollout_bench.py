@@ -0,0 +1,66 @@
+import sys
+import os
+import random
+import time
+
+# Add the parent directory of 'backend' to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.piece import pieces
+from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.algorithms.rollout import AnchorRollout, UtilityRollout
+from backend.algorithms.batch_rollout import BatchRollout
+from backend.fixtures import mid_game_board
+
+"""
+BENCHMARK COMMAND
+python3 backend/benchmarks/rollout_bench.py
+
+The anchor rollout was meant to play thousands of complete games per second.
+On one core it plays a few hundred from the empty board and under a thousand
+from mid-game, and the report says whether the goal is met. Batching plays
+10-40% more than AnchorRollout at its best size (96, the default), and
+less past it, since the arrays then spill out of cache. Single runs vary by
+as much as that on a busy machine.
+"""
+
+GOAL = 1000  # Complete playouts per second per core
+
+def playout_rate(ai, board, seconds):
+    random.seed(0)
+    playouts = 0
+    start = time.perf_counter()
+    if ai.rollout.batch_size > 1:
+        # The same leaf batch_size times, played out in one call
+        leaves = [ai.rollout.capture(board, ai.seat_players(board), ai.player_id)] * ai.rollout.batch_size
+    while time.perf_counter() - start < seconds:
+        if ai.rollout.batch_size > 1:
+            ai.rollout.rollout_batch(leaves, ai)
+            playouts += len(leaves)
+        else:
+            ai.simulate(board)
+            playouts += 1
+    return playouts / (time.perf_counter() - start)
+
+
+def main(seconds=5.0):
+    for turns in (0, 24):
+        board, players = mid_game_board(turns=turns)
+        print(f"From a {sum(board.get_score().values())}-tile board:")
+        policies = (("Utility, 3 plies", UtilityRollout()), ("Anchor, to game end", AnchorRollout()),
+                    ("Batched anchor, x64", BatchRollout(64)), ("Batched anchor, x96", BatchRollout(96)),
+                    ("Batched anchor, x256", BatchRollout(256)))
+        for label, policy in policies:
+            ai = MonteCarloAI(1, list(players[0].pieces), simulation_time=seconds, rollout=policy)
+            rate = playout_rate(ai, board, seconds)
+            ai.grow_tree(board)
+            print(f"  {label:20s} {rate:8.1f} playouts/sec | "
+                  f"{ai.iterations / seconds:8.1f} MCTS iterations/sec")
+            if type(policy) is AnchorRollout:
+                anchor_rate = rate
+        print(f"  Goal of {GOAL} anchor playouts/sec: {'met' if anchor_rate >= GOAL else 'not met'} "
+              f"({anchor_rate / GOAL:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import sys
+import os
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+
+# Add the parent directory of 'backend' to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from backend.board import Board
+from backend.piece import pieces
+from backend.player import Player
+from backend.placements import placement_table
+from backend.algorithms.greedy import GreedyAI
+from backend.algorithms.minimax import MinimaxAI
+from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.algorithms.random_ai import RandomAI
+from backend.benchmarks.validator_bench import workload
+
+"""
+BENCHMARK COMMAND
+python3 backend/benchmarks/suite.py --out results.json
+python3 backend/benchmarks/suite.py --baseline results.json --threshold 0.25
+
+Times the engine and every AI on a fixed corpus of four-player positions
+(positions.json next to this file: an opening, a mid-game and a late-game
+position, saved as the placement IDs that reach them). Each benchmark reports
+its median and best time over its repeats and, from one extra run under
+tracemalloc, its peak Python allocation. With --baseline the results are
+compared to an earlier --out file and the run fails (exit status 1) if any
+median time or peak allocation grew by more than --threshold. Nothing needs
+the network; --build-corpus regenerates the positions.
+"""
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "positions.json")
+
+# Plies played to reach each corpus position
+PHASES = {"opening": 8, "midgame": 32, "lategame": 60}
+
+# Agent name -> factory(player_id, pieces, budget), as in backend.tournament
+AGENTS = {
+    "greedy": lambda player_id, held, budget: GreedyAI(player_id, held),
+    "minimax": lambda player_id, held, budget: MinimaxAI(player_id, held, time_limit=budget),
+    "monte_carlo": lambda player_id, held, budget: MonteCarloAI(player_id, held, simulation_time=budget, seed=0),
+    "random": lambda player_id, held, budget: RandomAI(player_id, held, seed=0),
+}
+
+
+def build_corpus(seed=0):
+    """Play one seeded random game and keep the move lists that reach each phase."""
+    rng = random.Random(seed)
+    table = placement_table()
+    board = Board()
+    players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+    moves = []
+    corpus = {}
+    for ply in range(max(PHASES.values())):
+        player = players[ply % 4]
+        valid_moves = player.find_all_valid_moves(board)
+        if valid_moves:
+            move = rng.choice(valid_moves)
+            board.apply_move(move, player)
+            moves.append([player.player_id, table.id_of(move)])
+        for phase, plies in PHASES.items():
+            if plies == ply + 1:
+                corpus[phase] = list(moves)
+    return corpus
+
+
+def load_position(moves):
+    """The board and four players after replaying [player_id, placement ID] moves."""
+    board = Board()
+    players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+    for player_id, move_id in moves:
+        if board.apply_move_id(move_id, players[player_id - 1]) is None:
+            raise ValueError(f"corpus move {move_id} is illegal for player {player_id}")
+    return board, players
+
+
+def next_mover(board, players):
+    """The first player from the seat to move on who has a legal move (the seat to move if nobody has)."""
+    to_move = board.bitboards.to_move
+    for offset in range(4):
+        player = players[(to_move - 1 + offset) % 4]
+        if player.has_valid_move(board):
+            return player
+    return players[to_move - 1]
+
+
+def benchmarks(corpus, budget):
+    """Benchmark name -> (repeat, setup, run): run(setup()) is what gets timed."""
+    suite = {}
+    for phase, moves in corpus.items():
+        def position(moves=moves):
+            return load_position(moves)
+
+        board, players = position()
+        checks = workload(board, players, 2000)
+        suite[f"validator/{phase}"] = (20, lambda position=position: position()[0].validator,
+                                       lambda validator, checks=checks: [validator.is_valid(*check)
+                                                                         for check in checks])
+        # A freshly replayed board, so the move caches start cold
+        suite[f"find_all_valid_moves/{phase}"] = (20, position, lambda state: [
+            player.find_all_valid_moves(state[0]) for player in state[1]])
+        # get_score takes microseconds, so each repeat times a thousand calls
+        suite[f"get_score/{phase}"] = (20, lambda position=position: position()[0],
+                                       _score_many)
+        for name, factory in AGENTS.items():
+            def setup(position=position, factory=factory):
+                board, players = position()
+                mover = next_mover(board, players)
+                return board, factory(mover.player_id, list(mover.pieces), budget)
+
+            suite[f"choose_move/{name}/{phase}"] = (3, setup, lambda state: state[1].choose_move(state[0]))
+    return suite
+
+
+def _score_many(board):
+    for _ in range(1000):
+        board.get_score()
+
+
+def measure(repeat, setup, run):
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+    state = setup()
+    tracemalloc.start()
+    try:
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"median_s": statistics.median(times), "min_s": min(times), "repeat": repeat,
+            "peak_kib": peak / 1024}
+
+
+def run_suite(corpus, budget=0.1, only=None, progress=print):
+    results = {}
+    for name, (repeat, setup, run) in benchmarks(corpus, budget).items():
+        if only and only not in name:
+            continue
+        results[name] = measure(repeat, setup, run)
+        if progress is not None:
+            progress(f"{name:40s} {results[name]['median_s'] * 1000:10.3f} ms "
+                     f"(best {results[name]['min_s'] * 1000:.3f}) | peak {results[name]['peak_kib']:9.1f} KiB")
+    return {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__,
+                 "machine": platform.machine(), "budget_s": budget},
+        "benchmarks": results,
+        "max_rss_kib": _max_rss_kib(),
+    }
+
+
+def compare(current, baseline, threshold):
+    """(name, metric, baseline, current) for every median time or peak that grew past threshold.
+
+    Metrics missing or zero in either run cannot grow by a fraction, so they are skipped.
+    """
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        for metric in ("median_s", "peak_kib"):
+            if not before.get(metric) or result.get(metric) is None:
+                continue
+            if result[metric] > before[metric] * (1 + threshold):
+                regressions.append((name, metric, before[metric], result[metric]))
+    return regressions
+
+
+def _max_rss_kib():
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return rss / 1024 if sys.platform == "darwin" else rss
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Engine and AI benchmark suite")
+    parser.add_argument("--out", help="write the results here as JSON")
+    parser.add_argument("--baseline", help="compare against this earlier --out file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed growth over the baseline, as a fraction")
+    parser.add_argument("--budget", type=float, default=0.1, help="seconds per move for search AIs")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this")
+    parser.add_argument("--build-corpus", action="store_true", help="regenerate positions.json and exit")
+    args = parser.parse_args(argv)
+
+    if args.build_corpus:
+        with open(CORPUS, "w") as corpus_file:
+            corpus = build_corpus()
+            # One line per position keeps diffs of the corpus readable
+            lines = [f"  {json.dumps(phase)}: {json.dumps(moves)}" for phase, moves in corpus.items()]
+            corpus_file.write("{\n" + ",\n".join(lines) + "\n}\n")
+        print(f"Wrote {CORPUS}")
+        return 0
+    with open(CORPUS) as corpus_file:
+        corpus = json.load(corpus_file)
+    results = run_suite(corpus, args.budget, args.only)
+    if results["max_rss_kib"] is not None:
+        print(f"Max resident set: {results['max_rss_kib'] / 1024:.1f} MiB")
+    if args.out:
+        with open(args.out, "w") as out:
+            json.dump(results, out, indent=1)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        for name, metric, before, after in regressions:
+            growth = f" ({after / before - 1:+.0%})" if before else ""
+            print(f"REGRESSION {name} {metric}: {before:.6g} -> {after:.6g}{growth}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
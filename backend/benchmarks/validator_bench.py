@@ -0,0 +1,49 @@
+import sys
+import os
+import random
+import time
+
+# Add the parent directory of 'backend' to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from backend.piece import Piece, pieces
+from backend.fixtures import LoopValidator, mid_game_board
+
+"""
+BENCHMARK COMMAND
+python3 backend/benchmarks/validator_bench.py
+"""
+
+def workload(board, players, count, seed=1):
+    rng = random.Random(seed)
+    shapes = [Piece(orientation, piece.name) for piece in pieces.values()
+              for orientation in piece.all_orientations()]
+    return [(rng.choice(shapes), rng.randrange(board.size), rng.randrange(board.size),
+             rng.choice(players)) for _ in range(count)]
+
+
+def rate(validator, checks):
+    start = time.perf_counter()
+    legal = 0
+    for piece, x, y, player in checks:
+        if validator.is_valid(piece, x, y, player):
+            legal += 1
+    elapsed = time.perf_counter() - start
+    return len(checks) / elapsed, legal
+
+
+def main(count=50000):
+    board, players = mid_game_board()
+    checks = workload(board, players, count)
+    before, legal_before = rate(LoopValidator(np.copy(board.grid)), checks)
+    after, legal_after = rate(board.validator, checks)
+    assert legal_before == legal_after, "bitboard and loop validators disagree"
+    print(f"Validations: {count} ({legal_after} legal) on a {int(np.sum(board.grid != 0))}-tile board")
+    print(f"Before (loops):    {before:12,.0f} validations/sec")
+    print(f"After (bitboards): {after:12,.0f} validations/sec")
+    print(f"Speedup:           {after / before:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
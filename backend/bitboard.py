@@ -0,0 +1,291 @@
+"""
+Bitboard primitives used by Board and MoveValidator.
+
+A square board is packed into a single Python int with cell (x, y) stored at
+bit x * size + y. Every player gets one such int, plus a shared occupancy
+mask, so legality checks become a handful of AND/OR operations instead of
+Python loops over piece cells.
+"""
+
+import numpy as np
+from backend.zobrist import footprint_key, next_seat, piece_key, turn_key
+
+_EDGE_OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_CORNER_OFFSETS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+_shape_masks_cache = {}
+_board_masks_cache = {}
+
+
+def cell_bit(x, y, size=20):
+    return 1 << (x * size + y)
+
+
+def popcount(mask):
+    return bin(mask).count("1")
+
+
+def iter_bits(mask):
+    # Yield the index of every set bit, lowest first
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BoardMasks:
+    """Constant masks for a board size: full board, corners and column spans."""
+
+    def __init__(self, size):
+        self.size = size
+        self.full = (1 << (size * size)) - 1
+        self.corners = (cell_bit(0, 0, size) | cell_bit(0, size - 1, size) |
+                        cell_bit(size - 1, 0, size) | cell_bit(size - 1, size - 1, size))
+        self.columns = []
+        for y in range(size):
+            column = 0
+            for x in range(size):
+                column |= cell_bit(x, y, size)
+            self.columns.append(column)
+        self.not_first_column = self.full & ~self.columns[0]
+        self.not_last_column = self.full & ~self.columns[size - 1]
+
+    def halos(self, mask):
+        """Return (edge_halo, corner_halo) of every cell in a whole-board mask."""
+        size = self.size
+        # A one-bit shift moves cells one column over; drop the ones that wrapped a row
+        left = (mask >> 1) & self.not_last_column
+        right = (mask << 1) & self.not_first_column
+        edge = (left | right | (mask << size) | (mask >> size)) & self.full
+        sideways = left | right
+        corner = ((sideways << size) | (sideways >> size)) & self.full
+        return edge, corner
+
+    def column_span(self, first, last):
+        # Mask of all columns in [first, last], clipped to the board
+        span = 0
+        for y in range(max(first, 0), min(last, self.size - 1) + 1):
+            span |= self.columns[y]
+        return span
+
+
+def board_masks(size=20):
+    masks = _board_masks_cache.get(size)
+    if masks is None:
+        masks = _board_masks_cache[size] = BoardMasks(size)
+    return masks
+
+
+class ShapeMasks:
+    """Footprint, edge-halo and corner-halo masks of one shape at every origin.
+
+    The edge halo holds every in-bounds cell orthogonally adjacent to a tile of
+    the shape and the corner halo every diagonally adjacent one. Both include
+    cells covered by the shape itself, which keeps touching_corner exact when it
+    is called on its own; in a full legality check those cells are already
+    known to be empty.
+    """
+
+    def __init__(self, shape, size=20):
+        shape = np.asarray(shape)
+        self.size = size
+        self.height, self.width = shape.shape
+        self.cells = [(int(i), int(j)) for i, j in np.argwhere(shape == 1)]
+        self.tile_count = len(self.cells)
+
+        # Base masks with the shape anchored at (1, 1) so the halo never falls
+        # off the top or left edge; they are shifted into place per origin.
+        self._base = self._build(1, 1, clip=False)
+        self.origins = [None] * (size * size)
+        self.origin_mask = 0  # One bit per in-bounds origin
+        board = board_masks(size)
+        for x in range(size - self.height + 1):
+            for y in range(size - self.width + 1):
+                self.origins[x * size + y] = self._shift(x, y, board)
+                self.origin_mask |= cell_bit(x, y, size)
+        # Bit distance from an origin to each tile; in-bounds origins never wrap a row
+        self.offsets = [i * size + j for i, j in self.cells]
+
+    def _build(self, x, y, clip=True):
+        size = self.size
+        footprint = edge = corner = 0
+        for i, j in self.cells:
+            cx, cy = x + i, y + j
+            if not clip or (0 <= cx < size and 0 <= cy < size):
+                footprint |= cell_bit(cx, cy, size)
+            for dx, dy in _EDGE_OFFSETS:
+                if not clip or (0 <= cx + dx < size and 0 <= cy + dy < size):
+                    edge |= cell_bit(cx + dx, cy + dy, size)
+            for dx, dy in _CORNER_OFFSETS:
+                if not clip or (0 <= cx + dx < size and 0 <= cy + dy < size):
+                    corner |= cell_bit(cx + dx, cy + dy, size)
+        return footprint, edge, corner
+
+    def _shift(self, x, y, board):
+        size = self.size
+        footprint, edge, corner = self._base
+        shift = (x - 1) * size + (y - 1)
+        if shift >= 0:
+            footprint, edge, corner = footprint << shift, edge << shift, corner << shift
+        else:
+            footprint, edge, corner = footprint >> -shift, edge >> -shift, corner >> -shift
+        # Halo columns outside [y - 1, y + width] wrapped around a row end
+        window = board.column_span(y - 1, y + self.width) & board.full
+        return footprint, edge & window, corner & window
+
+    def legal_origin_mask(self, anchors, forbidden, occupied, free_corners):
+        """Mask of the origins whose footprint is legal, found for all origins at once.
+
+        An origin is legal if a tile lands on an anchor and none on a forbidden
+        cell, or if a tile covers a free board corner and none an occupied cell.
+        """
+        on_anchor = on_forbidden = 0
+        for offset in self.offsets:
+            on_anchor |= anchors >> offset
+        if not on_anchor & self.origin_mask and not free_corners:
+            return 0
+        for offset in self.offsets:
+            on_forbidden |= forbidden >> offset
+        legal = on_anchor & ~on_forbidden
+        if free_corners:
+            # Past the opening every board corner is taken, so this is rarely needed
+            on_corner = on_occupied = 0
+            for offset in self.offsets:
+                on_corner |= free_corners >> offset
+                on_occupied |= occupied >> offset
+            legal |= on_corner & ~on_occupied
+        return self.origin_mask & legal
+
+    def touching(self, mask):
+        """Mask of the origins whose footprint covers at least one cell of mask."""
+        touched = 0
+        for offset in self.offsets:
+            touched |= mask >> offset
+        return self.origin_mask & touched
+
+    def at(self, x, y):
+        """Return (footprint, edge_halo, corner_halo) with the shape's top-left at (x, y)."""
+        if 0 <= x and 0 <= y and x + self.height <= self.size and y + self.width <= self.size:
+            return self.origins[x * self.size + y]
+        # Out-of-bounds origins are rare (direct validator calls only); clip the cells
+        return self._build(x, y)
+
+
+def shape_masks(shape, size=20):
+    """Return the cached ShapeMasks for a piece shape array."""
+    key = (size, shape.shape, shape.dtype.char, shape.tobytes())
+    masks = _shape_masks_cache.get(key)
+    if masks is None:
+        masks = _shape_masks_cache[key] = ShapeMasks(shape, size)
+    return masks
+
+
+class Bitboards:
+    """One occupancy int per player plus the union of all of them.
+
+    Alongside occupancy every player that has been seen keeps two frontier
+    masks, updated incrementally on each placement:
+
+    * forbidden: cells the player may never cover again, i.e. occupied cells
+      and cells edge-adjacent to the player's own tiles.
+    * anchors: empty cells a new piece can hook onto, i.e. cells diagonal to
+      the player's own tiles that are not forbidden, plus the empty board
+      corners that the first-move rule allows.
+
+    It also carries the position's Zobrist hash (see backend.zobrist), with
+    the player to move taken as the seat after the last player to place, and
+    the names of the pieces each player has placed.
+    """
+
+    def __init__(self, size=20):
+        self.size = size
+        self.players = {}
+        self.occupied = 0
+        self.forbidden = {}
+        self.anchors = {}
+        self.used = {}
+        self.to_move = 1
+        self.hash = turn_key(1)
+
+    @classmethod
+    def from_grid(cls, grid, used=None, to_move=1):
+        """Bitboards of a grid of seat numbers, with the pieces used of the seats that have tiles."""
+        bitboards = cls(grid.shape[0])
+        for player_id in np.unique(grid):
+            player_id = int(player_id)
+            if player_id == 0:
+                continue
+            packed = np.packbits((grid == player_id).ravel(), bitorder="little")
+            mask = int.from_bytes(packed.tobytes(), "little")
+            bitboards.players[player_id] = mask
+            bitboards.occupied |= mask
+            bitboards.hash ^= footprint_key(mask, player_id, bitboards.size)
+        board = board_masks(bitboards.size)
+        for player_id, mask in bitboards.players.items():
+            edge, corner = board.halos(mask)
+            forbidden = bitboards.occupied | edge
+            bitboards.forbidden[player_id] = forbidden
+            bitboards.anchors[player_id] = (corner & ~forbidden) | (board.corners & ~bitboards.occupied)
+        for player_id, names in (used or {}).items():
+            if player_id in bitboards.players and names:
+                bitboards.used[player_id] = names
+                for name in names:
+                    bitboards.hash ^= piece_key(player_id, name)
+        bitboards.hash ^= turn_key(bitboards.to_move) ^ turn_key(to_move)
+        bitboards.to_move = to_move
+        return bitboards
+
+    def to_grid(self):
+        cells = self.size * self.size
+        grid = np.zeros(cells, dtype=int)
+        nbytes = (cells + 7) // 8
+        for player_id, mask in self.players.items():
+            raw = np.frombuffer(mask.to_bytes(nbytes, "little"), dtype=np.uint8)
+            grid[np.unpackbits(raw, bitorder="little")[:cells].astype(bool)] = player_id
+        return grid.reshape(self.size, self.size)
+
+    def owned(self, player_id):
+        return self.players.get(player_id, 0)
+
+    def forbidden_for(self, player_id):
+        return self.forbidden.get(player_id, self.occupied)
+
+    def anchors_for(self, player_id):
+        anchors = self.anchors.get(player_id)
+        if anchors is None:
+            # A player with no tiles can only start from a free board corner
+            anchors = board_masks(self.size).corners & ~self.occupied
+        return anchors
+
+    def place(self, player_id, footprint, edge_halo, corner_halo, piece_name=None):
+        """Record a placement and update every player's frontier masks and the hash."""
+        if player_id not in self.players:
+            self.players[player_id] = 0
+            self.forbidden[player_id] = self.occupied
+            self.anchors[player_id] = self.anchors_for(player_id)
+        self.players[player_id] |= footprint
+        self.occupied |= footprint
+        for other_id in self.forbidden:
+            self.forbidden[other_id] |= footprint
+            self.anchors[other_id] &= ~footprint
+        forbidden = self.forbidden[player_id] | edge_halo
+        self.forbidden[player_id] = forbidden
+        free_corners = board_masks(self.size).corners & ~self.occupied
+        self.anchors[player_id] = ((self.anchors[player_id] | corner_halo) & ~forbidden) | free_corners
+
+        position = self.hash ^ footprint_key(footprint, player_id, self.size)
+        if piece_name is not None:
+            position ^= piece_key(player_id, piece_name)
+            self.used[player_id] = self.used.get(player_id, frozenset()) | {piece_name}
+        to_move = next_seat(player_id)
+        self.hash = position ^ turn_key(self.to_move) ^ turn_key(to_move)
+        self.to_move = to_move
+
+    def snapshot(self):
+        # Everything place() can change, for make/unmake in search
+        return (self.players.copy(), self.occupied, self.forbidden.copy(), self.anchors.copy(),
+                self.used.copy(), self.to_move, self.hash)
+
+    def restore(self, snapshot):
+        players, self.occupied, forbidden, anchors, used, self.to_move, self.hash = snapshot
+        self.players, self.forbidden, self.anchors, self.used = players, forbidden, anchors, used
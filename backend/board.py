@@ -1,13 +1,87 @@
-
 import numpy as np
+from backend.bitboard import Bitboards, board_masks, iter_bits, popcount
 from backend.move_validator import MoveValidator
+from backend.piece import orientations_of
+from backend.move_cache import MoveCache
+from backend.placements import placement_table
+
+
+class _BoardGrid(np.ndarray):
+    """Grid view of a Board that flags direct writes so the bitboards resync."""
+
+    def __array_finalize__(self, obj):
+        # Only views into the board's own cells report writes: copies, slices
+        # taken with fancy indexing and ufunc results are unrelated arrays
+        board = getattr(obj, "_board", None)
+        self._board = board if board is not None and np.may_share_memory(self, obj) else None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if self._board is not None:
+            self._board._grid_edited = True
+
+    def fill(self, value):
+        super().fill(value)
+        if self._board is not None:
+            self._board._grid_edited = True
+
 
 class Board:
 
     def __init__(self, size=20):
         self.size = size
-        self.grid = np.zeros((size, size), dtype=int)
-        self.validator = MoveValidator(self.grid)
+        self._bitboards = Bitboards(size)
+        self._cells = None  # Plain ndarray backing the grid view, built lazily
+        self._grid = None
+        self._grid_edited = False
+        self._stuck = {}  # player_id -> (occupied mask, own cells, piece names) of a position with no moves
+        self._move_caches = {}  # player_id -> MoveCache
+        self.validator = MoveValidator(None, board=self)
+
+    @classmethod
+    def from_bitboards(cls, bitboards):
+        """A board whose position is bitboards (adopted, not copied)."""
+        board = cls(bitboards.size)
+        board._bitboards = bitboards
+        return board
+
+    @property
+    def bitboards(self):
+        # Direct writes to the grid (tests, legacy callers) make it the source of truth
+        if self._grid_edited:
+            # The grid says nothing about pieces used or the seat to move, so those carry over
+            previous = self._bitboards
+            self._bitboards = Bitboards.from_grid(self._cells, previous.used, previous.to_move)
+            self._grid_edited = False
+        return self._bitboards
+
+    @property
+    def grid(self):
+        # Derived view of the bitboards, kept in sync by place_piece once built
+        if self._grid is None:
+            self._set_cells(self._bitboards.to_grid())
+        return self._grid
+
+    @grid.setter
+    def grid(self, value):
+        self._set_cells(np.array(value, dtype=int))
+        self._grid_edited = True
+
+    def _set_cells(self, cells):
+        self._cells = cells
+        self._grid = cells.view(_BoardGrid)
+        self._grid._board = self
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_bitboards"] = self.bitboards
+        state["_grid_edited"] = False
+        state["_cells"] = None
+        state["_grid"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
 
     def display_board(self):
         # Print boad
@@ -18,26 +92,218 @@ class Board:
         # Check valid placement
         if self.is_valid(piece, x, y, player):
             # Place piece (mark player_id)
-            piece_height, piece_width = piece.shape.shape
-            for i in range(piece_height):
-                for j in range(piece_width):
-                    if piece.shape[i, j] == 1:
-                        self.grid[x + i, y + j] = player.player_id
+            footprint, edge_halo, corner_halo = self.validator.masks(piece, x, y)
+            self.bitboards.place(player.player_id, footprint, edge_halo, corner_halo, piece.name)
+            self._write_cells(footprint, player.player_id)
             return True
         else:
             return False
-        
+
+    def _write_cells(self, footprint, value):
+        # Keep the grid view in step with the bitboards once it has been built
+        if self._cells is not None:
+            for bit in iter_bits(footprint):
+                self._cells[divmod(bit, self.size)] = value
+
+    def apply_move(self, move, player):
+        """Play a move (original_piece, piece, x, y) for player and return an undo token.
+
+        Unlike place_piece this also takes the piece out of the player's
+        inventory, so a search can walk one mutable board instead of copying
+        it. Returns None, leaving everything untouched, if the move is illegal.
+        Tokens must be undone in reverse order.
+        """
+        original_piece, piece, x, y = move
+        if not self.is_valid(piece, x, y, player):
+            return None
+        return self._apply(player, original_piece, piece.name, *self.validator.masks(piece, x, y))
+
+    def apply_move_id(self, move_id, player):
+        """apply_move for a placement ID, checked and played straight from its table masks.
+
+        Returns None if the placement is illegal or player does not hold the piece.
+        """
+        table = placement_table(self.size)
+        footprint, edge_halo, corner_halo = table.masks(move_id)
+        name = table.piece_name(move_id)
+        original_piece = next((piece for piece in player.pieces if piece.name == name), None)
+        if original_piece is None:
+            return None
+        if not self.id_is_legal(move_id, player.player_id):
+            return None
+        return self._apply(player, original_piece, name, footprint, edge_halo, corner_halo)
+
+    def id_is_legal(self, move_id, player_id):
+        """Whether player_id may place move_id here, whichever pieces it holds."""
+        footprint = placement_table(self.size).footprints[move_id]
+        bitboards = self.bitboards
+        # Legal if it covers an anchor and no forbidden cell, or a free board corner and no tile
+        if footprint & bitboards.forbidden_for(player_id) or not footprint & bitboards.anchors_for(player_id):
+            return not footprint & bitboards.occupied and bool(footprint & board_masks(self.size).corners)
+        return True
+
+    def _apply(self, player, original_piece, name, footprint, edge_halo, corner_halo):
+        bitboards = self.bitboards
+        saved = bitboards.snapshot()
+        bitboards.place(player.player_id, footprint, edge_halo, corner_halo, name)
+        self._write_cells(footprint, player.player_id)
+        index = None
+        for i, owned_piece in enumerate(player.pieces):
+            if owned_piece is original_piece:
+                index = i
+                del player.pieces[i]
+                break
+        return player, original_piece, index, footprint, saved
+
+    def undo(self, token):
+        """Take back the move that produced token, restoring cells, scores, anchors and inventory."""
+        player, original_piece, index, footprint, saved = token
+        self.bitboards.restore(saved)
+        self._write_cells(footprint, 0)
+        if index is not None:
+            player.pieces.insert(index, original_piece)
+
     def is_valid(self, piece, x, y, player):
         # Validate placement coordinates
-        return self.validator.within_bounds(piece, x, y) and \
-               self.validator.not_overlapping(piece, x, y) and \
-               (self.validator.touching_corner(piece, x, y, player) or self.validator.first_move(piece, x, y))
-    
+        return self.validator.is_valid(piece, x, y, player)
+
+    @property
+    def hash(self):
+        # Zobrist hash of cell owners, used pieces and player to move
+        return self.bitboards.hash
+
+    def pieces_used(self, player_id):
+        # Names of the pieces player_id has placed (unknown for grids written directly)
+        return self.bitboards.used.get(player_id, frozenset())
+
+    def anchors(self, player_id):
+        # Bitmask of the empty cells player_id can grow from
+        return self.bitboards.anchors_for(player_id)
+
+    def anchor_cells(self, player_id):
+        return [divmod(bit, self.size) for bit in iter_bits(self.anchors(player_id))]
+
+    def legal_origins(self, orientation, player_id, anchors=None):
+        """Sorted (x, y) origins where a registry orientation is legal for player_id.
+
+        Only origins that put one of the orientation's cells on an anchor are
+        tried, and each is checked with a single mask lookup.
+        """
+        if anchors is None:
+            anchors = self.anchor_cells(player_id)
+        bitboards = self.bitboards
+        forbidden = bitboards.forbidden_for(player_id)
+        occupied = bitboards.occupied
+        corners = board_masks(self.size).corners
+        origins = orientation.masks(self.size).origins
+        size = self.size
+        max_x, max_y = size - orientation.height, size - orientation.width
+        seen = set()
+        legal = []
+        for anchor_x, anchor_y in anchors:
+            for i, j in orientation.cells:
+                x, y = anchor_x - i, anchor_y - j
+                if not (0 <= x <= max_x and 0 <= y <= max_y):
+                    continue
+                index = x * size + y
+                if index in seen:
+                    continue
+                seen.add(index)
+                footprint = origins[index][0]
+                # The footprint covers an anchor, so it is legal unless it hits a
+                # forbidden cell; covering a free board corner overrides edge contact
+                if footprint & forbidden and not (footprint & corners and not footprint & occupied):
+                    continue
+                legal.append(index)
+        legal.sort()
+        return [divmod(index, size) for index in legal]
+
+    def legal_moves(self, player):
+        """Every legal (original_piece, piece, x, y) move of player, carried over between queries."""
+        return self._move_cache(player.player_id).moves(self, player)
+
+    def legal_move_ids(self, player):
+        """legal_moves as placement IDs (see backend.placements)."""
+        return self._move_cache(player.player_id).move_ids(self, player)
+
+    def _move_cache(self, player_id):
+        cache = self._move_caches.get(player_id)
+        if cache is None:
+            cache = self._move_caches[player_id] = MoveCache(player_id)
+        return cache
+
+    def generate_moves(self, player):
+        """legal_moves regenerated from scratch: only origins that land a cell on an anchor are tried."""
+        valid_moves = []
+        anchors = self.anchor_cells(player.player_id)
+        if anchors:
+            for piece in player.pieces:
+                for orientation in orientations_of(piece):  # Shared, immutable registry entries
+                    for x, y in self.legal_origins(orientation, player.player_id, anchors):
+                        valid_moves.append((piece, orientation, x, y))
+        return valid_moves
+
+    def check_move_cache(self, player):
+        """Diff the cached moves of player against a full regeneration.
+
+        Returns (missing, extra): moves the cache lacks and moves it has that
+        are not legal, both empty when the cache is sound.
+        """
+        cached = set(self.legal_moves(player))
+        expected = set(self.generate_moves(player))
+        return sorted(expected - cached, key=_move_order), sorted(cached - expected, key=_move_order)
+
+    def move_cache_stats(self):
+        # (queries, reused moves, generated moves) summed over the players
+        caches = self._move_caches.values()
+        return (sum(cache.queries for cache in caches), sum(cache.reused for cache in caches),
+                sum(cache.generated for cache in caches))
+
+    def legal_origin_mask(self, orientation, player_id):
+        """Bitmask of every origin (bit x * size + y) where orientation is legal for player_id."""
+        bitboards = self.bitboards
+        occupied = bitboards.occupied
+        return orientation.masks(self.size).legal_origin_mask(
+            bitboards.anchors_for(player_id), bitboards.forbidden_for(player_id), occupied,
+            board_masks(self.size).corners & ~occupied)
+
+    def has_any_move(self, player):
+        """Whether player has at least one legal placement, stopping at the first one found.
+
+        Pieces are tried largest first and each orientation is checked against
+        every anchor at once with legal_origin_mask. A player found stuck stays
+        stuck on any position that covers at least the same cells, gives it
+        exactly the same cells and leaves it no piece it did not have then, so
+        that answer is remembered. Undo and replay can hand the same cells to
+        a different owner, which is why the player's own cells are part of it.
+        """
+        player_id = player.player_id
+        occupied = self.bitboards.occupied
+        owned = self.bitboards.owned(player_id)
+        names = frozenset(piece.name for piece in player.pieces)
+        stuck = self._stuck.get(player_id)
+        if stuck is not None and not stuck[0] & ~occupied and owned == stuck[1] and names <= stuck[2]:
+            return False
+        if self.anchors(player_id):
+            for piece in sorted(player.pieces, key=_tile_count, reverse=True):
+                for orientation in orientations_of(piece):
+                    if self.legal_origin_mask(orientation, player_id):
+                        return True
+        self._stuck[player_id] = (occupied, owned, names)
+        return False
+
     def get_score(self):
         # Calculate the score for each player based on the number of tiles they have occupied
         scores = {1: 0, 2: 0, 3: 0, 4: 0}  # Initialize scores to zero for all players
-        for row in self.grid:
-            for cell in row:
-                if cell != 0:  # If the cell is occupied by a player
-                    scores[cell] += 1
+        for player_id, mask in self.bitboards.players.items():
+            scores[player_id] = popcount(mask)
         return scores
+
+
+def _tile_count(piece):
+    return orientations_of(piece)[0].tile_count
+
+
+def _move_order(move):
+    original_piece, piece, x, y = move
+    return original_piece.name, piece.orientation_id, x, y
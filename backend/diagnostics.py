@@ -0,0 +1,78 @@
+"""
+Diagnostics for the game engine and the AIs.
+
+Every module logs through logging.getLogger(__name__), so levels can be set
+per module, e.g. "backend.algorithms.greedy" or "backend.player". Messages use
+logging's lazy %-style arguments, and the hot loops check isEnabledFor() once
+per decision, so a disabled level costs no formatting at all.
+
+The "blokus.summary" logger is the summary mode: one key=value line per AI
+decision with the moves considered, the time taken and the chosen move.
+
+Nothing below WARNING is shown until configure() is called with a spec such as
+
+    INFO,backend.algorithms.greedy=DEBUG,summary
+
+(a bare level applies to every backend module, module=LEVEL overrides one
+module and "summary" turns the decision lines on). app.py reads the spec from
+the BLOKUS_LOG environment variable.
+"""
+
+import logging
+import os
+import sys
+import time
+
+SUMMARY = logging.getLogger("blokus.summary")
+
+_handler = None
+_overridden = set()  # Module loggers given their own level by configure()
+
+
+def configure(spec=None, stream=None):
+    """Apply a level spec (default: the BLOKUS_LOG environment variable)."""
+    global _handler
+    if spec is None:
+        spec = os.environ.get("BLOKUS_LOG", "")
+    backend = logging.getLogger("backend")
+    if _handler is None:
+        _handler = logging.StreamHandler(stream or sys.stderr)
+        _handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+        for logger in (backend, SUMMARY):
+            logger.addHandler(_handler)
+            logger.propagate = False
+    elif stream is not None:
+        _handler.setStream(stream)
+
+    backend.setLevel(logging.WARNING)
+    SUMMARY.setLevel(logging.WARNING)
+    while _overridden:
+        logging.getLogger(_overridden.pop()).setLevel(logging.NOTSET)
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        if part == "summary":
+            SUMMARY.setLevel(logging.INFO)
+        elif "=" in part:
+            name, level = (text.strip() for text in part.split("=", 1))
+            logging.getLogger(name).setLevel(level.upper())
+            _overridden.add(name)
+        else:
+            backend.setLevel(part.upper())
+
+
+def describe_move(move):
+    """Short, stable text for a move: piece/orientation@x,y."""
+    if move is None:
+        return "none"
+    original_piece, piece, x, y = move
+    return f"{original_piece.name}/{getattr(piece, 'orientation_id', '?')}@{x},{y}"
+
+
+def log_decision(player, moves_considered, started, move, **details):
+    """Write the summary line for a decision that began at time.perf_counter() == started."""
+    if not SUMMARY.isEnabledFor(logging.INFO):
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    fields = [f"player={player.player_id}", f"ai={type(player).__name__}",
+              f"moves={moves_considered}", f"time_ms={elapsed_ms:.1f}", f"move={describe_move(move)}"]
+    fields += [f"{key}={value}" for key, value in details.items()]
+    SUMMARY.info("decision %s", " ".join(fields))
@@ -0,0 +1,99 @@
+"""
+Move scoring shared by the AIs.
+
+The utility of placing a piece is
+
+    tile count - distance + corner_weight * corners
+
+where distance is the Manhattan distance from the piece's tile closest to the
+board center, and corners counts the empty cells diagonal to the piece's
+tiles that would not be edge-adjacent to any of the player's tiles once it is
+placed. An illegal placement opens corners as if it had not been placed.
+
+utilities() scores a whole list of placements in one call: the corner counts
+come from the precomputed footprint and halo bitboards of each placement, and
+the tile counts and distances are computed for the whole batch with NumPy.
+"""
+
+import numpy as np
+
+from backend.bitboard import popcount
+from backend.piece import Orientation, piece_cells
+
+_shapes = {}
+
+
+def _shape(piece):
+    """(tile offsets as a float array, tile count, most corners the shape can open) for a piece."""
+    # Registry orientations are immutable, so they key the cache directly
+    shape = _shapes.get(piece)
+    if shape is not None:
+        return shape
+    key = piece if type(piece) is Orientation else piece_cells(piece)
+    shape = _shapes.get(key)
+    if shape is None:
+        cells = piece_cells(piece)
+        tiles = set(cells)
+        edge = {(i + di, j + dj) for i, j in tiles for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1))}
+        corner = {(i + di, j + dj) for i, j in tiles for di, dj in ((-1, -1), (-1, 1), (1, -1), (1, 1))}
+        # Cells diagonal to a tile that are neither tiles nor beside one
+        shape = _shapes[key] = (np.array(cells, dtype=float).reshape(-1, 2), len(cells),
+                                len(corner - edge - tiles))
+    return shape
+
+
+def corner_counts(board, player, placements):
+    """Number of corners each (piece, x, y) placement would open for player."""
+    bitboards = board.bitboards
+    forbidden = bitboards.forbidden_for(player.player_id)
+    validator = board.validator
+    counts = []
+    for piece, x, y in placements:
+        footprint, edge_halo, corner_halo = validator.masks(piece, x, y)
+        blocked = forbidden
+        if validator.is_valid(piece, x, y, player):
+            # Placed: its tiles and the cells beside them are no longer open
+            blocked |= footprint | edge_halo
+        counts.append(popcount(corner_halo & ~blocked))
+    return counts
+
+
+def base_scores(placements, center=(9.5, 9.5)):
+    """Tile count minus distance to center of each placement: the utility without corners."""
+    return _base_scores(placements, [_shape(piece) for piece, _, _ in placements], center)
+
+
+def _base_scores(placements, shapes, center):
+    tile_counts = np.array([shape[1] for shape in shapes])
+    origins = np.array([(x, y) for _, x, y in placements], dtype=float)
+
+    # Every tile of every placement in one array, then the closest per placement
+    tiles = np.concatenate([shape[0] for shape in shapes]) + np.repeat(origins, tile_counts, axis=0)
+    distances = np.abs(tiles - np.asarray(center, dtype=float)).sum(axis=1)
+    starts = np.concatenate(([0], np.cumsum(tile_counts)[:-1]))
+    return tile_counts - np.minimum.reduceat(distances, starts)
+
+
+def score_bounds(placements, center=(9.5, 9.5), corner_weight=0.5):
+    """(base_scores, upper bounds on utilities) of legal placements.
+
+    The bound counts the most corners the placement's shape can open anywhere.
+    """
+    shapes = [_shape(piece) for piece, _, _ in placements]
+    base = _base_scores(placements, shapes, center)
+    max_corners = np.array([shape[2] for shape in shapes], dtype=float)
+    return base, base + corner_weight * max_corners
+
+
+def utilities(board, player, placements, center=(9.5, 9.5), corner_weight=0.5):
+    """Utility of each (piece, x, y) placement for player, as a float array."""
+    placements = list(placements)
+    if not placements:
+        return np.zeros(0)
+    corners = np.array(corner_counts(board, player, placements), dtype=float)
+    return base_scores(placements, center) + corner_weight * corners
+
+
+def utility(board, player, piece, x, y, center=(9.5, 9.5), corner_weight=0.5):
+    """Utility of a single placement; see utilities()."""
+    return float(utilities(board, player, [(piece, x, y)], center, corner_weight)[0])
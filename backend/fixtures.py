@@ -0,0 +1,168 @@
+"""
+Positions and reference implementations shared by the tests and the benchmarks.
+
+mid_game_board() plays seeded random games to a given number of turns.
+LoopValidator is the cell-walking move validator the bitboard engine
+replaced: the tests check the engine against it and validator_bench times
+the two side by side. scan_all_origins is the same for move generation and
+movegen_bench, and legacy_utility for move scoring and evaluation_bench.
+ExhaustiveGreedyAI scores every legal move, the decision GreedyAI's pruning
+must reproduce.
+"""
+
+import random
+
+import numpy as np
+
+from backend.algorithms.greedy import GreedyAI
+from backend.board import Board
+from backend.piece import orientations_of, piece_cells, pieces
+from backend.player import Player
+
+
+class LoopValidator:
+    """The cell-walking validator the bitboard engine replaced, kept as the baseline."""
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def within_bounds(self, piece, x, y):
+        piece_height, piece_width = piece.shape.shape
+        return 0 <= x <= self.grid.shape[0] - piece_height and 0 <= y <= self.grid.shape[1] - piece_width
+
+    def not_overlapping(self, piece, x, y):
+        piece_height, piece_width = piece.shape.shape
+        for i in range(piece_height):
+            for j in range(piece_width):
+                if piece.shape[i, j] == 1 and self.grid[x + i, y + j] != 0:
+                    return False
+        return True
+
+    def first_move(self, piece, x, y):
+        last_x, last_y = self.grid.shape[0] - 1, self.grid.shape[1] - 1
+        piece_height, piece_width = piece.shape.shape
+        for i in range(piece_height):
+            for j in range(piece_width):
+                if piece.shape[i, j] == 1 and (x + i in (0, last_x)) and (y + j in (0, last_y)):
+                    return True
+        return False
+
+    def touching_corner(self, piece, x, y, player):
+        size_x, size_y = self.grid.shape
+        pid = player.player_id
+        touching = False
+        piece_height, piece_width = piece.shape.shape
+        for i in range(piece_height):
+            for j in range(piece_width):
+                if piece.shape[i, j] != 1:
+                    continue
+                cx, cy = x + i, y + j
+                if (cx > 0 and self.grid[cx - 1, cy] == pid) or \
+                   (cx < size_x - 1 and self.grid[cx + 1, cy] == pid) or \
+                   (cy > 0 and self.grid[cx, cy - 1] == pid) or \
+                   (cy < size_y - 1 and self.grid[cx, cy + 1] == pid):
+                    return False
+                if (cx > 0 and cy > 0 and self.grid[cx - 1, cy - 1] == pid) or \
+                   (cx > 0 and cy < size_y - 1 and self.grid[cx - 1, cy + 1] == pid) or \
+                   (cx < size_x - 1 and cy > 0 and self.grid[cx + 1, cy - 1] == pid) or \
+                   (cx < size_x - 1 and cy < size_y - 1 and self.grid[cx + 1, cy + 1] == pid):
+                    touching = True
+        return touching
+
+    def is_valid(self, piece, x, y, player):
+        return self.within_bounds(piece, x, y) and \
+               self.not_overlapping(piece, x, y) and \
+               (self.touching_corner(piece, x, y, player) or self.first_move(piece, x, y))
+
+
+def scan_all_origins(player, board):
+    """The full-board generator anchor-based generation replaced, kept as the baseline."""
+    valid_moves = []
+    for piece in player.pieces:
+        for orientation in orientations_of(piece):
+            for x in range(board.size):
+                for y in range(board.size):
+                    if board.is_valid(orientation, x, y, player):
+                        valid_moves.append((piece, orientation, x, y))
+    return valid_moves
+
+
+def legacy_count_valid_corners(player, piece, x, y, board):
+    """The per-move corner count the AIs each carried a copy of, kept as the reference.
+
+    On the original Board the copy's validator kept checking the empty grid
+    it was built with, so the piece was only placed when it covered a board
+    corner. Run on today's Board it is placed, so this checks the intended
+    count of corners open once the piece is down, not the original numbers.
+    """
+    test_board = Board(board.size)
+    test_board.grid = np.copy(board.grid)
+    test_board.place_piece(piece, x, y, player)
+
+    valid_corners = set()
+    for i, j in piece_cells(piece):
+        diagonals = [
+            (x + i + 1, y + j + 1),
+            (x + i + 1, y + j - 1),
+            (x + i - 1, y + j + 1),
+            (x + i - 1, y + j - 1)
+        ]
+        for dx, dy in diagonals:
+            if not (0 <= dx < board.size and 0 <= dy < board.size):
+                continue
+            if (dx, dy) in valid_corners:
+                continue
+            if test_board.grid[dx, dy] != 0:
+                continue
+            valid = True
+            for adj_x, adj_y in [(dx-1, dy), (dx+1, dy), (dx, dy-1), (dx, dy+1)]:
+                if (0 <= adj_x < board.size and 0 <= adj_y < board.size):
+                    if test_board.grid[adj_x, adj_y] == player.player_id:
+                        valid = False
+                        break
+            if valid:
+                valid_corners.add((dx, dy))
+    return len(valid_corners)
+
+
+def legacy_utility(player, piece, x, y, board, center=(9.5, 9.5), corner_weight=0.5):
+    tile_count = len(piece_cells(piece))
+    min_distance = float('inf')
+    for i, j in piece_cells(piece):
+        distance = abs(x + i - center[0]) + abs(y + j - center[1])
+        min_distance = min(min_distance, distance)
+    corner_count = legacy_count_valid_corners(player, piece, x, y, board)
+    if corner_weight == 1:
+        # MinimaxAI adds the corner count unweighted
+        return float(tile_count - min_distance + corner_count)
+    return float(tile_count - min_distance + (corner_weight * corner_count))
+
+
+class ExhaustiveGreedyAI(GreedyAI):
+    """Scores every legal move in full, the decision bound-based pruning must reproduce."""
+
+    def choose_move(self, board, context=None):
+        valid_moves = self.legal_moves(board, context)
+        best_score = float('-inf')
+        best_move = None
+        for move, utility in zip(valid_moves, self.score_moves(board, valid_moves)):
+            if utility > best_score:
+                best_score = utility
+                best_move = move
+        return best_move
+
+
+def mid_game_board(seed=0, turns=24):
+    """Play random legal moves for all four players to get a crowded board."""
+    rng = random.Random(seed)
+    board = Board()
+    players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+    for turn in range(turns):
+        player = players[turn % 4]
+        moves = player.find_all_valid_moves(board)
+        if not moves:
+            continue
+        original_piece, piece, x, y = rng.choice(moves)
+        board.place_piece(piece, x, y, player)
+        player.remove_piece(original_piece)
+    return board, players
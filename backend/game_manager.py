@@ -2,85 +2,91 @@ from backend.board import Board
 from backend.player import Player
 from backend.piece import Piece
 from backend.move_validator import MoveValidator
-from backend.algorithms.greedy import GreedyAI
-from backend.algorithms.minimax import MinimaxAI
-from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.turn_context import TurnContext
+from backend.placements import placement_table
+from backend.game_record import agent_config
+import time
 
 
 class GameManager:
-    def __init__(self, player1, player2, player3, player4):
+    def __init__(self, player1, player2, player3, player4, verbose=True, recorder=None, record_header=None):
         self.players = [player1, player2, player3, player4]
         self.current_turn = 0
         self.board = Board()
         self.game_over = False
+        # verbose=False plays headless: no announcements and no board printing
+        self.verbose = verbose
+        self.moves_played = 0
+        # Seconds each player's play() took, per player_id
+        self.decision_times = {player.player_id: [] for player in self.players}
+        # A GameRecordWriter (see backend.game_record) gets every move as it is played
+        self.recorder = recorder
+        if recorder is not None:
+            header = {"size": self.board.size, "agents": [agent_config(player) for player in self.players]}
+            header.update(record_header or {})
+            recorder.begin_game(header)
+
+    def announce(self, message):
+        if self.verbose:
+            print(message)
     
     def next_turn(self):
         self.current_turn = (self.current_turn + 1) % len(self.players)
 
-    def check_game_over(self):
+    def check_game_over(self, context=None):
         # Check if all players have no valid moves left
-        for player in self.players:
-            valid_moves = player.find_all_valid_moves(self.board)
-            if valid_moves:
-                return False
-        return True
+        if context is None:
+            context = TurnContext(self.board)
+        return not any(context.has_moves(player) for player in self.players)
 
     def play_turn(self):
         current_player = self.players[self.current_turn]
-        print(f"Player {current_player.player_id}'s turn")
-
-        # Use the GreedyAI's choose_move function if the player is an AI
-        if isinstance(current_player, GreedyAI):
-            print(f"Player {current_player.player_id} is a greedy AI. Calculating move...")
-            valid_moves = current_player.find_all_valid_moves(self.board)
-            print(f"Player {current_player.player_id} has {len(valid_moves)} valid moves available.")
-            move = current_player.choose_move(self.board)
-        elif isinstance(current_player, MinimaxAI):
-            print(f"Player {current_player.player_id} is a minimax AI. Calculating move...")
-            valid_moves = current_player.find_all_valid_moves(self.board)
-            print(f"Player {current_player.player_id} has {len(valid_moves)} valid moves available.")
-            move = current_player.choose_move(self.board)
-        elif isinstance(current_player, MonteCarloAI):
-            print(f"Player {current_player.player_id} is a monte carlo AI. Calculating move...")
-            valid_moves = current_player.find_all_valid_moves(self.board)
-            print(f"Player {current_player.player_id} has {len(valid_moves)} valid moves available.")
-            move = current_player.choose_move(self.board)        
-        else:
-            print(f"Player {current_player.player_id} is a user. Waiting for input...")
-            valid_moves = current_player.find_all_valid_moves(self.board)
-            print(f"Player {current_player.player_id} has {len(valid_moves)} valid moves available.")
+        self.announce(f"Player {current_player.player_id}'s turn")
 
-            move = None
-            attempts = 0
-            while move is None and attempts < 3:  # Limit the number of attempts
-                move = current_player.choose_move(self.board)
-                attempts += 1
+        # One context per turn: the count below, choose_move and the game-over
+        # check all read the same generated moves
+        context = TurnContext(self.board)
+        status = "Calculating move..." if current_player.is_ai else "Waiting for input..."
+        self.announce(f"Player {current_player.player_id} is a {current_player.label}. {status}")
+        valid_moves = context.legal_moves(current_player)
+        self.announce(f"Player {current_player.player_id} has {len(valid_moves)} valid moves available.")
+        started = time.perf_counter()
+        move = current_player.play(context)
+        elapsed = time.perf_counter() - started
+        self.decision_times[current_player.player_id].append(elapsed)
 
         if move is None:
-            print("No valid move made. Skipping turn.")
+            self.announce("No valid move made. Skipping turn.")
             self.next_turn()
             return
 
         original_piece, piece, x, y = move
         if self.board.place_piece(piece, x, y, current_player):
             current_player.remove_piece(original_piece)
-            self.board.display_board()
+            self.moves_played += 1
+            if self.recorder is not None:
+                move_id = placement_table(self.board.size).id_of(move)
+                self.recorder.record_move(current_player.player_id, move_id, elapsed)
+            if self.verbose:
+                self.board.display_board()
             self.next_turn()
         else:
-            print("Invalid move. Try again.")
+            self.announce("Invalid move. Try again.")
 
-        if self.check_game_over():
+        if self.check_game_over(context):
             self.game_over = True
-            print("Game over!")
+            self.announce("Game over!")
+            if self.recorder is not None:
+                self.recorder.end_game()
 
             # Get scores and sort players by score
             scores = self.board.get_score()
             sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
 
             # Print rankings
-            print("Final Rankings:")
+            self.announce("Final Rankings:")
             for rank, (player_id, score) in enumerate(sorted_scores, start=1):
-                print(f"{rank}. Player {player_id} - Score: {score}")
+                self.announce(f"{rank}. Player {player_id} - Score: {score}")
     
     def play_game(self):
         while not self.game_over:
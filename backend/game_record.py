@@ -0,0 +1,294 @@
+"""
+Append-only binary game records.
+
+A record file is a plain concatenation of games and agent configs, so
+games are appended as they finish and files can be joined with cat. Each
+game is
+
+    b"G" | version (u8) | header length (u32) | header (UTF-8 JSON)
+    one 5-byte record per move:  seat (u8, 1-4) | placement ID (u16) | milliseconds (u16)
+    b"E"                                          (missing if the game was cut short)
+
+all little-endian. The header holds whatever the writer was given (seed,
+agent configs, board size). A move's piece, orientation and origin are
+all in its placement ID (see backend.placements). Its time spent is capped
+at 65.535 s. Passes are not recorded.
+
+Agent configs are the same for every game of a tournament and would be
+most of each header, so headers list them by key instead, with
+the settings that change from game to game (PER_GAME_SETTINGS) kept
+inline as [key, {setting: value}]. The config of a key is written once per
+writer, ahead of the first game that uses it:
+
+    b"C" | key (u32) | config length (u32) | config (UTF-8 JSON)
+
+A key is a hash of the config, so joined files agree on the keys of the
+configs they share; two configs with one key are reported as an error.
+Readers put the configs back, so GameRecord.header holds them in full.
+A full game is about 60-84 moves plus a header of about 130
+bytes, roughly 0.5 KB: a million games fit in a few hundred MB.
+
+GameRecordReader memory-maps a record file rather than reading it in, and
+parses the moves of a game with one NumPy view per run of move records. GameRecord.position(ply) rebuilds the board and inventories
+after any ply from the nearest of the snapshots it keeps every
+SNAPSHOT_EVERY plies, so random access costs at most that many placements.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from backend.bitboard import Bitboards
+from backend.board import Board
+from backend.piece import pieces
+from backend.player import Player
+from backend.placements import placement_table
+
+VERSION = 2
+SNAPSHOT_EVERY = 16
+
+_GAME = b"G"
+_END = b"E"
+_CONFIG = b"C"
+_HEADER = struct.Struct("<cBI")
+_CONFIG_HEADER = struct.Struct("<cII")
+_MOVE = struct.Struct("<BHH")
+MOVE_DTYPE = np.dtype([("seat", "u1"), ("move", "<u2"), ("ms", "<u2")])
+_WINDOW = 128  # Move records scanned at a time when looking for the end of a game
+
+# Player attributes saved as an agent's config in game headers, when present
+AGENT_SETTINGS = ("max_depth", "time_limit", "simulation_time", "mode", "branching", "workers", "seed")
+# Agent settings that usually differ between games, so they stay in each game's header
+PER_GAME_SETTINGS = ("seed",)
+
+
+def agent_config(player):
+    """The JSON-ready description of a player stored in game headers."""
+    config = {"seat": player.player_id, "agent": type(player).__name__}
+    for name in AGENT_SETTINGS:
+        value = getattr(player, name, None)
+        if isinstance(value, (int, float, str)):
+            config[name] = value
+    return config
+
+
+def _config_record(config):
+    """(key, the b"C" record) of an agent config."""
+    data = json.dumps(config, sort_keys=True).encode()
+    key = int.from_bytes(hashlib.blake2b(data, digest_size=4).digest(), "little")
+    return key, _CONFIG_HEADER.pack(_CONFIG, key, len(data)) + data
+
+
+class GameRecordWriter:
+    """Streams games to a binary file object (or a path, opened for appending)."""
+
+    def __init__(self, file):
+        self._owned = isinstance(file, (str, bytes)) or hasattr(file, "__fspath__")
+        self.file = open(file, "ab") if self._owned else file
+        self.in_game = False
+        self.configs = {}  # Key -> JSON of the agent configs this writer has written
+
+    def begin_game(self, header):
+        if self.in_game:
+            self.end_game()
+        agents = header.get("agents")
+        if isinstance(agents, list) and all(isinstance(agent, dict) for agent in agents):
+            header = dict(header, agents=[self._config_key(seat, agent) for seat, agent in enumerate(agents, 1)])
+        data = json.dumps(header, sort_keys=True, separators=(",", ":")).encode()
+        self.file.write(_HEADER.pack(_GAME, VERSION, len(data)) + data)
+        self.in_game = True
+
+    def _config_key(self, seat, agent):
+        # The seat is implied by the position in the list, so configs differing only in seat share a key
+        inline = {name: agent[name] for name in PER_GAME_SETTINGS if name in agent}
+        shared = {name: value for name, value in agent.items()
+                  if name not in inline and (name != "seat" or value != seat)}
+        key, record = _config_record(shared)
+        self._write_config(key, record)
+        return [key, inline] if inline else key
+
+    def _write_config(self, key, record):
+        config = record[_CONFIG_HEADER.size:]
+        known = self.configs.get(key)
+        if known is None:
+            self.file.write(record)
+            self.configs[key] = config
+        elif known != config:
+            raise ValueError(f"agent configs {known!r} and {config!r} have the same key {key}")
+
+    def append(self, data):
+        """Copy the games and configs in data, a record written elsewhere, leaving out configs already written."""
+        offset = 0
+        while data[offset:offset + 1] == _CONFIG:
+            _, key, length = _CONFIG_HEADER.unpack_from(data, offset)
+            end = offset + _CONFIG_HEADER.size + length
+            self._write_config(key, data[offset:end])
+            offset = end
+        self.file.write(data[offset:])
+        self.file.flush()
+
+    def record_move(self, seat, move_id, seconds=0.0):
+        self.file.write(_MOVE.pack(seat, move_id, min(int(seconds * 1000 + 0.5), 0xFFFF)))
+
+    def end_game(self):
+        self.file.write(_END)
+        self.file.flush()
+        self.in_game = False
+
+    def close(self):
+        if self.in_game:
+            self.file.flush()
+        if self._owned:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameRecord:
+    """One game read back: its header, its moves and whether it was finished."""
+
+    def __init__(self, header, moves, complete):
+        self.header = header
+        self.moves = moves  # Structured array of MOVE_DTYPE
+        self.complete = complete
+        self.size = header.get("size", 20)
+        self._snapshots = None  # Bitboards snapshots at plies 0, SNAPSHOT_EVERY, ...
+
+    def __len__(self):
+        return len(self.moves)
+
+    def move_tuples(self, players=None):
+        """The moves as (original_piece, piece, x, y) tuples, using players' pieces if given."""
+        table = placement_table(self.size)
+        by_seat = {player.player_id: player for player in players} if players else {}
+        return [table.to_move(int(move), by_seat.get(int(seat)))
+                for seat, move in zip(self.moves["seat"], self.moves["move"])]
+
+    def position(self, ply=None):
+        """(board, players) after the first ply moves (default: all of them).
+
+        Players hold every piece they have not placed by then.
+        """
+        if ply is None:
+            ply = len(self.moves)
+        if not 0 <= ply <= len(self.moves):
+            raise IndexError(f"ply {ply} is outside a {len(self.moves)}-move game")
+        snapshots = self._build_snapshots()
+        start = ply // SNAPSHOT_EVERY
+        bitboards = Bitboards(self.size)
+        bitboards.restore(_copy(snapshots[start]))
+        self._replay(bitboards, start * SNAPSHOT_EVERY, ply)
+        board = Board.from_bitboards(bitboards)
+        players = [Player(seat, [piece for name, piece in pieces.items() if name not in board.pieces_used(seat)])
+                   for seat in range(1, 5)]
+        return board, players
+
+    def _build_snapshots(self):
+        if self._snapshots is None:
+            bitboards = Bitboards(self.size)
+            self._snapshots = [bitboards.snapshot()]
+            for start in range(0, len(self.moves) - SNAPSHOT_EVERY + 1, SNAPSHOT_EVERY):
+                self._replay(bitboards, start, start + SNAPSHOT_EVERY)
+                self._snapshots.append(bitboards.snapshot())
+        return self._snapshots
+
+    def _replay(self, bitboards, first, last):
+        # Recorded moves were legal when played, so they are placed unchecked
+        table = placement_table(self.size)
+        for seat, move in zip(self.moves["seat"][first:last].tolist(), self.moves["move"][first:last].tolist()):
+            bitboards.place(seat, *table.masks(move), table.piece_name(move))
+
+
+class GameRecordReader:
+    """Iterates over the games of a record file (path or bytes)."""
+
+    def __init__(self, source):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self.path, self.data = None, bytes(source)
+        else:
+            self.path, self.data = source, None
+
+    def __iter__(self):
+        if self.path is None:
+            yield from _read_games(self.data)
+            return
+        # Mapped, not read: a pass over a large file only pages in what it parses
+        with open(self.path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return  # An empty file cannot be mapped
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield from _read_games(data)
+
+    def games(self):
+        return list(self)
+
+
+def _read_games(data):
+    """The games in data (bytes or a mapped file), putting back the agent configs they refer to."""
+    configs = {}
+    offset = 0
+    while offset < len(data):
+        if data[offset:offset + 1] == _CONFIG:
+            _, key, length = _CONFIG_HEADER.unpack_from(data, offset)
+            offset += _CONFIG_HEADER.size
+            config = json.loads(data[offset:offset + length])
+            if configs.setdefault(key, config) != config:
+                raise ValueError(f"agent config {key} is defined twice, differently")
+            offset += length
+            continue
+        tag, version, length = _HEADER.unpack_from(data, offset)
+        if tag != _GAME:
+            raise ValueError(f"expected a game header at byte {offset}, found {tag!r}")
+        if version != VERSION:
+            raise ValueError(f"game record version {version} is not supported")
+        offset += _HEADER.size
+        header = json.loads(data[offset:offset + length])
+        offset += length
+        if "agents" in header:
+            header["agents"] = [_agent(configs, seat, entry) for seat, entry in enumerate(header["agents"], 1)]
+        moves, offset = _read_moves(data, offset)
+        complete = data[offset:offset + 1] == _END
+        if complete:
+            offset += 1
+        yield GameRecord(header, moves, complete)
+        if not complete and data[offset:offset + 1] not in (_GAME, _CONFIG):
+            # A torn last write: nothing readable follows
+            return
+
+
+def _agent(configs, seat, entry):
+    """The agent config of a header entry: a config key, or [key, per-game settings]."""
+    key, inline = entry if isinstance(entry, list) else (entry, {})
+    if key not in configs:
+        raise ValueError(f"agent config {key} is used before it is defined")
+    return {"seat": seat, **configs[key], **inline}
+
+
+def _read_moves(data, offset):
+    """The run of move records starting at offset, and the offset just past it."""
+    start = offset
+    while True:
+        # A game has at most 84 moves, so one window nearly always holds the whole run
+        rows = min((len(data) - offset) // _MOVE.size, _WINDOW)
+        seats = np.frombuffer(data, dtype=MOVE_DTYPE, count=rows, offset=offset)["seat"]
+        ends = np.flatnonzero((seats < 1) | (seats > 4))
+        if len(ends) or rows < _WINDOW:
+            offset += (int(ends[0]) if len(ends) else rows) * _MOVE.size
+            break
+        offset += rows * _MOVE.size
+    count = (offset - start) // _MOVE.size
+    return np.frombuffer(data, dtype=MOVE_DTYPE, count=count, offset=start).copy(), offset
+
+
+def _copy(snapshot):
+    # Bitboards.restore adopts the snapshot's dicts, so hand it its own copies
+    players, occupied, forbidden, anchors, used, to_move, position = snapshot
+    return players.copy(), occupied, forbidden.copy(), anchors.copy(), used.copy(), to_move, position
@@ -0,0 +1,122 @@
+"""
+Legal moves of one player, carried over from one query to the next.
+
+For every orientation of every piece the player still holds, the cache keeps
+the bitmask of legal origins and the move tuples built from it. Between two
+queries the board only gains cells, so only placements whose footprint covers
+a cell that changed can change:
+
+- origins covering a newly forbidden cell (a new tile, or next to one of the
+  player's own) are dropped, unless they still qualify by covering a free
+  board corner;
+- origins covering a new anchor (a corner of the player's own new tiles) are
+  added when they avoid every forbidden cell;
+- pieces the player no longer holds drop out, and pieces that come back
+  (after an undo) are computed afresh.
+
+Anything else, like cells disappearing on undo, rebuilds the whole cache.
+"""
+
+from backend.bitboard import board_masks, iter_bits, popcount
+from backend.piece import orientations_of
+from backend.placements import placement_table
+
+
+class MoveCache:
+    def __init__(self, player_id):
+        self.player_id = player_id
+        self.queries = 0
+        self.reused = 0  # Moves returned without being regenerated
+        self.generated = 0  # Moves built from freshly computed masks
+        self._occupied = None
+        self._forbidden = None
+        self._anchors = None
+        self._pieces = {}  # name -> (piece, [[orientation, origin mask, moves], ...])
+
+    @property
+    def hit_rate(self):
+        total = self.reused + self.generated
+        return self.reused / total if total else 0.0
+
+    def moves(self, board, player):
+        """Legal (original_piece, piece, x, y) moves, in find_all_valid_moves order."""
+        self.queries += 1
+        bitboards = board.bitboards
+        occupied = bitboards.occupied
+        forbidden = bitboards.forbidden_for(self.player_id)
+        anchors = bitboards.anchors_for(self.player_id)
+        # Carry over only if cells were just added: every anchor lost is forbidden now
+        carry = (self._occupied is not None and not self._occupied & ~occupied
+                 and not self._forbidden & ~forbidden and not self._anchors & ~anchors & ~forbidden)
+        changes = None
+        if carry:
+            changes = (occupied, forbidden, forbidden & ~self._forbidden, anchors & ~self._anchors,
+                       board_masks(board.size).corners & ~occupied)
+
+        pieces = {}
+        valid_moves = []
+        if anchors:
+            for piece in player.pieces:
+                cached = self._pieces.get(piece.name) if carry else None
+                if cached is None or cached[0] is not piece:
+                    cached = (piece, [self._build(board, piece, orientation)
+                                      for orientation in orientations_of(piece)])
+                else:
+                    for entry in cached[1]:
+                        self._update(board, piece, entry, changes)
+                pieces[piece.name] = cached
+                for entry in cached[1]:
+                    valid_moves.extend(entry[2])
+        self._pieces = pieces
+        self._occupied, self._forbidden, self._anchors = occupied, forbidden, anchors
+        return valid_moves
+
+    def move_ids(self, board, player):
+        """The same moves as placement IDs (see backend.placements), in the same order."""
+        self.moves(board, player)
+        table = placement_table(board.size)
+        ids = []
+        for piece_name in self._pieces:
+            for orientation, mask, _ in self._pieces[piece_name][1]:
+                if mask:
+                    ids.extend(table.ids_from_mask(orientation, mask))
+        return ids
+
+    def _build(self, board, piece, orientation):
+        mask = board.legal_origin_mask(orientation, self.player_id)
+        moves = _moves_for(piece, orientation, mask, board.size)
+        self.generated += len(moves)
+        return [orientation, mask, moves]
+
+    def _update(self, board, piece, entry, changes):
+        orientation, mask, moves = entry
+        occupied, forbidden, gained_forbidden, gained_anchors, free_corners = changes
+        shape = orientation.masks(board.size)
+        legal = mask
+        if mask and gained_forbidden:
+            touched = mask & shape.touching(gained_forbidden)
+            if touched:
+                legal = mask & ~touched
+                if free_corners:
+                    # A tile on a free board corner makes up for edge contact
+                    legal |= touched & shape.touching(free_corners) & ~shape.touching(occupied)
+        if gained_anchors:
+            added = shape.touching(gained_anchors) & ~legal
+            if added:
+                legal |= added & ~shape.touching(forbidden)
+
+        if legal == mask:
+            self.reused += len(moves)
+            return
+        size = board.size
+        if legal & ~mask:
+            moves = _moves_for(piece, orientation, legal, size)
+            self.generated += popcount(legal & ~mask)
+        else:
+            moves = [move for move in moves if legal >> (move[2] * size + move[3]) & 1]
+        self.reused += popcount(legal & mask)
+        entry[1], entry[2] = legal, moves
+
+
+def _moves_for(piece, orientation, mask, size):
+    return [(piece, orientation, *divmod(bit, size)) for bit in iter_bits(mask)]
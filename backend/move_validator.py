@@ -1,55 +1,88 @@
-import numpy as np
+from backend.bitboard import Bitboards, board_masks, shape_masks
+from backend.piece import Orientation
 
 class MoveValidator:
-    def __init__(self, grid):
-        self.grid = grid
+    """Placement rules evaluated on bitboards.
+
+    A validator is either attached to a Board, in which case it reads the
+    board's incrementally maintained bitboards, or built from a bare grid, in
+    which case the bitboards are rebuilt whenever the grid contents change.
+    """
+
+    def __init__(self, grid, board=None):
+        self._grid = grid
+        self.board = board
+        self._bitboards = None
+        self._snapshot = None
+
+    @property
+    def grid(self):
+        if self.board is not None:
+            return self.board.grid
+        return self._grid
+
+    @property
+    def size(self):
+        if self.board is not None:
+            return self.board.size
+        return self._grid.shape[0]
+
+    def bitboards(self):
+        if self.board is not None:
+            return self.board.bitboards
+        snapshot = self._grid.tobytes()
+        if snapshot != self._snapshot:
+            self._bitboards = Bitboards.from_grid(self._grid)
+            self._snapshot = snapshot
+        return self._bitboards
+
+    def masks(self, piece, x, y):
+        # (footprint, edge_halo, corner_halo) of the piece at (x, y)
+        return self._shape_masks(piece, self.size).at(x, y)
+
+    @staticmethod
+    def _shape_masks(piece, size):
+        # Registry orientations carry their masks; plain pieces are looked up by shape
+        if type(piece) is Orientation:
+            return piece.masks(size)
+        return shape_masks(piece.shape, size)
 
     def within_bounds(self, piece, x, y):
         # Check bounds
         piece_height, piece_width = piece.shape.shape
-        return 0 <= x <= self.grid.shape[0] - piece_height and 0 <= y <= self.grid.shape[1] - piece_width
+        size = self.size
+        return 0 <= x <= size - piece_height and 0 <= y <= size - piece_width
 
     def not_overlapping(self, piece, x, y):
         # Check overlap
-        piece_height, piece_width = piece.shape.shape
-        for i in range(piece_height):
-            for j in range(piece_width):
-                if piece.shape[i, j] == 1:  # If part of the piece is present at this cell
-                    if self.grid[x + i, y + j] != 0:  # If the cell is not empty
-                        return False
-        return True
-    
+        footprint, _, _ = self.masks(piece, x, y)
+        return not footprint & self.bitboards().occupied
+
     def first_move(self, piece, x, y):
         # Check if the piece is placed at one of the corner coordinates
-        piece_height, piece_width = piece.shape.shape
-        for i in range(piece_height):
-            for j in range(piece_width):
-                if piece.shape[i, j] == 1:
-                    if (x + i == 0 and y + j == 0) or \
-                       (x + i == 0 and y + j == self.grid.shape[1] - 1) or \
-                       (x + i == self.grid.shape[0] - 1 and y + j == 0) or \
-                       (x + i == self.grid.shape[0] - 1 and y + j == self.grid.shape[1] - 1):
-                        return True
-        return False
-    
+        footprint, _, _ = self.masks(piece, x, y)
+        return bool(footprint & board_masks(self.size).corners)
+
     def touching_corner(self, piece, x, y, player):
         # Check if the piece only touches the corners of other pieces
-        piece_height, piece_width = piece.shape.shape
-        touching_corner = False
-        for i in range(piece_height):
-            for j in range(piece_width):
-                if piece.shape[i, j] == 1:  # If part of the piece is present at this cell
-                    # Check adjacent cells to ensure no edge sharing
-                    if (x + i > 0 and self.grid[x + i - 1, y + j] == player.player_id) or \
-                       (x + i < self.grid.shape[0] - 1 and self.grid[x + i + 1, y + j] == player.player_id) or \
-                       (y + j > 0 and self.grid[x + i, y + j - 1] == player.player_id) or \
-                       (y + j < self.grid.shape[1] - 1 and self.grid[x + i, y + j + 1] == player.player_id):
-                        return False
-                    # Check diagonal cells to ensure corner touching
-                if piece.shape[i, j] == 1:
-                    if (x + i > 0 and y + j > 0 and self.grid[x + i - 1, y + j - 1] == player.player_id) or \
-                       (x + i > 0 and y + j < self.grid.shape[1] - 1 and self.grid[x + i - 1, y + j + 1] == player.player_id) or \
-                       (x + i < self.grid.shape[0] - 1 and y + j > 0 and self.grid[x + i + 1, y + j - 1] == player.player_id) or \
-                       (x + i < self.grid.shape[0] - 1 and y + j < self.grid.shape[1] - 1 and self.grid[x + i + 1, y + j + 1] == player.player_id):
-                                touching_corner = True
-        return touching_corner
\ No newline at end of file
+        _, edge_halo, corner_halo = self.masks(piece, x, y)
+        own = self.bitboards().owned(player.player_id)
+        if edge_halo & own:
+            return False
+        return bool(corner_halo & own)
+
+    def is_valid(self, piece, x, y, player):
+        # All rules at once; this is the hot path for move generation
+        board = self.board
+        size = board.size if board is not None else self._grid.shape[0]
+        masks = self._shape_masks(piece, size)
+        if not (0 <= x <= size - masks.height and 0 <= y <= size - masks.width):
+            return False
+        footprint, edge_halo, corner_halo = masks.origins[x * size + y]
+        bitboards = board.bitboards if board is not None else self.bitboards()
+        if footprint & bitboards.occupied:
+            return False
+        if footprint & board_masks(size).corners:
+            return True
+        own = bitboards.players.get(player.player_id, 0)
+        return not edge_halo & own and bool(corner_halo & own)
@@ -0,0 +1,226 @@
+"""
+Precomputed opening moves, looked up by position hash.
+
+The first moves of a game are searched from nearly the same few positions
+every time, so they are searched once, offline, and kept in a book:
+
+    python3 -m backend.opening_book --plies 4 --width 3 --budget 5 --out backend/opening_book.npy
+
+builds it by running a deep MinimaxAI search (or MonteCarloAI with --agent)
+from the empty board, then from the positions after the searched move and
+the next width - 1 best moves by static utility, and so on for plies moves.
+Positions that are the same up to a symmetry of the board are searched once,
+and every entry is stored under all eight symmetries of the board, so the
+book covers whichever corner each seat opens from.
+
+On disk the book is a .npy array of (position key, placement ID) pairs,
+10 bytes an entry, sorted by key. A position key is the Zobrist hash of the
+position with the choosing seat to move (see backend.zobrist). Loaded, it is
+a dict, so a lookup costs one hash and a legality check of the stored move:
+a few microseconds. GreedyAI, MinimaxAI and MonteCarloAI given a book play
+its move whenever it has one. The book counts its lookups and hits.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from backend.bitboard import Bitboards, iter_bits
+from backend.board import Board
+from backend.piece import pieces
+from backend.player import Player
+from backend.placements import placement_table
+from backend.zobrist import turn_key
+from backend.algorithms.greedy import GreedyAI
+from backend.algorithms.minimax import MinimaxAI
+from backend.algorithms.monte_carlo import MonteCarloAI
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.npy")
+SIZE = 20
+
+BOOK_DTYPE = np.dtype([("key", "<u8"), ("move", "<u2")])
+
+# (x, y) -> cell under each of the eight symmetries of a square board of side n + 1
+SYMMETRIES = (
+    lambda x, y, n: (x, y),
+    lambda x, y, n: (y, n - x),
+    lambda x, y, n: (n - x, n - y),
+    lambda x, y, n: (n - y, x),
+    lambda x, y, n: (x, n - y),
+    lambda x, y, n: (n - x, y),
+    lambda x, y, n: (y, x),
+    lambda x, y, n: (n - y, n - x),
+)
+
+_books = {}
+
+
+class OpeningBook:
+    """Position key -> placement ID, with lookup statistics."""
+
+    def __init__(self, entries=None, size=SIZE):
+        self.entries = dict(entries or {})
+        self.size = size
+        self.lookups = 0
+        self.hits = 0
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        rows = np.load(path)
+        return cls(zip(rows["key"].tolist(), rows["move"].tolist()))
+
+    def save(self, path):
+        rows = np.array(sorted(self.entries.items()), dtype=BOOK_DTYPE)
+        with open(path, "wb") as file:
+            np.save(file, rows)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def move(self, board, player):
+        """The book's (original_piece, piece, x, y) move for player here, or None."""
+        self.lookups += 1
+        if board.size != self.size:
+            return None
+        bitboards = board.bitboards
+        key = bitboards.hash
+        if bitboards.to_move != player.player_id:
+            key ^= turn_key(bitboards.to_move) ^ turn_key(player.player_id)
+        move_id = self.entries.get(key)
+        if move_id is None or not board.id_is_legal(move_id, player.player_id):
+            return None
+        move = placement_table(self.size).to_move(move_id, player)
+        # A player holding other pieces than the board says is not in the book
+        if not any(piece is move[0] for piece in player.pieces):
+            return None
+        self.hits += 1
+        return move
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def stats(self):
+        return {"entries": len(self.entries), "lookups": self.lookups, "hits": self.hits,
+                "hit_rate": self.hit_rate}
+
+
+def load_book(path=DEFAULT_PATH):
+    """The book at path, loaded once per process; an empty book if there is no file."""
+    book = _books.get(path)
+    if book is None:
+        book = _books[path] = OpeningBook.load(path) if os.path.exists(path) else OpeningBook()
+    return book
+
+
+class _Symmetries:
+    """Placement IDs mapped through each symmetry of the board."""
+
+    def __init__(self, size):
+        self.table = placement_table(size)
+        self.by_footprint = {footprint: move_id for move_id, footprint in enumerate(self.table.footprints)}
+        n = size - 1
+        self.cells = [[x * size + y for x, y in (symmetry(*divmod(bit, size), n) for bit in range(size * size))]
+                      for symmetry in SYMMETRIES]
+
+    def image(self, move_id, symmetry):
+        cells = self.cells[symmetry]
+        footprint = 0
+        for bit in iter_bits(self.table.footprints[move_id]):
+            footprint |= 1 << cells[bit]
+        return self.by_footprint[footprint]
+
+    def images(self, line, move_id):
+        """(key, move ID) of the position after line, with its next seat to choose, under every symmetry."""
+        for symmetry in range(len(SYMMETRIES)):
+            yield position_key([(seat, self.image(move, symmetry)) for seat, move in line],
+                               self.table.size), self.image(move_id, symmetry)
+
+
+def replay(line, size=SIZE):
+    """(board, players) after line, a list of (seat, placement ID) moves."""
+    board = Board(size)
+    players = [Player(seat, list(pieces.values())) for seat in range(1, 5)]
+    for seat, move_id in line:
+        if board.apply_move_id(move_id, players[seat - 1]) is None:
+            raise ValueError(f"move {move_id} is illegal for seat {seat}")
+    return board, players
+
+
+def position_key(line, size=SIZE):
+    """The book key of the position after line, with the seat after the last mover to choose."""
+    table = placement_table(size)
+    bitboards = Bitboards(size)
+    for seat, move_id in line:
+        bitboards.place(seat, *table.masks(move_id), table.piece_name(move_id))
+    return bitboards.hash
+
+
+def _searcher(agent, seat, held, budget):
+    if agent == "minimax":
+        return MinimaxAI(seat, held, max_depth=8, time_limit=budget)
+    if agent == "monte_carlo":
+        return MonteCarloAI(seat, held, simulation_time=budget, seed=0)
+    raise ValueError(f"unknown book agent {agent!r}")
+
+
+def build(plies=4, width=3, budget=5.0, agent="minimax", size=SIZE, progress=print):
+    """Search the opening tree and return the OpeningBook of its best moves."""
+    symmetries = _Symmetries(size)
+    table = symmetries.table
+    book = OpeningBook(size=size)
+    seen = set()
+    lines = [[]]
+    for ply in range(plies):
+        next_lines = []
+        for line in lines:
+            board, players = replay(line, size)
+            mover = players[board.bitboards.to_move - 1]
+            if not mover.has_valid_move(board):
+                continue
+            move = _searcher(agent, mover.player_id, list(mover.pieces), budget).choose_move(board)
+            best = table.id_of(move)
+            book.entries.update(symmetries.images(line, best))
+            if progress is not None:
+                progress(f"ply {ply}: {len(book)} entries, seat {mover.player_id} plays "
+                         f"{table.piece_name(best)} at {table.placement(best)[1:]}")
+            if ply + 1 == plies:
+                continue
+            # The searched move, then the best others by static utility, one per symmetry class
+            greedy = GreedyAI(mover.player_id, mover.pieces)
+            candidates = greedy.legal_moves(board)
+            scores = greedy.score_moves(board, candidates)
+            order = [best] + [table.id_of(candidates[i]) for i in np.argsort(scores)[::-1]]
+            chosen = 0
+            for move_id in order:
+                child = line + [(mover.player_id, move_id)]
+                canonical = min(key for key, _ in symmetries.images(child, move_id))
+                if canonical in seen:
+                    continue
+                seen.add(canonical)
+                next_lines.append(child)
+                chosen += 1
+                if chosen == width:
+                    break
+        lines = next_lines
+    return book
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the opening book offline")
+    parser.add_argument("--plies", type=int, default=4, help="moves deep the book goes")
+    parser.add_argument("--width", type=int, default=3, help="continuations followed from each position")
+    parser.add_argument("--budget", type=float, default=5.0, help="seconds of search per position")
+    parser.add_argument("--agent", choices=("minimax", "monte_carlo"), default="minimax")
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+    book = build(args.plies, args.width, args.budget, args.agent)
+    book.save(args.out)
+    print(f"Wrote {len(book)} positions to {args.out}")
+    return book
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,5 +1,6 @@
 import numpy as np
 from copy import deepcopy
+from backend.bitboard import shape_masks
 
 class Piece:
 
@@ -55,4 +56,94 @@ pieces_list = [
 ]
 
 # Create a dictionary to map piece names to Piece objects
-pieces = {piece.name: piece for piece in pieces_list}
\ No newline at end of file
+pieces = {piece.name: piece for piece in pieces_list}
+
+_EDGE_OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_CORNER_OFFSETS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+class Orientation:
+    """One immutable orientation of a piece, shared by every move that uses it.
+
+    Quacks like a Piece (name, shape) so it can be handed straight to Board and
+    MoveValidator, and carries the geometry move generation needs: tile offsets,
+    bounding box, tile count and the edge/corner halo offsets around the tiles.
+    """
+
+    __slots__ = ("name", "orientation_id", "shape", "cells", "height", "width",
+                 "tile_count", "edge_halo", "corner_halo", "_masks")
+
+    def __init__(self, name, orientation_id, shape):
+        shape = np.array(shape, dtype=int)
+        shape.setflags(write=False)
+        self.name = name
+        self.orientation_id = orientation_id
+        self.shape = shape
+        self.height, self.width = shape.shape
+        self.cells = tuple((int(i), int(j)) for i, j in np.argwhere(shape == 1))
+        self.tile_count = len(self.cells)
+        cells = set(self.cells)
+        edge_halo = {(i + di, j + dj) for i, j in self.cells for di, dj in _EDGE_OFFSETS}
+        edge_halo -= cells
+        corner_halo = {(i + di, j + dj) for i, j in self.cells for di, dj in _CORNER_OFFSETS}
+        corner_halo -= cells | edge_halo
+        self.edge_halo = tuple(sorted(edge_halo))
+        self.corner_halo = tuple(sorted(corner_halo))
+        self._masks = {}
+
+    def masks(self, size=20):
+        # Bitboard masks of this orientation at every origin on a size x size board
+        masks = self._masks.get(size)
+        if masks is None:
+            masks = self._masks[size] = shape_masks(self.shape, size)
+        return masks
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        if ORIENTATIONS.get((self.name, self.orientation_id)) is self:
+            return orientation, (self.name, self.orientation_id)
+        return Orientation, (self.name, self.orientation_id, self.shape.tolist())
+
+    def __repr__(self):
+        return f"{self.name}: \n{self.shape}"
+
+
+def _build_orientations(piece):
+    return tuple(Orientation(piece.name, orientation_id, shape)
+                 for orientation_id, shape in enumerate(piece.all_orientations()))
+
+# Registry of the 91 distinct orientations of the 21 pieces, built once per process
+PIECE_ORIENTATIONS = {piece.name: _build_orientations(piece) for piece in pieces_list}
+ORIENTATIONS = {(o.name, o.orientation_id): o
+                for piece_orientations in PIECE_ORIENTATIONS.values() for o in piece_orientations}
+
+# Orientations of pieces outside the standard set (tests, custom shapes)
+_custom_orientations = {}
+
+
+def orientation(piece_name, orientation_id):
+    return ORIENTATIONS[(piece_name, orientation_id)]
+
+
+def orientations_of(piece):
+    """Return the registered orientations of a piece without allocating any."""
+    found = PIECE_ORIENTATIONS.get(piece.name)
+    if found is not None and found[0].tile_count == int(np.count_nonzero(piece.shape)):
+        return found
+    key = (piece.name, piece.shape.shape, piece.shape.tobytes())
+    found = _custom_orientations.get(key)
+    if found is None:
+        found = _custom_orientations[key] = _build_orientations(piece)
+    return found
+
+
+def piece_cells(piece):
+    """Tile offsets of a Piece or Orientation, read from the registry when possible."""
+    if type(piece) is Orientation:
+        return piece.cells
+    return tuple((int(i), int(j)) for i, j in np.argwhere(piece.shape == 1))
@@ -0,0 +1,118 @@
+"""
+Every in-bounds placement on the board, numbered with a dense integer ID.
+
+A placement is one orientation of one piece at one origin. The table lists
+them orientation by orientation, in registry order (pieces in the order of
+backend.piece.pieces, then their orientation ids), each orientation's origins
+row by row, so
+
+    move_id = first ID of the orientation + x * columns + y
+
+where columns is the number of origins per row. Each entry has its piece
+index, orientation, origin, footprint mask and edge/corner halo masks, so
+searches can keep moves as plain ints that hash, compare and pickle cheaply.
+to_move() and id_of() convert to and from the (original_piece, piece, x, y)
+tuples used by app.py, GameManager and the tests.
+"""
+
+import numpy as np
+
+from backend.bitboard import iter_bits
+from backend.piece import PIECE_ORIENTATIONS, pieces
+
+# Piece index of every registry piece
+PIECE_NAMES = tuple(pieces)
+
+_tables = {}
+
+
+class PlacementTable:
+    def __init__(self, size=20):
+        self.size = size
+        self._first = {}  # orientation -> (first ID, origins per row)
+        piece_index, orientations, origins = [], [], []
+        self.footprints, self.edge_halos, self.corner_halos = [], [], []
+        for index, name in enumerate(PIECE_NAMES):
+            for orientation in PIECE_ORIENTATIONS[name]:
+                masks = orientation.masks(size)
+                columns = size - orientation.width + 1
+                self._first[orientation] = (len(origins), columns)
+                for x in range(size - orientation.height + 1):
+                    for y in range(columns):
+                        footprint, edge_halo, corner_halo = masks.origins[x * size + y]
+                        piece_index.append(index)
+                        orientations.append(orientation)
+                        origins.append(x * size + y)
+                        self.footprints.append(footprint)
+                        self.edge_halos.append(edge_halo)
+                        self.corner_halos.append(corner_halo)
+        self.piece_index = np.array(piece_index, dtype=np.int8)
+        self.origins = np.array(origins, dtype=np.int16)
+        self.orientations = orientations
+
+    def __len__(self):
+        return len(self.orientations)
+
+    def move_id(self, orientation, x, y):
+        """ID of a registry orientation placed with its top-left at (x, y)."""
+        try:
+            first, columns = self._first[orientation]
+        except KeyError:
+            raise ValueError(f"{orientation.name} is not a registered orientation") from None
+        if not (0 <= x <= self.size - orientation.height and 0 <= y < columns):
+            raise ValueError(f"{orientation.name} at ({x}, {y}) is off the board")
+        return first + x * columns + y
+
+    def id_of(self, move):
+        """ID of an (original_piece, piece, x, y) move.
+
+        piece may also be a Piece turned by hand (as Player.choose_move does);
+        it is matched to the registry orientation with the same shape.
+        """
+        _, orientation, x, y = move
+        if orientation not in self._first:
+            orientation = next((o for o in PIECE_ORIENTATIONS.get(orientation.name, ())
+                                if np.array_equal(o.shape, orientation.shape)), orientation)
+        return self.move_id(orientation, x, y)
+
+    def ids_from_mask(self, orientation, origins):
+        """IDs of orientation at every origin (bit x * size + y) set in origins, ascending."""
+        first, columns = self._first[orientation]
+        ids = []
+        for bit in iter_bits(origins):
+            x, y = divmod(bit, self.size)
+            ids.append(first + x * columns + y)
+        return ids
+
+    def placement(self, move_id):
+        """(orientation, x, y) of a move ID."""
+        x, y = divmod(int(self.origins[move_id]), self.size)
+        return self.orientations[move_id], x, y
+
+    def masks(self, move_id):
+        """(footprint, edge_halo, corner_halo) bitmasks of a move ID."""
+        return self.footprints[move_id], self.edge_halos[move_id], self.corner_halos[move_id]
+
+    def piece_name(self, move_id):
+        return PIECE_NAMES[self.piece_index[move_id]]
+
+    def to_move(self, move_id, player=None):
+        """The (original_piece, piece, x, y) tuple of a move ID.
+
+        original_piece is the player's own piece of that name when a player is
+        given and holds it, else the registry piece.
+        """
+        orientation, x, y = self.placement(move_id)
+        original_piece = pieces[orientation.name]
+        if player is not None:
+            original_piece = next((piece for piece in player.pieces if piece.name == orientation.name),
+                                  original_piece)
+        return original_piece, orientation, x, y
+
+
+def placement_table(size=20):
+    """The PlacementTable for a size x size board, built on first use."""
+    table = _tables.get(size)
+    if table is None:
+        table = _tables[size] = PlacementTable(size)
+    return table
@@ -1,16 +1,45 @@
-from backend.piece import Piece
+from backend.piece import Piece, orientations_of
 from copy import deepcopy
+import logging
+
+logger = logging.getLogger(__name__)
 
 class Player:
+    # How GameManager announces the turn, and how many tries choose_move gets
+    label = "user"
+    is_ai = False
+    move_attempts = 3
+    # OpeningBook the AIs consult before searching (see backend.opening_book)
+    book = None
+
     def __init__(self, player_id, pieces):
         self.player_id = player_id
         self.pieces = pieces
 
+    def book_move(self, board):
+        """The opening book's move for this position, or None (always None without a book)."""
+        return self.book.move(board, self) if self.book is not None else None
+
     def remove_piece(self, piece):
         if piece in self.pieces:
             self.pieces.remove(piece)
 
-    def choose_move(self, board):
+    def play(self, context):
+        """Ask choose_move for a move up to move_attempts times; None if none came back."""
+        move = None
+        attempts = 0
+        while move is None and attempts < self.move_attempts:
+            move = self.choose_move(context.board, context)
+            attempts += 1
+        return move
+
+    def legal_moves(self, board, context=None):
+        # The turn's memoized moves when a TurnContext for this board is given
+        if context is not None and context.board is board:
+            return context.legal_moves(self)
+        return self.find_all_valid_moves(board)
+
+    def choose_move(self, board, context=None):
         print(f"Player {self.player_id}, choose a move.")
         
         for i, piece in enumerate(self.pieces):
@@ -48,17 +77,16 @@ class Player:
     def get_all_orientations(self):
         all_orientations = {}
         for piece in self.pieces:
-            all_orientations[piece.name] = piece.all_orientations()
+            all_orientations[piece.name] = [orientation.shape for orientation in orientations_of(piece)]
         return all_orientations
 
+    def has_valid_move(self, board):
+        # Cheaper than find_all_valid_moves when only the yes/no answer matters
+        return board.has_any_move(self)
+
     def find_all_valid_moves(self, board):
-        valid_moves = []
-        for piece in self.pieces:
-            for orientation in piece.all_orientations():
-                orientation_piece = Piece(orientation, piece.name)  # Create a Piece object for each orientation
-                for x in range(board.size):
-                    for y in range(board.size):
-                        if board.is_valid(orientation_piece, x, y, self):
-                            valid_moves.append((piece, orientation_piece, x, y))
-        print(f"🔍 Player {self.player_id} valid moves: {len(valid_moves)}")
-        return valid_moves
\ No newline at end of file
+        # The board keeps each player's moves between turns and only updates
+        # the placements its new tiles affect (see backend/move_cache.py)
+        valid_moves = board.legal_moves(self)
+        logger.debug("Player %d valid moves: %d", self.player_id, len(valid_moves))
+        return valid_moves
@@ -0,0 +1,50 @@
+import json
+import unittest
+from backend.benchmarks.suite import CORPUS, PHASES, build_corpus, load_position, run_suite, compare
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.benchmark_suite_tests
+"""
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def setUp(self):
+        with open(CORPUS) as corpus_file:
+            self.corpus = json.load(corpus_file)
+
+    def test_saved_corpus_is_reproducible(self):
+        self.assertEqual(set(self.corpus), set(PHASES))
+        self.assertEqual(build_corpus(), self.corpus)
+
+    def test_positions_replay_legally(self):
+        tiles = []
+        for phase in PHASES:
+            board, players = load_position(self.corpus[phase])
+            tiles.append(sum(board.get_score().values()))
+            self.assertEqual(sorted(len(board.pieces_used(i)) for i in range(1, 5)),
+                             sorted(21 - len(player.pieces) for player in players))
+        self.assertEqual(tiles, sorted(tiles))
+        with self.assertRaises(ValueError):
+            load_position([[1, 0], [1, 0]])
+
+    def test_results_and_comparison(self):
+        results = run_suite(self.corpus, only="get_score", progress=None)
+        self.assertEqual(set(results["benchmarks"]), {f"get_score/{phase}" for phase in PHASES})
+        self.assertEqual(compare(results, results, 0.0), [])
+        slower = json.loads(json.dumps(results))
+        slower["benchmarks"]["get_score/opening"]["median_s"] *= 2
+        slower["benchmarks"]["new/benchmark"] = {"median_s": 1.0, "peak_kib": 1.0}
+        regressions = compare(slower, results, 0.5)
+        self.assertEqual([(name, metric) for name, metric, _, _ in regressions],
+                         [("get_score/opening", "median_s")])
+        self.assertEqual(compare(slower, results, 1.5), [])
+
+    def test_comparison_skips_missing_and_zero_metrics(self):
+        baseline = {"benchmarks": {"a": {"median_s": 0.0, "peak_kib": None},
+                                   "b": {"median_s": 1.0, "peak_kib": 1.0}}}
+        current = {"benchmarks": {"a": {"median_s": 1.0, "peak_kib": 1.0},
+                                  "b": {"median_s": None, "peak_kib": 3.0}}}
+        self.assertEqual(compare(current, baseline, 0.5), [("b", "peak_kib", 1.0, 3.0)])
+
+if __name__ == "__main__":
+    unittest.main()
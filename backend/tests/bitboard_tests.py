@@ -0,0 +1,102 @@
+import unittest
+import random
+import numpy as np
+from copy import deepcopy
+from backend.bitboard import Bitboards, cell_bit, shape_masks, iter_bits
+from backend.board import Board
+from backend.piece import Piece, pieces
+from backend.fixtures import LoopValidator
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.bitboard_tests
+"""
+
+class MockPlayer:
+    def __init__(self, player_id):
+        self.player_id = player_id
+
+def cells_of(mask, size=20):
+    return {divmod(bit, size) for bit in iter_bits(mask)}
+
+class TestShapeMasks(unittest.TestCase):
+    def test_footprint(self):
+        masks = shape_masks(np.array([[1, 1], [1, 0]]))
+        footprint, _, _ = masks.at(3, 4)
+        self.assertEqual(cells_of(footprint), {(3, 4), (3, 5), (4, 4)})
+
+    def test_halos_do_not_wrap_rows(self):
+        # A monomino on the left edge must not see the previous row's last column
+        masks = shape_masks(np.array([[1]]))
+        _, edge, corner = masks.at(5, 0)
+        self.assertEqual(cells_of(edge), {(4, 0), (6, 0), (5, 1)})
+        self.assertEqual(cells_of(corner), {(4, 1), (6, 1)})
+        _, edge, corner = masks.at(5, 19)
+        self.assertEqual(cells_of(edge), {(4, 19), (6, 19), (5, 18)})
+        self.assertEqual(cells_of(corner), {(4, 18), (6, 18)})
+
+    def test_halos_clip_at_corners(self):
+        masks = shape_masks(np.array([[1]]))
+        _, edge, corner = masks.at(0, 0)
+        self.assertEqual(cells_of(edge), {(1, 0), (0, 1)})
+        self.assertEqual(cells_of(corner), {(1, 1)})
+        _, edge, corner = masks.at(19, 19)
+        self.assertEqual(cells_of(edge), {(18, 19), (19, 18)})
+        self.assertEqual(cells_of(corner), {(18, 18)})
+
+class TestBitboards(unittest.TestCase):
+    def test_grid_round_trip(self):
+        grid = np.zeros((20, 20), dtype=int)
+        grid[0, 0] = 1
+        grid[19, 19] = 4
+        grid[7, 3] = 2
+        bitboards = Bitboards.from_grid(grid)
+        self.assertEqual(bitboards.owned(1), cell_bit(0, 0))
+        self.assertEqual(bitboards.occupied, cell_bit(0, 0) | cell_bit(19, 19) | cell_bit(7, 3))
+        np.testing.assert_array_equal(bitboards.to_grid(), grid)
+
+    def test_board_grid_is_derived_view(self):
+        board = Board()
+        board.place_piece(Piece([[1, 1], [1, 0]], "V3"), 0, 0, MockPlayer(1))
+        self.assertEqual(board.grid[0, 1], 1)
+        self.assertTrue(board.place_piece(Piece([[1, 1]], "I2"), 2, 1, MockPlayer(1)))
+        self.assertEqual(board.grid[2, 2], 1)
+
+    def test_direct_grid_writes_resync(self):
+        board = Board()
+        board.grid[0, 0] = 2
+        self.assertFalse(board.is_valid(Piece([[1]], "I1"), 0, 0, MockPlayer(1)))
+        board.grid.fill(3)
+        self.assertEqual(board.get_score()[3], 400)
+
+    def test_deepcopy_is_independent(self):
+        board = Board()
+        board.place_piece(Piece([[1]], "I1"), 0, 0, MockPlayer(1))
+        board.grid  # Materialize the grid view before copying
+        copy = deepcopy(board)
+        copy.place_piece(Piece([[1]], "I1"), 1, 1, MockPlayer(1))
+        self.assertEqual(board.get_score()[1], 1)
+        self.assertEqual(copy.get_score()[1], 2)
+        self.assertEqual(board.grid[1, 1], 0)
+        self.assertEqual(copy.grid[1, 1], 1)
+
+    def test_matches_loop_validator(self):
+        rng = random.Random(7)
+        shapes = [Piece(orientation, piece.name) for piece in pieces.values()
+                  for orientation in piece.all_orientations()]
+        players = [MockPlayer(i) for i in range(1, 5)]
+        for _ in range(30):
+            grid = np.zeros((20, 20), dtype=int)
+            for _ in range(rng.randrange(120)):
+                grid[rng.randrange(20), rng.randrange(20)] = rng.randint(1, 4)
+            board = Board()
+            board.grid = grid
+            reference = LoopValidator(grid)
+            for _ in range(300):
+                piece, player = rng.choice(shapes), rng.choice(players)
+                x, y = rng.randrange(20), rng.randrange(20)
+                self.assertEqual(board.is_valid(piece, x, y, player),
+                                 reference.is_valid(piece, x, y, player))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,11 @@ import numpy as np
 from backend.board import Board
 from backend.piece import Piece
 from backend.move_validator import MoveValidator
+from backend.piece import pieces
+from backend.player import Player
+from backend.piece import orientations_of
+from backend.bitboard import Bitboards, iter_bits
+from backend.fixtures import mid_game_board
 
 """
 TEST COMMAND
@@ -92,5 +97,149 @@ class TestBoard(unittest.TestCase):
         self.board.place_piece(piece3, 1, 2, self.player1)
         self.assertEqual(self.board.get_score(), {1: 6, 2: 3, 3: 0, 4: 0})
 
+    def test_apply_move_and_undo(self):
+        player = Player(1, list(pieces.values()))
+        move = player.find_all_valid_moves(self.board)[0]
+        token = self.board.apply_move(move, player)
+        self.assertIsNotNone(token)
+        self.assertNotIn(move[0], player.pieces)
+        self.assertEqual(self.board.get_score()[1], move[1].tile_count)
+        self.board.undo(token)
+        self.assertEqual(player.pieces, list(pieces.values()))
+        self.assertEqual(self.board.get_score(), {1: 0, 2: 0, 3: 0, 4: 0})
+        np.testing.assert_array_equal(self.board.grid, np.zeros((20, 20), dtype=int))
+
+    def test_apply_move_rejects_illegal(self):
+        player = Player(1, list(pieces.values()))
+        piece = pieces["O4"]
+        self.assertIsNone(self.board.apply_move((piece, piece, 5, 5), player))
+        self.assertIn(piece, player.pieces)
+
+    def test_undo_sequence_restores_position(self):
+        players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+        for turn in range(8):
+            player = players[turn % 4]
+            original_piece, piece, x, y = player.find_all_valid_moves(self.board)[turn]
+            self.board.place_piece(piece, x, y, player)
+            player.remove_piece(original_piece)
+        grid = self.board.grid.copy()
+        anchors = {player.player_id: self.board.anchors(player.player_id) for player in players}
+        inventories = [list(player.pieces) for player in players]
+
+        tokens = []
+        for turn in range(12):
+            player = players[turn % 4]
+            moves = player.find_all_valid_moves(self.board)
+            if moves:
+                tokens.append(self.board.apply_move(moves[len(moves) // 2], player))
+        for token in reversed(tokens):
+            self.board.undo(token)
+
+        np.testing.assert_array_equal(self.board.grid, grid)
+        for player, inventory in zip(players, inventories):
+            self.assertEqual(player.pieces, inventory)
+            self.assertEqual(self.board.anchors(player.player_id), anchors[player.player_id])
+
+    def test_hash_is_order_independent(self):
+        player1, player2 = Player(1, list(pieces.values())), Player(2, list(pieces.values()))
+        first = (pieces["I1"], pieces["I1"], 0, 0)
+        second = (pieces["I2"], pieces["I2"], 19, 18)
+        other = Board()
+        self.board.place_piece(first[1], 0, 0, player1)
+        self.board.place_piece(second[1], 19, 18, player2)
+        other.place_piece(second[1], 19, 18, player2)
+        other.place_piece(first[1], 0, 0, player1)
+        # Same cells and pieces, but the player to move follows the last placement
+        self.assertNotEqual(self.board.hash, other.hash)
+        third = Board()
+        third.place_piece(first[1], 0, 0, player1)
+        third.place_piece(second[1], 19, 18, player2)
+        self.assertEqual(self.board.hash, third.hash)
+
+    def test_hash_restored_by_undo(self):
+        player = Player(1, list(pieces.values()))
+        empty_hash = self.board.hash
+        token = self.board.apply_move(player.find_all_valid_moves(self.board)[5], player)
+        self.assertNotEqual(self.board.hash, empty_hash)
+        self.board.undo(token)
+        self.assertEqual(self.board.hash, empty_hash)
+
+    def test_pieces_used_follows_apply_and_undo(self):
+        player = Player(1, list(pieces.values()))
+        move = player.find_all_valid_moves(self.board)[0]
+        token = self.board.apply_move(move, player)
+        self.assertEqual(self.board.pieces_used(1), {move[0].name})
+        self.assertEqual(self.board.pieces_used(2), frozenset())
+        self.board.undo(token)
+        self.assertEqual(self.board.pieces_used(1), frozenset())
+
+    def test_copies_of_the_grid_are_detached(self):
+        player = Player(1, list(pieces.values()))
+        self.board.apply_move((pieces["I1"], pieces["I1"], 0, 0), player)
+        position = self.board.hash
+        copy = self.board.grid.copy()
+        copy[5, 5] = 3
+        (self.board.grid + 1)[6, 6] = 3
+        self.assertEqual(self.board.hash, position)
+        self.assertEqual(self.board.grid[5, 5], 0)
+        # Views still write through to the board
+        self.board.grid[5][5] = 3
+        self.assertEqual(self.board.bitboards.owned(3), 1 << (5 * 20 + 5))
+
+    def test_grid_edits_keep_pieces_used_and_seat_to_move(self):
+        player = Player(1, list(pieces.values()))
+        self.board.apply_move((pieces["I1"], pieces["I1"], 0, 0), player)
+        self.board.grid[19, 19] = 3
+        self.assertEqual(self.board.pieces_used(1), {"I1"})
+        self.assertEqual(self.board.pieces_used(3), frozenset())
+        self.assertEqual(self.board.bitboards.to_move, 2)
+        expected = Bitboards.from_grid(self.board.grid, {1: frozenset({"I1"})}, 2)
+        self.assertEqual(self.board.hash, expected.hash)
+
+    def test_legal_origin_mask_matches_legal_origins(self):
+        players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+        for turn in range(12):
+            player = players[turn % 4]
+            moves = player.find_all_valid_moves(self.board)
+            original_piece, piece, x, y = moves[len(moves) // 3]
+            self.board.place_piece(piece, x, y, player)
+            player.remove_piece(original_piece)
+        for player in players:
+            for orientation in orientations_of(pieces["F5"]) + orientations_of(pieces["I2"]):
+                mask = self.board.legal_origin_mask(orientation, player.player_id)
+                origins = [divmod(bit, 20) for bit in iter_bits(mask)]
+                self.assertEqual(origins, self.board.legal_origins(orientation, player.player_id))
+
+    def test_has_any_move_matches_move_generation(self):
+        for turns in (0, 30, 60, 100):
+            board, players = mid_game_board(seed=turns, turns=turns)
+            for player in players:
+                self.assertEqual(board.has_any_move(player), bool(player.find_all_valid_moves(board)))
+                self.assertEqual(player.has_valid_move(board), bool(player.find_all_valid_moves(board)))
+
+    def test_stuck_flag_is_dropped_by_undo(self):
+        player, other = Player(1, [pieces["I5"]]), Player(2, [pieces["O4"]])
+        for x, y in ((0, 0), (0, 19), (19, 0)):
+            self.board.grid[x, y] = 2
+        token = self.board.apply_move((pieces["O4"], pieces["O4"], 18, 18), other)
+        self.assertIsNotNone(token)
+        self.assertFalse(self.board.has_any_move(player))
+        self.assertIn(1, self.board._stuck)
+        self.assertFalse(self.board.has_any_move(player))
+        self.board.undo(token)
+        self.assertTrue(self.board.has_any_move(player))
+
+    def test_stuck_flag_does_not_survive_a_change_of_owner(self):
+        player, other = Player(1, [pieces["I5"], pieces["O4"]]), Player(2, [pieces["O4"]])
+        for x, y in ((0, 0), (0, 19), (19, 0)):
+            self.board.grid[x, y] = 2
+        token = self.board.apply_move((pieces["O4"], pieces["O4"], 18, 18), other)
+        self.assertFalse(self.board.has_any_move(player))
+        # Replay the same cells for player 1: nothing is freed, but it now has anchors
+        self.board.undo(token)
+        self.assertIsNotNone(self.board.apply_move((pieces["O4"], pieces["O4"], 18, 18), player))
+        self.assertTrue(self.board.has_any_move(player))
+        self.assertEqual(self.board.has_any_move(player), bool(player.find_all_valid_moves(self.board)))
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,61 @@
+import io
+import sys
+import logging
+import unittest
+from backend.board import Board
+from backend.piece import pieces
+from backend.diagnostics import configure, describe_move
+from backend.algorithms import greedy
+from backend.algorithms.greedy import GreedyAI
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.diagnostics_tests
+"""
+
+class TestDiagnostics(unittest.TestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.board = Board()
+        self.ai = GreedyAI(1, list(pieces.values()))
+
+    def tearDown(self):
+        configure("", stream=sys.stderr)
+
+    def test_quiet_by_default(self):
+        configure("", stream=self.stream)
+        self.ai.choose_move(self.board)
+        self.assertEqual(self.stream.getvalue(), "")
+
+    def test_module_levels(self):
+        configure("WARNING,backend.player=DEBUG", stream=self.stream)
+        self.assertTrue(logging.getLogger("backend.player").isEnabledFor(logging.DEBUG))
+        self.assertFalse(logging.getLogger("backend.algorithms.greedy").isEnabledFor(logging.DEBUG))
+        self.ai.find_all_valid_moves(self.board)
+        self.assertIn("Player 1 valid moves", self.stream.getvalue())
+
+    def test_summary_line_per_decision(self):
+        configure("summary", stream=self.stream)
+        move = self.ai.choose_move(self.board)
+        lines = self.stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn("player=1 ai=GreedyAI moves=", lines[0])
+        self.assertIn(f"move={describe_move(move)}", lines[0])
+        self.assertIn("time_ms=", lines[0])
+
+    def test_disabled_debug_is_never_called(self):
+        configure("", stream=self.stream)
+        calls = []
+        original = greedy.logger.debug
+        greedy.logger.debug = lambda *args, **kwargs: calls.append(args)
+        try:
+            self.ai.choose_move(self.board)
+            self.assertEqual(calls, [])
+            configure("backend.algorithms.greedy=DEBUG", stream=self.stream)
+            self.ai.choose_move(self.board)
+            self.assertGreater(len(calls), 0)
+        finally:
+            greedy.logger.debug = original
+
+if __name__ == "__main__":
+    unittest.main()
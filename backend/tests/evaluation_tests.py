@@ -0,0 +1,55 @@
+import unittest
+from backend.board import Board
+from backend.piece import pieces
+from backend.player import Player
+from backend.evaluation import corner_counts, utilities, utility
+from backend.algorithms.greedy import GreedyAI
+from backend.algorithms.minimax import MinimaxAI
+from backend.fixtures import legacy_count_valid_corners, legacy_utility, mid_game_board
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.evaluation_tests
+"""
+
+class TestEvaluation(unittest.TestCase):
+    def test_batch_matches_per_move_utility(self):
+        for turns in (0, 9, 30):
+            board, players = mid_game_board(turns=turns)
+            for player in players[:2]:
+                placements = [(piece, x, y) for _, piece, x, y in player.find_all_valid_moves(board)]
+                for center, weight in (((9.5, 9.5), 0.5), ((10, 10), 1.0)):
+                    expected = [legacy_utility(player, piece, x, y, board, center, weight)
+                                for piece, x, y in placements]
+                    self.assertEqual(utilities(board, player, placements, center, weight).tolist(), expected)
+
+    def test_illegal_placements_count_corners_unplaced(self):
+        board, players = mid_game_board(turns=6)
+        player = players[0]
+        placements = [(pieces["O4"], 0, 0), (pieces["I5"], 9, 3), (pieces["X5"], 18, 18), (pieces["L4"], -1, 2)]
+        self.assertEqual(corner_counts(board, player, placements),
+                         [legacy_count_valid_corners(player, piece, x, y, board) for piece, x, y in placements])
+
+    def test_corners_are_counted_with_the_piece_placed(self):
+        board = Board()
+        greedy = GreedyAI(1, list(pieces.values()))
+        board.place_piece(pieces["O4"], 0, 0, greedy)
+        # I2 on (2, 2)-(2, 3) opens (1, 4), (3, 1) and (3, 4). Before the bitboard
+        # Board, the copy never placed it and 6 cells counted, some beside or under the piece
+        self.assertEqual(corner_counts(board, greedy, [(pieces["I2"], 2, 2)]), [3])
+        self.assertEqual(greedy.count_valid_corners(pieces["I2"], 2, 2, board), 3)
+
+    def test_empty_batch(self):
+        self.assertEqual(len(utilities(Board(), Player(1, []), [])), 0)
+
+    def test_ais_delegate_with_their_weights(self):
+        board, players = mid_game_board(turns=5)
+        greedy, minimax = GreedyAI(1, list(pieces.values())), MinimaxAI(1, list(pieces.values()))
+        _, piece, x, y = greedy.find_all_valid_moves(board)[7]
+        self.assertEqual(greedy.calculate_utility(piece, x, y, board), legacy_utility(greedy, piece, x, y, board))
+        self.assertEqual(minimax.calculate_utility(piece, x, y, board),
+                         legacy_utility(minimax, piece, x, y, board, (10, 10), 1.0))
+        self.assertEqual(utility(board, greedy, piece, x, y), greedy.calculate_utility(piece, x, y, board))
+
+if __name__ == "__main__":
+    unittest.main()
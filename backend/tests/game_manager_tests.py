@@ -41,6 +41,12 @@ class TestGameManager(unittest.TestCase):
         self.game_manager.next_turn()
         self.assertEqual(self.game_manager.current_turn, 0)
 
+    def test_check_game_over(self):
+        self.assertFalse(self.game_manager.check_game_over())
+        for player in self.game_manager.players:
+            player.pieces = []
+        self.assertTrue(self.game_manager.check_game_over())
+
     # @patch('builtins.input', side_effect=['0', 'done', '0', '0'])
     # def test_play_turn_valid_move(self, mock_input):
     #     self.assertEqual(self.game_manager.current_turn, 0)
@@ -0,0 +1,126 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from copy import deepcopy
+from backend.board import Board
+from backend.piece import pieces
+from backend.player import Player
+from backend.placements import placement_table
+from backend.game_manager import GameManager
+from backend.algorithms.random_ai import RandomAI
+from backend.algorithms.minimax import MinimaxAI
+from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.game_record import GameRecordWriter, GameRecordReader, SNAPSHOT_EVERY, agent_config
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.game_record_tests
+"""
+
+def recorded_game(seed, recorder):
+    players = [RandomAI(i, list(pieces.values()), seed=seed * 4 + i) for i in range(1, 5)]
+    game = GameManager(*players, verbose=False, recorder=recorder, record_header={"seed": seed})
+    game.play_game()
+    return game
+
+class TestGameRecord(unittest.TestCase):
+    def test_game_manager_streams_a_replayable_game(self):
+        buffer = io.BytesIO()
+        game = recorded_game(1, GameRecordWriter(buffer))
+        record, = GameRecordReader(buffer.getvalue())
+        self.assertTrue(record.complete)
+        self.assertEqual(record.header["seed"], 1)
+        self.assertEqual(record.header["agents"], [agent_config(player) for player in game.players])
+        self.assertEqual(len(record), game.moves_played)
+        board, players = record.position()
+        self.assertEqual(board.hash, game.board.hash)
+        self.assertEqual(board.grid.tolist(), game.board.grid.tolist())
+        for player, original in zip(players, game.players):
+            self.assertEqual(sorted(piece.name for piece in player.pieces),
+                             sorted(piece.name for piece in original.pieces))
+
+    def test_every_ply_matches_a_checked_replay(self):
+        buffer = io.BytesIO()
+        recorded_game(2, GameRecordWriter(buffer))
+        record, = GameRecordReader(buffer.getvalue())
+        self.assertGreater(len(record), 2 * SNAPSHOT_EVERY)
+        board = Board()
+        players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+        for ply, (seat, move_id) in enumerate(zip(record.moves["seat"].tolist(), record.moves["move"].tolist())):
+            self.assertEqual(record.position(ply)[0].hash, board.hash)
+            self.assertIsNotNone(board.apply_move_id(move_id, players[seat - 1]))
+        self.assertEqual(record.position()[0].hash, board.hash)
+        with self.assertRaises(IndexError):
+            record.position(len(record) + 1)
+
+    def test_appended_files_and_torn_writes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.rec")
+            open(path, "wb").close()
+            self.assertEqual(GameRecordReader(path).games(), [])
+            for seed in (3, 4):
+                with GameRecordWriter(path) as writer:
+                    recorded_game(seed, writer)
+            with GameRecordWriter(path) as writer:
+                writer.begin_game({"seed": 5})
+                writer.record_move(1, 0, 70.0)
+            with open(path, "ab") as file:
+                file.write(b"\x02\x01")  # Half a move record
+            games = GameRecordReader(path).games()
+        self.assertEqual([game.header["seed"] for game in games], [3, 4, 5])
+        self.assertEqual([game.complete for game in games], [True, True, False])
+        self.assertEqual(games[2].moves.tolist(), [(1, 0, 0xFFFF)])
+
+    def test_agent_configs_are_written_once(self):
+        all_pieces = list(pieces.values())
+        buffer = io.BytesIO()
+        writer = GameRecordWriter(buffer)
+        headers = []
+        for game in range(50):
+            agents = [MinimaxAI(1, all_pieces, time_limit=0.1), MonteCarloAI(2, all_pieces, 0.1, seed=game),
+                      MinimaxAI(3, all_pieces, time_limit=0.1), MonteCarloAI(4, all_pieces, 0.1, seed=-game)]
+            headers.append({"size": 20, "agents": [agent_config(agent) for agent in agents],
+                            "game": game, "seed": game, "budget": 0.1})
+            writer.begin_game(headers[-1])
+            for ply in range(80):
+                writer.record_move(ply % 4 + 1, ply)
+            writer.end_game()
+        data = buffer.getvalue()
+        self.assertEqual(len(writer.configs), 2)
+        self.assertEqual([game.header for game in GameRecordReader(data)], headers)
+        # 400 bytes of moves per game; the header, with every config spelled out, was over 450
+        self.assertLess(len(data) / 50, 400 + 150)
+
+    def test_appended_games_share_configs(self):
+        chunks = []
+        for seed in (6, 7):
+            chunk = io.BytesIO()
+            recorded_game(seed, GameRecordWriter(chunk))
+            chunks.append(chunk.getvalue())
+        buffer = io.BytesIO()
+        writer = GameRecordWriter(buffer)
+        for chunk in chunks:
+            writer.append(chunk)
+        # Every seat plays the same RandomAI config, defined once in the appended file
+        self.assertEqual(len(writer.configs), 1)
+        config = b"C" + bytes(4) + bytes(4) + json.dumps({"agent": "RandomAI"}).encode()
+        self.assertEqual(len(buffer.getvalue()), len(chunks[0]) + len(chunks[1]) - len(config))
+        self.assertEqual([game.header for game in GameRecordReader(buffer.getvalue())],
+                         [game.header for chunk in chunks for game in GameRecordReader(chunk)])
+        header = json.dumps({"seed": 1, "agents": [{"seat": 1, "agent": "RandomAI"}]}).encode()
+        with self.assertRaises(ValueError):
+            GameRecordReader(b"G\x01" + len(header).to_bytes(4, "little") + header + b"E").games()
+
+    def test_hand_turned_pieces_map_to_registry_ids(self):
+        piece = deepcopy(pieces["L4"])
+        piece.rotate()
+        piece.flip()
+        table = placement_table()
+        move_id = table.id_of((pieces["L4"], piece, 3, 4))
+        orientation, x, y = table.placement(move_id)
+        self.assertEqual((orientation.shape.tolist(), x, y), (piece.shape.tolist(), 3, 4))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import random
+import unittest
+from copy import deepcopy
+from backend.board import Board
+from backend.piece import pieces, orientations_of
+from backend.player import Player
+from backend.bitboard import iter_bits
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.move_cache_tests
+"""
+
+class TestMoveCache(unittest.TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+
+    def assertSound(self, board, players):
+        for player in players:
+            self.assertEqual(board.check_move_cache(player), ([], []))
+            self.assertEqual(board.legal_moves(player), board.generate_moves(player))
+
+    def test_matches_regeneration_over_a_game(self):
+        rng = random.Random(3)
+        for turn in range(84):
+            player = self.players[turn % 4]
+            moves = player.find_all_valid_moves(self.board)
+            if moves:
+                original_piece, piece, x, y = rng.choice(moves)
+                self.board.place_piece(piece, x, y, player)
+                player.remove_piece(original_piece)
+            self.assertSound(self.board, self.players)
+        queries, reused, generated = self.board.move_cache_stats()
+        self.assertGreater(queries, 84)
+        self.assertGreater(reused, generated)
+
+    def test_matches_regeneration_on_own_turns_only(self):
+        # Each query then sees the player's own move and three others at once
+        for seed in range(3):
+            rng = random.Random(seed)
+            board = Board()
+            players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+            for turn in range(84):
+                player = players[turn % 4]
+                moves = player.find_all_valid_moves(board)
+                self.assertEqual(moves, board.generate_moves(player))
+                if moves:
+                    original_piece, piece, x, y = rng.choice(moves)
+                    board.place_piece(piece, x, y, player)
+                    player.remove_piece(original_piece)
+            queries, reused, generated = board.move_cache_stats()
+            self.assertGreater(reused, 0)
+
+    def test_undo_brings_pieces_back(self):
+        rng = random.Random(5)
+        tokens = []
+        for turn in range(24):
+            player = self.players[turn % 4]
+            moves = player.find_all_valid_moves(self.board)
+            tokens.append(self.board.apply_move(rng.choice(moves), player))
+            if turn % 5 == 4:
+                self.board.undo(tokens.pop())
+            self.assertSound(self.board, self.players)
+        while tokens:
+            self.board.undo(tokens.pop())
+            self.assertSound(self.board, self.players)
+
+    def test_grid_writes_and_other_piece_objects(self):
+        self.players[0].find_all_valid_moves(self.board)
+        self.board.grid[0, 1] = 2
+        self.assertSound(self.board, self.players)
+        copied = Player(1, deepcopy(list(pieces.values())))
+        moves = self.board.legal_moves(copied)
+        self.assertTrue(all(any(move[0] is piece for piece in copied.pieces) for move in moves))
+        self.assertSound(self.board, [copied])
+
+    def test_touching(self):
+        orientation = orientations_of(pieces["L4"])[0]
+        masks = orientation.masks(20)
+        cells = 1 << (5 * 20 + 7)
+        expected = [index for index in iter_bits(masks.origin_mask)
+                    if masks.origins[index][0] & cells]
+        self.assertEqual(list(iter_bits(masks.touching(cells))), expected)
+
+if __name__ == "__main__":
+    unittest.main()
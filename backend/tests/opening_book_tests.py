@@ -0,0 +1,86 @@
+import io
+import os
+import tempfile
+import unittest
+from backend.board import Board
+from backend.piece import pieces
+from backend.player import Player
+from backend.placements import placement_table
+from backend.algorithms.greedy import GreedyAI
+from backend.algorithms.minimax import MinimaxAI
+from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.opening_book import OpeningBook, SYMMETRIES, build, load_book, replay, _Symmetries
+from backend.tournament import run_tournament
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.opening_book_tests
+"""
+
+class TestOpeningBook(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.book = build(plies=2, width=2, budget=0.05, progress=None)
+        cls.path = os.path.join(cls.directory.name, "book.npy")
+        cls.book.save(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def fresh_book(self):
+        return OpeningBook.load(self.path)
+
+    def test_saved_compactly_and_loaded_back(self):
+        book = self.fresh_book()
+        self.assertEqual(book.entries, self.book.entries)
+        # The root and two replies, each under the eight symmetries (the root's all share one key)
+        self.assertEqual(len(book), 1 + 2 * len(SYMMETRIES))
+        self.assertLessEqual(os.path.getsize(self.path), 128 + 10 * len(book))
+        self.assertIs(load_book(self.path), load_book(self.path))
+        self.assertEqual(len(load_book(os.path.join(self.directory.name, "missing.npy"))), 0)
+
+    def test_every_ai_plays_the_book_move_without_searching(self):
+        book = self.fresh_book()
+        minimax = MinimaxAI(1, list(pieces.values()), time_limit=5, book=book)
+        monte_carlo = MonteCarloAI(1, list(pieces.values()), simulation_time=5, book=book)
+        greedy = GreedyAI(1, list(pieces.values()), book=book)
+        moves = [ai.choose_move(Board()) for ai in (minimax, monte_carlo, greedy)]
+        table = placement_table()
+        self.assertEqual(len({table.id_of(move) for move in moves}), 1)
+        self.assertEqual(minimax.moves_considered, 0)
+        self.assertEqual(monte_carlo.iterations, 0)
+        self.assertIn(moves[0][0], minimax.pieces)
+        self.assertEqual(book.stats(), {"entries": len(book), "lookups": 3, "hits": 3, "hit_rate": 1.0})
+
+    def test_replies_are_found_from_every_corner(self):
+        book = self.fresh_book()
+        symmetries = _Symmetries(20)
+        first, = [move for (key, move) in book.entries.items()
+                  if key == Board().hash]
+        for symmetry in range(len(SYMMETRIES)):
+            line = [(1, symmetries.image(first, symmetry))]
+            board, players = replay(line)
+            move = book.move(board, players[1])
+            self.assertIsNotNone(move)
+            self.assertIsNotNone(board.apply_move(move, players[1]))
+        self.assertEqual(book.hits, len(SYMMETRIES))
+
+    def test_misses_are_counted(self):
+        book = self.fresh_book()
+        board = Board()
+        self.assertIsNone(book.move(board, Player(1, [pieces["I1"]])))
+        self.assertIsNone(book.move(Board(size=14), Player(1, list(pieces.values()))))
+        board.apply_move(GreedyAI(1, list(pieces.values())).choose_move(board), Player(1, list(pieces.values())))
+        self.assertIsNone(book.move(board, Player(3, list(pieces.values()))))
+        self.assertEqual((book.lookups, book.hits, book.hit_rate), (3, 0, 0.0))
+
+    def test_tournament_counts_book_hits(self):
+        report = run_tournament(["greedy"] * 4, 1, out=io.StringIO(), book=self.path)
+        self.assertGreaterEqual(report["book_hits"], 1)
+        with self.assertRaises(ValueError):
+            run_tournament(["greedy"] * 4, 1, book=os.path.join(self.directory.name, "missing.npy"))
+
+if __name__ == "__main__":
+    unittest.main()
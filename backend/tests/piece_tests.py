@@ -1,7 +1,7 @@
 import unittest
 import numpy as np
 from copy import deepcopy
-from backend.piece import Piece, pieces
+from backend.piece import Piece, pieces, ORIENTATIONS, PIECE_ORIENTATIONS, orientation, orientations_of
 
 """
 TEST COMMAND
@@ -26,5 +26,44 @@ class TestPiece(unittest.TestCase):
         expected_repr = "V3: \n[[1 1]\n [1 0]]"
         self.assertEqual(repr(self.piece), expected_repr)
 
+class TestOrientationRegistry(unittest.TestCase):
+    def test_distinct_orientation_count(self):
+        self.assertEqual(len(ORIENTATIONS), 91)
+        self.assertEqual(len(PIECE_ORIENTATIONS), 21)
+        self.assertEqual(len(PIECE_ORIENTATIONS["X5"]), 1)
+        self.assertEqual(len(PIECE_ORIENTATIONS["F5"]), 8)
+
+    def test_entries_match_all_orientations(self):
+        for piece in pieces.values():
+            shapes = [entry.shape for entry in PIECE_ORIENTATIONS[piece.name]]
+            for expected, shape in zip(piece.all_orientations(), shapes):
+                np.testing.assert_array_equal(expected, shape)
+
+    def test_entry_geometry(self):
+        entry = orientation("V3", 0)
+        self.assertEqual(entry.tile_count, 3)
+        self.assertEqual((entry.height, entry.width), entry.shape.shape)
+        for i, j in entry.cells:
+            self.assertEqual(entry.shape[i, j], 1)
+        cells = set(entry.cells)
+        for i, j in entry.edge_halo:
+            self.assertNotIn((i, j), cells)
+        for i, j in entry.corner_halo:
+            self.assertNotIn((i, j), cells)
+            self.assertNotIn((i, j), set(entry.edge_halo))
+
+    def test_entries_are_immutable_and_shared(self):
+        entry = orientation("T4", 1)
+        with self.assertRaises(ValueError):
+            entry.shape[0, 0] = 5
+        self.assertIs(deepcopy(entry), entry)
+        self.assertIs(orientations_of(deepcopy(pieces["T4"])), PIECE_ORIENTATIONS["T4"])
+
+    def test_custom_piece_orientations(self):
+        custom = Piece([[1, 0], [1, 1]], "L3")
+        entries = orientations_of(custom)
+        self.assertEqual(len(entries), 4)
+        self.assertIs(orientations_of(custom), entries)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
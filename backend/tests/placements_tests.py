@@ -0,0 +1,74 @@
+import random
+import unittest
+from backend.board import Board
+from backend.piece import pieces, orientations_of
+from backend.player import Player
+from backend.placements import placement_table, PIECE_NAMES
+from backend.fixtures import mid_game_board
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.placements_tests
+"""
+
+class TestPlacements(unittest.TestCase):
+    def setUp(self):
+        self.table = placement_table()
+
+    def test_ids_are_dense_and_round_trip(self):
+        for move_id in range(0, len(self.table), 97):
+            orientation, x, y = self.table.placement(move_id)
+            self.assertEqual(self.table.move_id(orientation, x, y), move_id)
+            self.assertEqual(self.table.piece_name(move_id), orientation.name)
+            self.assertEqual(PIECE_NAMES[self.table.piece_index[move_id]], orientation.name)
+        last = orientations_of(pieces[PIECE_NAMES[-1]])[-1]
+        self.assertEqual(self.table.move_id(last, 20 - last.height, 20 - last.width), len(self.table) - 1)
+
+    def test_masks_match_the_orientation(self):
+        orientation = orientations_of(pieces["F5"])[3]
+        move_id = self.table.move_id(orientation, 7, 11)
+        self.assertEqual(self.table.masks(move_id), orientation.masks(20).at(7, 11))
+
+    def test_off_board_and_custom_placements_are_rejected(self):
+        orientation = next(o for o in orientations_of(pieces["I5"]) if o.width == 5)
+        with self.assertRaises(ValueError):
+            self.table.move_id(orientation, 0, 16)
+        with self.assertRaises(ValueError):
+            self.table.move_id(pieces["I5"], 0, 0)
+
+    def test_move_tuples_convert_both_ways(self):
+        board, players = mid_game_board(turns=10)
+        player = players[1]
+        moves = player.find_all_valid_moves(board)
+        ids = board.legal_move_ids(player)
+        self.assertEqual(ids, [self.table.id_of(move) for move in moves])
+        self.assertEqual([self.table.to_move(move_id, player) for move_id in ids], moves)
+
+    def test_apply_move_id_matches_apply_move(self):
+        rng = random.Random(2)
+        board, by_id = Board(), Board()
+        players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+        copies = [Player(i, list(pieces.values())) for i in range(1, 5)]
+        for turn in range(16):
+            move = rng.choice(players[turn % 4].find_all_valid_moves(board))
+            self.assertIsNotNone(board.apply_move(move, players[turn % 4]))
+            self.assertIsNotNone(by_id.apply_move_id(self.table.id_of(move), copies[turn % 4]))
+            self.assertEqual(by_id.hash, board.hash)
+            self.assertEqual(by_id.grid.tolist(), board.grid.tolist())
+            self.assertEqual([piece.name for piece in copies[turn % 4].pieces],
+                             [piece.name for piece in players[turn % 4].pieces])
+
+    def test_apply_move_id_rejects_illegal_moves(self):
+        player = Player(1, [pieces["I5"]])
+        i5 = orientations_of(pieces["I5"])[0]
+        self.assertIsNone(Board().apply_move_id(self.table.move_id(i5, 5, 5), player))
+        self.assertIsNone(Board().apply_move_id(self.table.move_id(orientations_of(pieces["O4"])[0], 0, 0), player))
+        board = Board()
+        token = board.apply_move_id(self.table.move_id(i5, 0, 0), player)
+        self.assertIsNotNone(token)
+        self.assertEqual(player.pieces, [])
+        board.undo(token)
+        self.assertEqual(player.pieces, [pieces["I5"]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,7 @@ from backend.game_manager import GameManager
 from backend.algorithms.greedy import GreedyAI
 from backend.algorithms.minimax import MinimaxAI
 from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.diagnostics import configure
 
 
 """
@@ -19,12 +20,15 @@ python3 backend/tests/play_game.py
 """
 
 def main():
+    configure()
     player1 = MonteCarloAI(1, list(pieces.values()))
     player2 = MonteCarloAI(2, list(pieces.values()))
     player3 = MonteCarloAI(3, list(pieces.values()))
     player4 = MonteCarloAI(4, list(pieces.values()))
     game_manager = GameManager(player1, player2, player3, player4)
     game_manager.play_game()
+    queries, reused, generated = game_manager.board.move_cache_stats()
+    print(f"Legal move cache: {queries} queries, {reused / max(reused + generated, 1):.0%} of moves reused")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,9 +1,13 @@
 import unittest
+import random
 import builtins
 import numpy as np
 from backend.player import Player
 from backend.piece import Piece
 from backend.board import Board
+from backend.bitboard import Bitboards
+from backend.piece import pieces
+from backend.fixtures import scan_all_origins
 
 """
 TEST COMMAND
@@ -30,6 +34,31 @@ class TestPlayer(unittest.TestCase):
         self.player.remove_piece(piece_to_remove)
         self.assertNotIn(piece_to_remove, self.player.pieces)
 
+    def test_find_all_valid_moves_first_turn(self):
+        moves = self.player.find_all_valid_moves(self.board)
+        self.assertTrue(moves)
+        self.assertEqual(moves, scan_all_origins(self.player, self.board))
+
+    def test_anchor_generation_matches_full_scan(self):
+        # Random four-player games, checking the generator and frontiers every turn
+        rng = random.Random(3)
+        for _ in range(3):
+            board = Board()
+            players = [Player(i, list(pieces.values())) for i in range(1, 5)]
+            for turn in range(40):
+                player = players[turn % 4]
+                moves = player.find_all_valid_moves(board)
+                self.assertEqual(moves, scan_all_origins(player, board))
+                rebuilt = Bitboards.from_grid(board.grid.copy())
+                for other in players:
+                    pid = other.player_id
+                    self.assertEqual(board.bitboards.anchors_for(pid), rebuilt.anchors_for(pid))
+                    self.assertEqual(board.bitboards.forbidden_for(pid), rebuilt.forbidden_for(pid))
+                if moves:
+                    original_piece, piece, x, y = rng.choice(moves)
+                    self.assertTrue(board.place_piece(piece, x, y, player))
+                    player.remove_piece(original_piece)
+
     # def test_choose_move_valid(self):
     #     # Simulate user input for a valid move
     #     inputs = iter(['0', 'done', '0', '0'])
@@ -0,0 +1,86 @@
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+from contextlib import redirect_stdout
+from backend.piece import pieces
+from backend.game_manager import GameManager
+from backend.algorithms.random_ai import RandomAI
+from backend.game_record import GameRecordWriter, GameRecordReader
+from backend.position_dataset import export, PositionDataset, POSITION_DTYPE, main
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.position_dataset_tests
+"""
+
+def recorded_games(seeds):
+    buffer = io.BytesIO()
+    recorder = GameRecordWriter(buffer)
+    for seed in seeds:
+        players = [RandomAI(i, list(pieces.values()), seed=seed * 4 + i) for i in range(1, 5)]
+        GameManager(*players, verbose=False, recorder=recorder).play_game()
+    return buffer.getvalue()
+
+class TestPositionDataset(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.records = recorded_games([1, 2, 3])
+        cls.games = GameRecordReader(cls.records).games()
+        cls.path = os.path.join(cls.directory.name, "positions.npy")
+        cls.count = export([cls.records], cls.path)
+        cls.dataset = PositionDataset(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.dataset
+        cls.directory.cleanup()
+
+    def test_one_fixed_width_row_per_move(self):
+        self.assertEqual(self.count, sum(len(game) for game in self.games))
+        self.assertEqual(len(self.dataset), self.count)
+        # Past the .npy header the file is nothing but rows
+        self.assertLessEqual(os.path.getsize(self.path) - self.count * POSITION_DTYPE.itemsize, 256)
+        self.assertEqual(self.dataset["game"].tolist(),
+                         [index for index, game in enumerate(self.games) for _ in range(len(game))])
+
+    def test_slices_are_views_of_the_file(self):
+        rows = self.dataset[10:20]
+        self.assertIsInstance(rows, np.memmap)
+        self.assertIsInstance(self.dataset["move"], np.memmap)
+        self.assertEqual(sum(len(batch) for batch in self.dataset.batches(64)), self.count)
+        self.assertEqual(self.dataset.planes(slice(10, 20)).shape, (10, 4, 20, 20))
+
+    def test_rows_match_the_recorded_positions(self):
+        first = len(self.games[0])
+        for index in (0, 1, 17, first - 1, first, self.count - 1):
+            row = self.dataset[index]
+            game = self.games[row["game"]]
+            board, players = game.position(int(row["ply"]))
+            self.assertEqual(int(row["move"]), int(game.moves["move"][row["ply"]]))
+            self.assertEqual(int(row["to_move"]), int(game.moves["seat"][row["ply"]]))
+            self.assertEqual(self.dataset.grid(index).tolist(), board.grid.tolist())
+            final = game.position()[0].get_score()
+            self.assertEqual(row["final"].tolist(), [final[seat] for seat in range(1, 5)])
+            restored, restored_players = self.dataset.position(index)
+            self.assertEqual(restored.grid.tolist(), board.grid.tolist())
+            for player, original in zip(restored_players, players):
+                self.assertEqual([piece.name for piece in player.pieces], [piece.name for piece in original.pieces])
+                self.assertEqual(restored.pieces_used(player.player_id), board.pieces_used(player.player_id))
+            if board.bitboards.to_move == restored.bitboards.to_move:
+                self.assertEqual(restored.hash, board.hash)
+
+    def test_command_line(self):
+        records = os.path.join(self.directory.name, "games.rec")
+        with open(records, "wb") as file:
+            file.write(self.records)
+        out = os.path.join(self.directory.name, "cli.npy")
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(main([records, records, "-o", out]), 2 * self.count)
+        dataset = PositionDataset(out)
+        self.assertEqual(int(dataset["game"][-1]), 2 * len(self.games) - 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from backend.piece import pieces
+from backend.game_manager import GameManager
+from backend.algorithms.random_ai import RandomAI
+from backend.game_record import GameRecordReader
+from backend.tournament import play_game, run_tournament, seating, wilson_interval, TournamentStats, main
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.tournament_tests
+"""
+
+class TestTournament(unittest.TestCase):
+    def test_headless_game_prints_nothing(self):
+        players = [RandomAI(i, list(pieces.values()), seed=i) for i in range(1, 5)]
+        game = GameManager(*players, verbose=False)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            game.play_game()
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(game.moves_played, sum(21 - len(player.pieces) for player in players))
+        self.assertTrue(all(times for times in game.decision_times.values()))
+
+    def test_seats_rotate(self):
+        agents = ["greedy", "minimax", "monte_carlo", "random"]
+        self.assertEqual(seating(agents, 0), {1: "greedy", 2: "minimax", 3: "monte_carlo", 4: "random"})
+        self.assertEqual(seating(agents, 5), {1: "minimax", 2: "monte_carlo", 3: "random", 4: "greedy"})
+        for seat in range(1, 5):
+            self.assertEqual({seating(agents, game)[seat] for game in range(4)}, set(agents))
+
+    def test_games_replay_from_their_seed(self):
+        first = play_game(3, ["random", "greedy", "random", "random"], 0.0, 7)
+        second = play_game(3, ["random", "greedy", "random", "random"], 0.0, 7)
+        self.assertEqual([seat["score"] for seat in first["seats"]], [seat["score"] for seat in second["seats"]])
+        self.assertEqual(first["seed"], 10)
+
+    def test_results_are_written_as_they_come(self):
+        out = io.StringIO()
+        seen = []
+        report = run_tournament(["random"] * 3 + ["greedy"], 4, out=out,
+                                progress=lambda record, stats: seen.append(stats.games))
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(sorted(record["game"] for record in records), [0, 1, 2, 3])
+        self.assertEqual(seen, [1, 2, 3, 4])
+        self.assertEqual(report["games"], 4)
+        self.assertEqual(report["agents"]["greedy"]["seats"], 4)
+        self.assertEqual(report["agents"]["random"]["seats"], 12)
+        wins = sum(agent["wins"] for agent in report["agents"].values())
+        self.assertAlmostEqual(wins, 4)
+        self.assertGreater(report["moves_per_second"], 0)
+
+    def test_game_records_are_appended(self):
+        records = io.BytesIO()
+        run_tournament(["random"] * 4, 3, out=io.StringIO(), records=records)
+        games = GameRecordReader(records.getvalue()).games()
+        self.assertEqual(sorted(game.header["game"] for game in games), [0, 1, 2])
+        self.assertTrue(all(game.complete and len(game) > 40 for game in games))
+
+    def test_unknown_agents_are_rejected(self):
+        with self.assertRaises(ValueError):
+            run_tournament(["random", "random", "random", "alphazero"], 1)
+        with self.assertRaises(ValueError):
+            run_tournament(["random"], 1)
+
+    def test_ties_share_the_win(self):
+        stats = TournamentStats()
+        stats.add({"moves": 10, "seats": [{"agent": "a", "score": 5, "decisions": 1, "decision_seconds": 0.1},
+                                          {"agent": "b", "score": 5, "decisions": 1, "decision_seconds": 0.1},
+                                          {"agent": "c", "score": 2, "decisions": 2, "decision_seconds": 0.0},
+                                          {"agent": "c", "score": 1, "decisions": 2, "decision_seconds": 0.0}]})
+        report = stats.report(1.0)
+        self.assertEqual(report["agents"]["a"]["wins"], 0.5)
+        self.assertEqual(report["agents"]["c"]["wins"], 0.0)
+        self.assertAlmostEqual(report["agents"]["a"]["mean_decision_ms"], 100.0)
+        self.assertEqual(report["games_per_hour"], 3600.0)
+
+    def test_wilson_interval(self):
+        low, high = wilson_interval(50, 100)
+        self.assertAlmostEqual(low, 0.4038, places=3)
+        self.assertAlmostEqual(high, 0.5962, places=3)
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+        self.assertEqual(wilson_interval(10, 10)[1], 1.0)
+
+    def test_command_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.jsonl")
+            with redirect_stdout(io.StringIO()):
+                report = main(["--seats", "random,random,random,random", "--games", "2", "--out", path])
+            with open(path) as results:
+                self.assertEqual(len(results.readlines()), 2)
+        self.assertEqual(report["games"], 2)
+
+    def test_command_line_rejects_bad_arguments_before_playing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.jsonl")
+            for argv in (["--seats", "random,random,random"], ["--seats", "random,random,random,chess"],
+                         ["--book", os.path.join(directory, "missing.book")], ["--every", "0"]):
+                with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                    main(argv + ["--games", "2", "--out", path])
+            self.assertFalse(os.path.exists(path))
+
+if __name__ == "__main__":
+    unittest.main()
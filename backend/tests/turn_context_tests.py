@@ -0,0 +1,81 @@
+import unittest
+from collections import Counter
+from unittest.mock import patch
+from backend.board import Board
+from backend.piece import pieces
+from backend.player import Player
+from backend.game_manager import GameManager
+from backend.turn_context import TurnContext
+from backend.algorithms.greedy import GreedyAI
+from backend.algorithms.minimax import MinimaxAI
+from backend.algorithms.monte_carlo import MonteCarloAI
+
+"""
+TEST COMMAND
+python3 -m unittest backend.tests.turn_context_tests
+"""
+
+class TestTurnContext(unittest.TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.player = Player(1, list(pieces.values()))
+        self.context = TurnContext(self.board)
+
+    def test_moves_are_generated_once(self):
+        moves = self.context.legal_moves(self.player)
+        self.assertIs(self.context.legal_moves(self.player), moves)
+        self.assertEqual(moves, self.player.find_all_valid_moves(self.board))
+        self.assertEqual(self.context.generated, 1)
+        self.assertTrue(self.context.has_moves(self.player))
+        self.assertEqual(self.context.generated, 1)
+
+    def test_positions_are_keyed_by_board_version(self):
+        moves = self.context.legal_moves(self.player)
+        token = self.board.apply_move(moves[0], self.player)
+        after = self.context.legal_moves(self.player)
+        self.assertEqual(after, self.player.find_all_valid_moves(self.board))
+        self.board.undo(token)
+        self.assertIs(self.context.legal_moves(self.player), moves)
+        self.assertEqual(self.context.generated, 2)
+
+    def test_other_boards_do_not_use_the_context(self):
+        other = Board()
+        self.context.legal_moves(self.player)
+        self.player.legal_moves(other, self.context)
+        self.assertEqual(self.context.generated, 1)
+
+    def test_game_manager_generates_each_position_once_per_turn(self):
+        players = [GreedyAI(i, list(pieces.values())) for i in range(1, 5)]
+        game_manager = GameManager(*players)
+        calls = Counter()
+        original = Player.find_all_valid_moves
+
+        def counting(player, board):
+            calls[(player.player_id, board.hash)] += 1
+            return original(player, board)
+
+        with patch.object(Player, "find_all_valid_moves", counting), patch("builtins.print"):
+            for _ in range(8):
+                calls.clear()
+                game_manager.play_turn()
+                self.assertEqual(set(calls.values()), {1})
+        self.assertEqual(sum(len(player.pieces) for player in players), 4 * len(pieces) - 8)
+
+    def test_minimax_root_moves_come_from_the_context(self):
+        ai = MinimaxAI(1, list(pieces.values()), max_depth=2, time_limit=60)
+        context = TurnContext(self.board)
+        move = ai.choose_move(self.board, context)
+        self.assertIn(move, context.legal_moves(ai))
+        self.assertEqual(ai.completed_depth, 2)
+        self.assertEqual(context.generated, 1)
+
+    def test_monte_carlo_root_moves_come_from_the_context(self):
+        ai = MonteCarloAI(1, list(pieces.values()), simulation_time=0.05, seed=0)
+        context = TurnContext(self.board)
+        only = context.legal_moves(ai)[-1:]
+        context._moves[context._key(ai)] = only  # A context holding one move leaves the root only that one
+        self.assertEqual(ai.choose_move(self.board, context), only[0])
+        self.assertEqual(context.generated, 1)
+
+if __name__ == "__main__":
+    unittest.main()
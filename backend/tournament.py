@@ -0,0 +1,269 @@
+"""
+Headless AI-vs-AI tournaments, played over a process pool.
+
+    python3 -m backend.tournament --seats greedy,minimax,monte_carlo,random \\
+        --games 1000 --workers 8 --budget 0.2 --seed 1 --out results.jsonl
+
+Each game is a GameManager with verbose=False. The agents rotate one seat
+per game so that, over a multiple of four games, every agent has played
+every seat equally often. The budget is each AI's time per move
+(MinimaxAI's time_limit and MonteCarloAI's simulation_time). GreedyAI and
+RandomAI need no budget. Game i is seeded with seed + i, so a tournament
+can be replayed game by game.
+
+Finished games are appended to the --out file as one JSON object per line
+as soon as they come in, so a long run can be followed or cut short without
+losing results. The report at the end gives games per hour, moves per
+second and, per agent, the mean decision latency and the win rate with a
+95% Wilson interval. A game's top score wins it, and tied winners share the
+win. With --records the moves of every game are also appended to a binary
+game record file (see backend.game_record). With --book the AIs play from an
+opening book (see backend.opening_book) and the report counts its hits.
+"""
+
+import argparse
+import io
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from backend.piece import pieces
+from backend.game_manager import GameManager
+from backend.game_record import GameRecordWriter
+from backend.opening_book import load_book
+from backend.algorithms.greedy import GreedyAI
+from backend.algorithms.minimax import MinimaxAI
+from backend.algorithms.monte_carlo import MonteCarloAI
+from backend.algorithms.random_ai import RandomAI
+
+logger = logging.getLogger(__name__)
+
+# Agent name -> factory(player_id, budget, seed)
+AGENTS = {
+    "greedy": lambda player_id, budget, seed: GreedyAI(player_id, list(pieces.values())),
+    "minimax": lambda player_id, budget, seed: MinimaxAI(player_id, list(pieces.values()), time_limit=budget),
+    "monte_carlo": lambda player_id, budget, seed: MonteCarloAI(player_id, list(pieces.values()),
+                                                                simulation_time=budget, seed=seed),
+    "random": lambda player_id, budget, seed: RandomAI(player_id, list(pieces.values()), seed=seed),
+}
+
+SEATS = 4
+
+
+def seating(agents, game_index):
+    """The agent name at each seat (1 to 4) of a game: agents rotated by game_index."""
+    shift = game_index % SEATS
+    rotated = agents[shift:] + agents[:shift]
+    return {seat: rotated[seat - 1] for seat in range(1, SEATS + 1)}
+
+
+def play_game(game_index, agents, budget, seed, record_moves=False, book=None):
+    """Play one headless game and return its result record.
+
+    With record_moves the record also carries the game in the binary format
+    of backend.game_record, as bytes under "game_record". book is the path of
+    an opening book every player is given.
+    """
+    game_seed = seed + game_index
+    random.seed(game_seed)
+    np.random.seed(game_seed % 2 ** 32)
+    seats = seating(agents, game_index)
+    players = [AGENTS[seats[seat]](seat, budget, game_seed * SEATS + seat) for seat in seats]
+    opening_book = load_book(book) if book is not None else None
+    book_hits = opening_book.hits if opening_book is not None else 0
+    for player in players:
+        player.book = opening_book
+    buffer = io.BytesIO() if record_moves else None
+    recorder = GameRecordWriter(buffer) if record_moves else None
+    game = GameManager(*players, verbose=False, recorder=recorder,
+                       record_header={"game": game_index, "seed": game_seed, "budget": budget})
+    started = time.perf_counter()
+    game.play_game()
+    scores = game.board.get_score()
+    result = {
+        "game": game_index,
+        "seed": game_seed,
+        "seconds": round(time.perf_counter() - started, 4),
+        "moves": game.moves_played,
+        "seats": [{"seat": seat, "agent": seats[seat], "score": scores[seat],
+                   "decisions": len(game.decision_times[seat]),
+                   "decision_seconds": round(sum(game.decision_times[seat]), 6)}
+                  for seat in seats],
+    }
+    if opening_book is not None:
+        result["book_hits"] = opening_book.hits - book_hits
+    if record_moves:
+        result["game_record"] = buffer.getvalue()
+    return result
+
+
+def wilson_interval(wins, n, z=1.96):
+    """Wilson score interval of a win rate of wins out of n (wins may be fractional)."""
+    if n == 0:
+        return 0.0, 1.0
+    rate = wins / n
+    center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+    spread = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, center - spread), min(1.0, center + spread)
+
+
+class TournamentStats:
+    """Running totals over the result records of a tournament."""
+
+    def __init__(self):
+        self.games = 0
+        self.moves = 0
+        self.book_hits = 0
+        self.agents = {}  # name -> {"seats", "wins", "decisions", "decision_seconds"}
+
+    def add(self, record):
+        self.games += 1
+        self.moves += record["moves"]
+        self.book_hits += record.get("book_hits", 0)
+        best = max(seat["score"] for seat in record["seats"])
+        winners = sum(seat["score"] == best for seat in record["seats"])
+        for seat in record["seats"]:
+            totals = self.agents.setdefault(seat["agent"], {"seats": 0, "wins": 0.0, "decisions": 0,
+                                                            "decision_seconds": 0.0})
+            totals["seats"] += 1
+            totals["decisions"] += seat["decisions"]
+            totals["decision_seconds"] += seat["decision_seconds"]
+            if seat["score"] == best:
+                totals["wins"] += 1 / winners
+
+    def report(self, wall_seconds):
+        """Throughput over wall_seconds, and per agent latency and win rate."""
+        agents = {}
+        for name, totals in sorted(self.agents.items()):
+            low, high = wilson_interval(totals["wins"], totals["seats"])
+            agents[name] = {
+                "seats": totals["seats"],
+                "wins": totals["wins"],
+                "win_rate": totals["wins"] / totals["seats"],
+                "win_rate_95": [low, high],
+                "mean_decision_ms": 1000 * totals["decision_seconds"] / max(totals["decisions"], 1),
+            }
+        return {
+            "games": self.games,
+            "wall_seconds": wall_seconds,
+            "games_per_hour": 3600 * self.games / wall_seconds if wall_seconds else 0.0,
+            "moves_per_second": self.moves / wall_seconds if wall_seconds else 0.0,
+            "book_hits": self.book_hits,
+            "agents": agents,
+        }
+
+
+def check_arguments(agents, games, book=None):
+    """Raise ValueError if run_tournament could not play these arguments."""
+    unknown = [name for name in agents if name not in AGENTS]
+    if unknown or len(agents) != SEATS:
+        raise ValueError(f"need {SEATS} agents from {sorted(AGENTS)}, got {list(agents)}")
+    if games < 0:
+        raise ValueError(f"cannot play {games} games")
+    if book is not None and not os.path.exists(book):
+        raise ValueError(f"no opening book at {book}")
+
+
+def run_tournament(agents, games, workers=1, budget=0.1, seed=0, out=None, progress=None, records=None,
+                   book=None):
+    """Play games games of agents (four names, one per seat) and return the report.
+
+    Each record is written to the open file out as it arrives and passed to
+    progress(record, stats) if given. If records (a binary file) is given,
+    every game's moves are appended to it as they arrive (see backend.game_record). book is
+    the path of an opening book for every player. With workers > 1 the games are played in
+    a process pool; if no pool can be started the rest are played in-process.
+    """
+    check_arguments(agents, games, book)
+    agents = list(agents)
+    stats = TournamentStats()
+    started = time.perf_counter()
+    pending = set(range(games))
+    # Each game arrives with its own copy of the agent configs; the file keeps one
+    recorder = GameRecordWriter(records) if records is not None else None
+
+    def finish(record):
+        game_record = record.pop("game_record", None)
+        if recorder is not None:
+            recorder.append(game_record)
+        pending.discard(record["game"])
+        stats.add(record)
+        if out is not None:
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+        if progress is not None:
+            progress(record, stats)
+
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(play_game, index, agents, budget, seed, records is not None, book)
+                           for index in sorted(pending)]
+                for future in as_completed(futures):
+                    finish(future.result())
+        except (OSError, BrokenProcessPool) as error:
+            logger.warning("Process pool unavailable (%s); playing %d games in-process", error, len(pending))
+    for index in sorted(pending):
+        finish(play_game(index, agents, budget, seed, records is not None, book))
+    return stats.report(time.perf_counter() - started)
+
+
+def format_report(report):
+    lines = [f"{report['games']} games in {report['wall_seconds']:.1f} s: "
+             f"{report['games_per_hour']:.0f} games/hour, {report['moves_per_second']:.1f} moves/sec"]
+    for name, agent in report["agents"].items():
+        low, high = agent["win_rate_95"]
+        lines.append(f"  {name:12s} win rate {agent['win_rate']:6.1%} (95% {low:.1%}-{high:.1%}) "
+                     f"over {agent['seats']} seats | {agent['mean_decision_ms']:8.1f} ms/decision")
+    if report["book_hits"]:
+        lines.append(f"  {report['book_hits']} moves came from the opening book")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Blokus AI tournament")
+    parser.add_argument("--seats", default="greedy,minimax,monte_carlo,random",
+                        help=f"four comma-separated agents from {', '.join(AGENTS)}")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--budget", type=float, default=0.1, help="seconds per move for search AIs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="tournament.jsonl", help="results file, appended to")
+    parser.add_argument("--records", help="binary game record file the moves are appended to")
+    parser.add_argument("--book", help="opening book file the AIs play from (see backend.opening_book)")
+    parser.add_argument("--every", type=int, default=10, help="print progress every this many games")
+    args = parser.parse_args(argv)
+    agents = [name.strip() for name in args.seats.split(",")]
+    try:
+        check_arguments(agents, args.games, args.book)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.every < 1:
+        parser.error("--every must be at least 1")
+
+    def progress(record, stats):
+        if stats.games % args.every == 0:
+            print(f"{stats.games}/{args.games} games done", flush=True)
+
+    records = open(args.records, "ab") if args.records else None
+    try:
+        with open(args.out, "a") as out:
+            report = run_tournament(agents, args.games, args.workers, args.budget, args.seed, out, progress,
+                                    records, args.book)
+    finally:
+        if records is not None:
+            records.close()
+    print(format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,36 @@
+"""
+Move generation shared by everything that looks at one turn.
+
+GameManager, the Flask endpoints and the AIs share one TurnContext per turn
+instead of each calling find_all_valid_moves on the same board. Moves are
+memoized per (player, board version), where the version is the board's
+Zobrist hash plus the size of the player's inventory, so a search that applies
+and undoes moves on the context's board gets one entry per position it visits.
+"""
+
+
+class TurnContext:
+    """Legal moves of a turn's positions, each generated at most once."""
+
+    def __init__(self, board):
+        self.board = board
+        self.generated = 0  # Calls made to find_all_valid_moves
+        self._moves = {}
+
+    def _key(self, player):
+        return player.player_id, self.board.hash, len(player.pieces)
+
+    def legal_moves(self, player):
+        key = self._key(player)
+        moves = self._moves.get(key)
+        if moves is None:
+            moves = self._moves[key] = player.find_all_valid_moves(self.board)
+            self.generated += 1
+        return moves
+
+    def has_moves(self, player):
+        # Reuse the move list when there is one, else ask the early-exit query
+        moves = self._moves.get(self._key(player))
+        if moves is not None:
+            return bool(moves)
+        return player.has_valid_move(self.board)
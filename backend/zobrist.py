@@ -0,0 +1,57 @@
+"""
+Zobrist keys for hashing Blokus positions.
+
+A position hash is the XOR of one key per occupied (cell, owner), one key per
+piece a player has used, and one key for the player to move. Every key is
+derived from a fixed seed string, so a position hashes to the same value in
+every process.
+"""
+
+import random
+
+SEATS = 4
+
+_cell_keys = {}
+_piece_keys = {}
+_turn_keys = {}
+
+
+def _key(*parts):
+    return random.Random(":".join(str(part) for part in parts)).getrandbits(64)
+
+
+def cell_keys(player_id, size=20):
+    """Keys for player_id owning each cell, indexed like the bitboards."""
+    keys = _cell_keys.get((player_id, size))
+    if keys is None:
+        keys = _cell_keys[(player_id, size)] = [_key("cell", size, player_id, index)
+                                                for index in range(size * size)]
+    return keys
+
+
+def piece_key(player_id, piece_name):
+    key = _piece_keys.get((player_id, piece_name))
+    if key is None:
+        key = _piece_keys[(player_id, piece_name)] = _key("piece", player_id, piece_name)
+    return key
+
+
+def turn_key(player_id):
+    key = _turn_keys.get(player_id)
+    if key is None:
+        key = _turn_keys[player_id] = _key("turn", player_id)
+    return key
+
+
+def next_seat(player_id):
+    return player_id % SEATS + 1
+
+
+def footprint_key(footprint, player_id, size=20):
+    keys = cell_keys(player_id, size)
+    key = 0
+    while footprint:
+        low = footprint & -footprint
+        key ^= keys[low.bit_length() - 1]
+        footprint ^= low
+    return key